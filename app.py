@@ -1,87 +1,482 @@
-from typing import List, Tuple
-
-from cardlib import InputCard, MetaCard, CardType
-
-
-class App:
-    """A class that holds current status of the application"""
-
-    left_mouse_button_down: bool = False
-    left_mouse_button_down_pos: Tuple[int, int] = (0, 0)
-
-    middle_mouse_button_down: bool = False
-    middle_mouse_button_down_pos: Tuple[int, int] = (0, 0)
-
-    version_major: int = 0
-    version_minor: int = 1
-    version_revision: int = 0
-
-    screen_drag_x: int = 0
-    screen_drag_y: int = 0
-
-    cards: List[MetaCard] = []
-
-    def __init__(self):
-        pass
-
-    def add_card(self, card: CardType) -> None:
-        """Add a card to the application"""
-
-        if not card in CardType:
-            raise TypeError("Card must be of type CardType")
-
-        match card:
-            case CardType.INPUTCARD:
-                self.cards.append(InputCard("Input Card", 300, 300))
-
-    def sort_cards_by_z_order(self) -> None:
-        """Sort the cards in the application"""
-        self.cards.sort(key=lambda x: x.z_order)
-
-    def set_left_mouse_button_down_status(self, status, pos) -> None:
-        """Set the status of the left mouse button"""
-        self.left_mouse_button_down = status
-        self.left_mouse_button_down_pos = pos
-
-    def set_left_mouse_button_down_pos(self, pos) -> None:
-        """Set the position of the left mouse button"""
-        self.left_mouse_button_down_pos = pos
-
-    def set_middle_mouse_down_status(self, status, pos) -> None:
-        """Set the status of the middle mouse button"""
-        self.middle_mouse_button_down = status
-        self.middle_mouse_button_down_pos = pos
-
-    def set_middle_mouse_down_pos(self, pos) -> None:
-        """Set the position of the middle mouse button"""
-        self.middle_mouse_button_down_pos = pos
-
-    def get_left_mouse_button_down_status(self) -> bool:
-        """Get the status of the left mouse button"""
-        return self.left_mouse_button_down
-
-    def get_left_mouse_button_down_pos(self) -> Tuple[int, int]:
-        """Get the position of the left mouse button"""
-        return self.left_mouse_button_down_pos
-
-    def get_middle_mouse_button_down_status(self) -> bool:
-        """Get the status of the middle mouse button"""
-        return self.middle_mouse_button_down
-
-    def get_middle_mouse_down_pos(self) -> Tuple[int, int]:
-        """Get the position of the middle mouse button"""
-        return self.middle_mouse_button_down_pos
-
-    def set_screen_drag(self, starting_pos, current_pos) -> None:
-        """Set the screen drag value"""
-        self.screen_drag_x += current_pos[0] - starting_pos[0]
-        self.screen_drag_y += current_pos[1] - starting_pos[1]
-
-    def get_screen_drag(self) -> Tuple[int, int]:
-        """Get the screen drag value"""
-        return self.screen_drag_x, self.screen_drag_y
-
-    @property
-    def get_version(self) -> str:
-        """Get the major version number"""
-        return f"{self.version_major}.{self.version_minor}.{self.version_revision}"
+# pylint: disable=no-member
+
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Tuple
+
+import pygame
+
+from cardtypes import CardClasses, CardType
+from debuglib import DebugSnapshot
+from dialoglib import FileDialog
+from eventlib import HoverTracker, MouseButton
+from historylib import History, MoveCardCommand, ZOrderCommand
+from idlib import IdAllocator
+from minimaplib import MiniMap
+from nodelib import NodeKind
+from projectlib import ProjectFile
+from registrylib import WidgetRegistry
+from spatiallib import SpatialHash
+from wirelib import WireManager
+from zoomlib import ZoomLevels
+
+if TYPE_CHECKING:
+    # Card modules are only imported when the first card is created
+    from cardlib import MetaCard
+    from textboxlib import MetaTextBox
+
+
+class App:
+    """A class that holds current status of the application"""
+
+    left_mouse_button_down: bool = False
+    left_mouse_button_down_pos: Tuple[int, int] = (0, 0)
+
+    middle_mouse_button_down: bool = False
+    middle_mouse_button_down_pos: Tuple[int, int] = (0, 0)
+
+    version_major: int = 0
+    version_minor: int = 1
+    version_revision: int = 0
+
+    screen_drag_x: float = 0
+    screen_drag_y: float = 0
+
+    zoom_level: int = 0
+
+    cards: List["MetaCard"] = []
+    registry: WidgetRegistry = WidgetRegistry()
+    card_index: SpatialHash = SpatialHash(256)
+    wires: WireManager = WireManager()
+    # Output a wire is being dragged from, as (card, port)
+    wire_drag_source: Tuple["MetaCard", str] | None = None
+
+    focused_text_box: "MetaTextBox | None" = None
+
+    minimap: MiniMap | None = None
+
+    # Window row the canvas starts at, below the menu bar
+    canvas_top: int = 0
+    # Cursor and modifier keys of the current frame
+    mouse_pos: Tuple[int, int] = (0, 0)
+    key_mods: int = 0
+    # Card and button under the cursor
+    hover: HoverTracker = HoverTracker()
+    # Frames handled so far, counted by the main loop. Recorded sessions are
+    # replayed frame by frame, so timing by frames renders them the same way
+    frame: int = 0
+    # Frame of the last card drag or pan step, and for how many frames after
+    # it cards are still drawn fast
+    drag_frame: int = 0
+    settle_frames: int = 8
+    # Shown on the canvas, e.g. why a project could not be opened
+    status_text: str = ""
+
+    def __init__(self):
+        pass
+
+    def add_card(self, card: CardType) -> None:
+        """Add a card to the application"""
+
+        if not card in CardType:
+            raise TypeError("Card must be of type CardType")
+
+        match card:
+            case CardType.INPUTCARD:
+                self.register_card(CardClasses.get(card)("Input Card", 300, 300))
+            case CardType.MATHCARD:
+                self.register_card(CardClasses.get(card)("Math Card", 520, 300))
+            case CardType.EXPORTCARD:
+                self.register_card(CardClasses.get(card)("Export Card", 740, 300))
+
+    def register_card(self, card: "MetaCard") -> None:
+        """Add a card instance and make its widgets reachable by ID"""
+        self.cards.append(card)
+        self.registry.register(card)
+        card.registry.attach(self.registry)
+        self.card_index.insert(card.widget_id, card.get_rect())
+        if self.minimap is not None:
+            self.minimap.add_card(card)
+        if CardClasses.get_type(card) is CardType.EXPORTCARD:
+            # Exports evaluate the graph of the cards on this canvas
+            card.app = self
+
+    def remove_card(self, card: "MetaCard") -> None:
+        """Remove a card, its widgets and its wires from the application"""
+        for wire in self.wires.get_card_wires(card):
+            self.wires.remove_wire(wire)
+        if self.wire_drag_source is not None and self.wire_drag_source[0] is card:
+            self.wire_drag_source = None
+        if self.focused_text_box in card.text_boxes:
+            self.set_focused_text_box(None)
+        if any(widget is card for widget in self.hover.hovered):
+            self.hover.clear()
+        self.card_index.remove(card.widget_id)
+        card.registry.detach()
+        self.registry.unregister(card.widget_id)
+        if self.minimap is not None:
+            self.minimap.remove_card(card)
+        self.cards.remove(card)
+        card.release()
+        IdAllocator.release(card.widget_id)
+
+    def clear(self) -> None:
+        """Remove every card and forget the undo history"""
+        History.clear()
+        if self.minimap is not None:
+            # Redrawn once at the end instead of after every removal
+            self.minimap.needs_rebuild = True
+        for card in list(self.cards):
+            self.remove_card(card)
+
+    def save_project(self, path: str = "") -> None:
+        """Save the graph to a project file, asking for the path if not given"""
+        if not path:
+            path = FileDialog.ask_save_filename(ProjectFile.extension)
+            if not path:
+                return
+        try:
+            ProjectFile.save(self, Path(path))
+        except (OSError, ValueError, TypeError) as error:
+            self.show_error(f"Could not save {path}", error)
+            return
+        self.status_text = ""
+
+    def open_project(self, path: str = "") -> None:
+        """Open a project file, asking for the path if not given"""
+        if not path:
+            path = FileDialog.ask_open_filename(ProjectFile.extension)
+            if not path:
+                return
+        try:
+            ProjectFile.open(self, Path(path))
+        except (OSError, EOFError, ValueError, KeyError, TypeError) as error:
+            self.show_error(f"Could not open {path}", error)
+            return
+        self.status_text = ""
+
+    def show_error(self, message: str, error: Exception) -> None:
+        """Report a failed action without leaving the main loop"""
+        print(f"{message}: {error}")
+        self.status_text = message
+
+    def move_card(self, card: "MetaCard", starting_pos, current_pos) -> None:
+        """Move a card by the difference of two canvas positions"""
+        old_pos = (card.coord_x, card.coord_y)
+        card.update_card_pos(starting_pos, current_pos)
+        History.record(MoveCardCommand(card, old_pos, (card.coord_x, card.coord_y)))
+        self.card_index.insert(card.widget_id, card.get_rect())
+        if self.minimap is not None:
+            self.minimap.update_card(card)
+
+    def start_wire_drag(self, card: "MetaCard", port: str) -> None:
+        """Start dragging a new wire from an output of a card"""
+        self.wire_drag_source = (card, port)
+
+    def end_wire_drag(self, world_pos) -> None:
+        """Connect the dragged wire to the input under a canvas position"""
+        if self.wire_drag_source is None:
+            return
+        source_card, source_port = self.wire_drag_source
+        self.wire_drag_source = None
+        target_card = self.get_top_card_at(world_pos)
+        if target_card is None or target_card is source_card:
+            return
+        node = target_card.get_node_at(world_pos)
+        if node is not None and node.kind == NodeKind.INPUT:
+            self.wires.add_wire(source_card, source_port, target_card, node.label)
+
+    def get_widget(self, widget_id: int):
+        """Get any card or widget of the application by ID"""
+        return self.registry.get(widget_id)
+
+    def bring_to_front(self, card: "MetaCard") -> None:
+        """Draw a card above every other card"""
+        if self.cards and self.cards[-1] is card:
+            return
+        old_z_order: int = card.z_order
+        card.update_z_order_to_bring_front()
+        self.sort_cards_by_z_order()
+        History.record(ZOrderCommand(card, old_z_order, card.z_order))
+
+    def sort_cards_by_z_order(self) -> None:
+        """Sort the cards in the application"""
+        self.cards.sort(key=lambda x: x.z_order)
+
+    def get_top_card_at(self, pos) -> "MetaCard | None":
+        """Get the card with the biggest z_order at the given position"""
+        top_card: "MetaCard | None" = None
+        for card_id in self.card_index.query_point(pos):
+            card = self.registry.get(card_id)
+            if card.get_rect().collidepoint(pos):
+                if top_card is None or card.z_order > top_card.z_order:
+                    top_card = card
+        return top_card
+
+    def set_focused_text_box(self, text_box: "MetaTextBox | None") -> None:
+        """Move the keyboard focus to the given text box"""
+        if self.focused_text_box is text_box:
+            return
+        if self.focused_text_box is not None:
+            self.focused_text_box.set_focus(False)
+        self.focused_text_box = text_box
+        if text_box is not None:
+            text_box.set_focus(True)
+
+    def set_left_mouse_button_down_status(self, status, pos) -> None:
+        """Set the status of the left mouse button"""
+        self.left_mouse_button_down = status
+        self.left_mouse_button_down_pos = pos
+
+    def set_left_mouse_button_down_pos(self, pos) -> None:
+        """Set the position of the left mouse button"""
+        self.left_mouse_button_down_pos = pos
+
+    def set_middle_mouse_down_status(self, status, pos) -> None:
+        """Set the status of the middle mouse button"""
+        self.middle_mouse_button_down = status
+        self.middle_mouse_button_down_pos = pos
+
+    def set_middle_mouse_down_pos(self, pos) -> None:
+        """Set the position of the middle mouse button"""
+        self.middle_mouse_button_down_pos = pos
+
+    def get_left_mouse_button_down_status(self) -> bool:
+        """Get the status of the left mouse button"""
+        return self.left_mouse_button_down
+
+    def get_left_mouse_button_down_pos(self) -> Tuple[int, int]:
+        """Get the position of the left mouse button"""
+        return self.left_mouse_button_down_pos
+
+    def get_middle_mouse_button_down_status(self) -> bool:
+        """Get the status of the middle mouse button"""
+        return self.middle_mouse_button_down
+
+    def get_middle_mouse_down_pos(self) -> Tuple[int, int]:
+        """Get the position of the middle mouse button"""
+        return self.middle_mouse_button_down_pos
+
+    def set_screen_drag(self, starting_pos, current_pos) -> None:
+        """Set the screen drag value"""
+        self.screen_drag_x += current_pos[0] - starting_pos[0]
+        self.screen_drag_y += current_pos[1] - starting_pos[1]
+
+    def get_screen_drag(self) -> Tuple[float, float]:
+        """Get the screen drag value"""
+        return self.screen_drag_x, self.screen_drag_y
+
+    def get_zoom(self) -> float:
+        """Get the zoom factor of the canvas"""
+        return ZoomLevels.get_zoom(self.zoom_level)
+
+    def screen_to_world(self, pos) -> Tuple[float, float]:
+        """Convert a position on the window to canvas coordinates"""
+        zoom: float = self.get_zoom()
+        return (
+            (pos[0] - self.screen_drag_x) / zoom,
+            (pos[1] - self.screen_drag_y) / zoom,
+        )
+
+    def world_to_screen(self, pos) -> Tuple[float, float]:
+        """Convert canvas coordinates to a position on the window"""
+        zoom: float = self.get_zoom()
+        return (
+            pos[0] * zoom + self.screen_drag_x,
+            pos[1] * zoom + self.screen_drag_y,
+        )
+
+    def center_on(self, world_pos, window_size) -> None:
+        """Pan the view so the given canvas position is in the window center"""
+        zoom: float = self.get_zoom()
+        self.screen_drag_x = window_size[0] / 2 - world_pos[0] * zoom
+        self.screen_drag_y = window_size[1] / 2 - world_pos[1] * zoom
+
+    def zoom_at(self, screen_pos, steps: int) -> None:
+        """Zoom the canvas by whole levels, keeping the point under the cursor"""
+        zoom_level: int = ZoomLevels.clamp(self.zoom_level + steps)
+        if zoom_level == self.zoom_level:
+            return
+        world_pos = self.screen_to_world(screen_pos)
+        self.zoom_level = zoom_level
+        zoom: float = self.get_zoom()
+        self.screen_drag_x = screen_pos[0] - world_pos[0] * zoom
+        self.screen_drag_y = screen_pos[1] - world_pos[1] * zoom
+
+    def is_on_canvas(self, pos) -> bool:
+        """Whether a window position is on the canvas"""
+        return pos[1] > self.canvas_top
+
+    def update_focus(self, event: pygame.event.Event) -> bool:
+        """Focus the text box under a left click, or drop the focus"""
+        if event.button != MouseButton.LEFT:
+            return False
+        text_box: "MetaTextBox | None" = None
+        if self.is_on_canvas(event.pos):
+            world_pos = self.screen_to_world(event.pos)
+            card = self.get_top_card_at(world_pos)
+            if card is not None:
+                text_box = card.get_text_box_at(world_pos)
+        self.set_focused_text_box(text_box)
+        return False
+
+    def handle_key_down(self, event: pygame.event.Event) -> bool:
+        """Type into the focused text box, or run a keyboard shortcut"""
+        if self.focused_text_box is not None:
+            match event.key:
+                case pygame.K_BACKSPACE:
+                    self.focused_text_box.backspace()
+                case pygame.K_ESCAPE | pygame.K_RETURN:
+                    self.set_focused_text_box(None)
+            return True
+        ctrl: bool = bool(self.key_mods & pygame.KMOD_CTRL)
+        match event.key:
+            # [M] Toggle the minimap
+            case pygame.K_m:
+                if self.minimap is not None:
+                    self.minimap.hidden = not self.minimap.hidden
+            # [Ctrl + Z] Undo, [Ctrl + Shift + Z] or [Ctrl + Y] redo
+            case pygame.K_z if ctrl:
+                if self.key_mods & pygame.KMOD_SHIFT:
+                    History.redo(self)
+                else:
+                    History.undo(self)
+            case pygame.K_y if ctrl:
+                History.redo(self)
+            # [Ctrl + S] Save, [Ctrl + O] open a project
+            case pygame.K_s if ctrl:
+                self.save_project()
+            case pygame.K_o if ctrl:
+                self.open_project()
+            # [D] Write a debug snapshot of the scene and its memory use to a
+            # JSON file in the background
+            case pygame.K_d:
+                DebugSnapshot.export(self)
+            case _:
+                return False
+        return True
+
+    def handle_text_input(self, event: pygame.event.Event) -> bool:
+        """Type text into the focused text box"""
+        if self.focused_text_box is None:
+            return False
+        self.focused_text_box.type_text(event.text)
+        return True
+
+    def handle_mouse_wheel(self, event: pygame.event.Event) -> bool:
+        """Scroll the card under the cursor, or zoom the canvas around it
+
+        The canvas is zoomed over cards that can not scroll or with Ctrl.
+        """
+        card = self.get_top_card_at(self.screen_to_world(self.mouse_pos))
+        if (
+            card is not None
+            and card.can_scroll()
+            and not self.key_mods & pygame.KMOD_CTRL
+        ):
+            card.scroll(-event.y * 3)
+        else:
+            self.zoom_at(self.mouse_pos, event.y)
+        return True
+
+    def handle_mouse_down(self, event: pygame.event.Event) -> bool:
+        """Start dragging a card, a wire or the view, or disconnect a wire"""
+        world_pos = self.screen_to_world(event.pos)
+        match event.button:
+            case MouseButton.LEFT:
+                card = self.get_top_card_at(world_pos)
+                if card is None:
+                    return True
+                node = card.get_node_at(world_pos)
+                if node is None:
+                    self.set_left_mouse_button_down_status(True, event.pos)
+                    self.wires.set_active_cards([card])
+                    # Everything until the button is released is undone as
+                    # one step
+                    History.begin_group()
+                    button = card.get_button_at(world_pos)
+                    if button is not None:
+                        button.click()
+                elif node.kind == NodeKind.OUTPUT:
+                    # Drag a new wire out of an output
+                    self.start_wire_drag(card, node.label)
+                else:
+                    # Pick up the wire of a connected input
+                    wire = self.wires.get_input_wire(card, node.label)
+                    if wire is not None:
+                        self.wires.remove_wire(wire)
+                        self.start_wire_drag(wire.source_card, wire.source_port)
+            case MouseButton.MIDDLE:
+                self.set_middle_mouse_down_status(True, event.pos)
+            case MouseButton.RIGHT:
+                # Disconnect the wire under the cursor
+                wire = self.wires.get_wire_at(world_pos, self.get_zoom())
+                if wire is not None:
+                    self.wires.remove_wire(wire)
+            case _:
+                return False
+        return True
+
+    def handle_mouse_up(self, event: pygame.event.Event) -> bool:
+        """End the drags started by a mouse button"""
+        match event.button:
+            case MouseButton.LEFT:
+                self.set_left_mouse_button_down_status(False, event.pos)
+                History.end_group()
+                self.wires.set_active_cards([])
+                self.end_wire_drag(self.screen_to_world(event.pos))
+            case MouseButton.MIDDLE:
+                self.set_middle_mouse_down_status(False, event.pos)
+            case _:
+                return False
+        return True
+
+    def handle_mouse_drag(self, event: pygame.event.Event) -> bool:
+        """Pan the view with the middle button, drag a card with the left one"""
+        if self.get_middle_mouse_button_down_status():
+            # Cards stay where they are on the canvas, only the view offset
+            # changes
+            self.set_screen_drag(self.get_middle_mouse_down_pos(), event.pos)
+            self.set_middle_mouse_down_pos(event.pos)
+            self.drag_frame = self.frame
+        if self.get_left_mouse_button_down_status():
+            self.drag_frame = self.frame
+            down_world_pos = self.screen_to_world(
+                self.get_left_mouse_button_down_pos()
+            )
+            # Drag the card under the mouse that has the biggest z_order
+            card = self.get_top_card_at(down_world_pos)
+            if card is not None:
+                self.bring_to_front(card)
+                self.move_card(card, down_world_pos, self.screen_to_world(event.pos))
+            self.set_left_mouse_button_down_pos(event.pos)
+        # Hover effects are updated by the next handlers
+        return False
+
+    def is_interacting(self) -> bool:
+        """Whether a card or the view is being dragged and still moving"""
+        return (
+            self.get_left_mouse_button_down_status()
+            or self.get_middle_mouse_button_down_status()
+        ) and self.frame - self.drag_frame < self.settle_frames
+
+    def update_hover(self, event: pygame.event.Event) -> bool:
+        """Highlight the top card under the cursor and its button"""
+        if (
+            self.get_left_mouse_button_down_status()
+            or self.get_middle_mouse_button_down_status()
+        ):
+            # Highlights are kept while dragging, so no card is rendered again
+            return True
+        world_pos = self.screen_to_world(event.pos)
+        card = self.get_top_card_at(world_pos)
+        if card is None:
+            self.hover.update([])
+            return True
+        button = card.get_button_at(world_pos)
+        self.hover.update([card, button] if button is not None else [card])
+        return True
+
+    @property
+    def get_version(self) -> str:
+        """Get the major version number"""
+        return f"{self.version_major}.{self.version_minor}.{self.version_revision}"
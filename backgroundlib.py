@@ -0,0 +1,118 @@
+import math
+from typing import Tuple
+
+import pygame
+
+from stylelib import GridStyle
+from zoomlib import ZoomCache, ZoomLevels
+
+
+class Background:
+    """Grid and axes of the canvas, drawn from a tile cached per zoom level
+
+    A tile holds a square of major cells with their minor lines and is
+    blitted side by side across the window, so the background costs a
+    handful of blits however dense the grid is. Tile positions are rounded
+    one by one from the exact pan offset, so the grid never drifts from the
+    cards at fractional zoom levels.
+    """
+
+    grid_style: GridStyle = GridStyle(
+        background_color=(33, 40, 48),
+        minor_line_color=(39, 47, 56),
+        major_line_color=(50, 60, 71),
+        axis_color=(120, 120, 120),
+        minor_spacing=20,
+        major_every=5,
+        min_line_spacing=6,
+    )
+
+    # Canvas point the axes cross at, the center of the default window
+    origin: Tuple[float, float] = (400, 300)
+    # Smallest width of a tile on the window
+    min_tile_size: int = 256
+
+    def __init__(self, style: GridStyle | None = None):
+        self.style: GridStyle = style if style is not None else self.grid_style
+        self.tiles: ZoomCache = ZoomCache(max_renders=3)
+
+    def set_style(self, style: GridStyle) -> None:
+        """Change the look of the grid, the tiles are rendered again"""
+        self.style = style
+
+    def get_spacing(self, zoom: float) -> float:
+        """Get the canvas distance between minor lines at a zoom
+
+        Lines closer than min_line_spacing on the window are thinned out to
+        every major_every-th line, as often as needed.
+        """
+        spacing: float = self.style.minor_spacing
+        while spacing * zoom < self.style.min_line_spacing:
+            spacing *= self.style.major_every
+        return spacing
+
+    def get_tile_size(self, zoom: float) -> float:
+        """Get the exact width of a tile on the window"""
+        major_size: float = self.get_spacing(zoom) * self.style.major_every * zoom
+        return major_size * math.ceil(self.min_tile_size / major_size)
+
+    def get_tile(self, zoom_level: int) -> pygame.Surface:
+        """Get the tile of a zoom level, rendering it on first use"""
+        tile = self.tiles.get(zoom_level, self.style)
+        if tile is not None:
+            return tile
+
+        zoom: float = ZoomLevels.get_zoom(zoom_level)
+        minor_size: float = self.get_spacing(zoom) * zoom
+        tile_size: float = self.get_tile_size(zoom)
+        # One pixel wider than the exact size, the next tile covers the rest
+        size: int = math.ceil(tile_size) + 1
+        tile = pygame.Surface((size, size))
+        tile.fill(self.style.background_color)
+        for i in range(round(tile_size / minor_size)):
+            color = (
+                self.style.major_line_color
+                if i % self.style.major_every == 0
+                else self.style.minor_line_color
+            )
+            pos: int = round(i * minor_size)
+            pygame.draw.line(tile, color, (pos, 0), (pos, size - 1))
+            pygame.draw.line(tile, color, (0, pos), (size - 1, pos))
+        self.tiles.put(zoom_level, self.style, tile)
+        return tile
+
+    def draw(self, win: pygame.Surface, offset, zoom_level: int) -> None:
+        """Fill the window with the grid for the given pan offset"""
+        zoom: float = ZoomLevels.get_zoom(zoom_level)
+        tile: pygame.Surface = self.get_tile(zoom_level)
+        tile_size: float = self.get_tile_size(zoom)
+        width, height = win.get_size()
+
+        # Window position of the axes, which also lie on a tile edge
+        origin_x: float = self.origin[0] * zoom + offset[0]
+        origin_y: float = self.origin[1] * zoom + offset[1]
+        first_x: int = math.floor(-origin_x / tile_size)
+        first_y: int = math.floor(-origin_y / tile_size)
+        columns: int = math.ceil(width / tile_size) + 1
+        rows: int = math.ceil(height / tile_size) + 1
+        win.blits(
+            [
+                (
+                    tile,
+                    (
+                        round(origin_x + (first_x + i) * tile_size),
+                        round(origin_y + (first_y + j) * tile_size),
+                    ),
+                )
+                for j in range(rows)
+                for i in range(columns)
+            ],
+            doreturn=False,
+        )
+
+        if 0 <= origin_x < width:
+            x: int = round(origin_x)
+            pygame.draw.line(win, self.style.axis_color, (x, 0), (x, height))
+        if 0 <= origin_y < height:
+            y: int = round(origin_y)
+            pygame.draw.line(win, self.style.axis_color, (0, y), (width, y))
@@ -0,0 +1,264 @@
+"""Evaluate a saved project without a display"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+from datalib import DataCache
+from enginelib import Columns, ExportKernel, Graph, InputKernel, Kernel
+from exportlib import FORMATS, ExportWriter
+from projectlib import ProjectFile
+from resultcachelib import ResultCache
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Evaluate a Node Based Graph Wizard project without a display"
+    )
+    parser.add_argument("project", help="project file to evaluate")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default="output",
+        help="directory of the result files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--input",
+        action="append",
+        default=[],
+        metavar="CARD=PATH",
+        help="read another file for an input card, given by title or ID prefix",
+    )
+    parser.add_argument(
+        "--report", metavar="PATH", help="also write the timings to a JSON file"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".nowi-cache",
+        help="directory of the cached card results (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        metavar="MB",
+        type=float,
+        default=1024,
+        help="size of the result cache in megabytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="evaluate every card again"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="evaluate chunk by chunk in one pass, for files larger than the memory",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        metavar="ROWS",
+        type=int,
+        default=65536,
+        help="rows per chunk when streaming (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="do not trace memory, which makes the evaluation faster",
+    )
+    return parser.parse_args(argv)
+
+
+def override_inputs(graph: Graph, overrides: List[str]) -> None:
+    """Point input cards at other files"""
+    for override in overrides:
+        card, _, path = override.partition("=")
+        matches: List[Kernel] = [
+            kernel
+            for card_id, kernel in graph.nodes.items()
+            if isinstance(kernel, InputKernel)
+            and (kernel.title == card or card_id.startswith(card))
+        ]
+        if len(matches) != 1:
+            raise ValueError(f"--input {card} matches {len(matches)} input cards")
+        matches[0].state = {**matches[0].state, "file": path}
+
+
+def get_result_path(output_dir: Path, kernel: Kernel, extension: str = ".txt") -> Path:
+    """Get the result file of a card"""
+    title: str = re.sub(r"[^\w-]+", "_", kernel.title).strip("_")
+    return output_dir.joinpath(f"{title}-{kernel.card_id[:8]}{extension}")
+
+
+def open_writer(graph: Graph, sink: Kernel, output_dir: Path) -> ExportWriter:
+    """Open the result file of a card
+
+    Export cards are written in their own format, under the name of the
+    file chosen in the card, other cards in the tab separated format the
+    input cards read. Every file goes to the output directory.
+    """
+    if isinstance(sink, ExportKernel):
+        export_format: str = sink.state.get("format", "TSV")
+        chosen_path: Path | None = sink.get_path()
+        path: Path = (
+            output_dir.joinpath(chosen_path.name)
+            if chosen_path is not None
+            else get_result_path(output_dir, sink, FORMATS.get(export_format, ".txt"))
+        )
+        return ExportWriter(
+            path,
+            export_format,
+            sink.state.get("compress", False),
+            graph.get_input_titles(sink),
+        )
+    return ExportWriter(get_result_path(output_dir, sink))
+
+
+def evaluate_results(
+    graph: Graph, sinks: List[Kernel], output_dir: Path, cache: ResultCache | None
+) -> List[Dict]:
+    """Evaluate and write the results of every sink"""
+    results: List[Dict] = []
+    # One result at a time, so only its inputs are held in memory
+    for sink in sinks:
+        columns: Columns = graph.evaluate([sink], cache)[sink.card_id]
+        writer: ExportWriter = open_writer(graph, sink, output_dir)
+        write_start: float = time.perf_counter()
+        try:
+            writer.write(columns)
+        except BaseException:
+            writer.abort()
+            raise
+        rows: int = writer.close()
+        results.append(
+            {
+                "card": sink.get_name(),
+                "file": str(writer.path),
+                "rows": rows,
+                "write_seconds": round(time.perf_counter() - write_start, 6),
+            }
+        )
+    return results
+
+
+def stream_results(
+    graph: Graph, sinks: List[Kernel], output_dir: Path, chunk_rows: int
+) -> List[Dict]:
+    """Write the results of every sink in one streamed pass over the data"""
+    writers: List[ExportWriter] = [
+        open_writer(graph, sink, output_dir) for sink in sinks
+    ]
+    write_seconds: List[float] = [0.0] * len(sinks)
+    try:
+        for outputs in graph.stream(sinks, chunk_rows):
+            for i, sink in enumerate(sinks):
+                write_start: float = time.perf_counter()
+                writers[i].write(outputs[sink.card_id])
+                write_seconds[i] += time.perf_counter() - write_start
+    except BaseException:
+        for writer in writers:
+            writer.abort()
+        raise
+    results: List[Dict] = []
+    for i, (sink, writer) in enumerate(zip(sinks, writers)):
+        write_start = time.perf_counter()
+        rows: int = writer.close()
+        results.append(
+            {
+                "card": sink.get_name(),
+                "file": str(writer.path),
+                "rows": rows,
+                "write_seconds": round(
+                    write_seconds[i] + time.perf_counter() - write_start, 6
+                ),
+            }
+        )
+    return results
+
+
+def main() -> int:
+    """Evaluate the results of a project and report the cost of every card"""
+    args = parse_args(sys.argv[1:])
+    if not args.no_memory:
+        tracemalloc.start()
+    start: float = time.perf_counter()
+
+    try:
+        graph = Graph.from_project(ProjectFile.read(Path(args.project)))
+        override_inputs(graph, args.input)
+        sinks: List[Kernel] = graph.get_sinks()
+        if not sinks:
+            raise ValueError("The project has no computed results")
+        cache: ResultCache | None = None
+        # Streamed results are never whole, so they are not cached
+        if not args.no_cache and not args.stream:
+            cache = ResultCache(Path(args.cache_dir), int(args.cache_size * 2**20))
+            # Input cards read their files through the same cache
+            DataCache.disk_cache = cache
+        output_dir = Path(args.output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        if args.stream:
+            results = stream_results(graph, sinks, output_dir, args.chunk_rows)
+        else:
+            results = evaluate_results(graph, sinks, output_dir, cache)
+    except (OSError, ValueError, KeyError) as error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 1
+
+    report: Dict = {
+        "project": args.project,
+        "seconds": round(time.perf_counter() - start, 6),
+        "cards": list(graph.timings.values()),
+        "results": results,
+        "cache": cache.get_stats() if cache is not None else None,
+        "traced_peak_bytes": (
+            tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else None
+        ),
+        # Kilobytes on Linux
+        "max_rss_bytes": (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+            if resource is not None
+            else None
+        ),
+    }
+
+    print(
+        f"Evaluated {len(graph.timings)} of {len(graph)} cards "
+        f"in {report['seconds']:.3f} s"
+    )
+    for timing in sorted(report["cards"], key=lambda x: x["seconds"], reverse=True):
+        peak: str = (
+            f"{timing['peak_bytes'] / 2**20:9.1f} MB peak"
+            if timing["peak_bytes"] is not None
+            else " " * 17
+        )
+        cached: str = " (cached)" if timing["cached"] else ""
+        print(f"  {timing['seconds'] * 1e3:10.1f} ms {peak}  {timing['card']}{cached}")
+    for result in results:
+        print(f"Wrote {result['rows']} rows of {result['card']} to {result['file']}")
+    if cache is not None:
+        stats: Dict = report["cache"]
+        print(
+            f"Result cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['size_bytes'] / 2**20:.1f} MB"
+        )
+    if report["max_rss_bytes"] is not None:
+        print(f"Peak resident memory: {report['max_rss_bytes'] / 2**20:.1f} MB")
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
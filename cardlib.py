@@ -1,277 +1,1034 @@
-import itertools
-from enum import Enum
-from pathlib import Path
-from tkinter import filedialog
-from typing import Dict, List, Tuple
-from uuid import uuid4
-
-import pygame
-
-from buttonlib import MetaButton, StandartButton
-from labellib import Label, MetaLabel
-from nodelib import MetaNode, Node
-
-
-class CardType(Enum):
-    """Enum for card types"""
-
-    INPUTCARD = 1
-
-
-class MetaCard:
-    """Boilerplate class for creating cards"""
-
-    data_path: Path = Path("data")
-    font_path: Path = data_path.joinpath("fonts")
-
-    highlight: bool = False
-    title_bar_height: int = 20
-
-    z_order_iter = itertools.count()
-
-    pygame.font.init()
-
-    def __init__(
-        self,
-        title,
-        width,
-        height,
-        coord_x,
-        coord_y,
-        card_border_color,
-        card_border_thickness,
-        title_bar_background_color,
-        title_bar_highlight_color,
-        title_bar_font_color,
-        body_background_color,
-        buttons,
-        labels,
-        nodes,
-    ):
-        self.uuid: str = str(uuid4())
-        self.z_order: int = next(self.z_order_iter)
-        self.surf: pygame.Surface = pygame.Surface((width, height))
-        self.title: str = title
-        self.width: int = width
-        self.height: int = height
-        self.coord_x: int = coord_x
-        self.coord_y: int = coord_y
-        self.card_border_color: Tuple[int, int, int] = card_border_color
-        self.card_border_thickness: int = card_border_thickness
-        self.title_bar_background_color: Tuple[
-            int, int, int
-        ] = title_bar_background_color
-        self.title_bar_highlight_color: Tuple[int, int, int] = title_bar_highlight_color
-        self.title_bar_font_color: Tuple[int, int, int] = title_bar_font_color
-        self.body_background_color: Tuple[int, int, int] = body_background_color
-        self.buttons: List[MetaButton] = buttons
-        self.labels: List[MetaLabel] = labels
-        self.nodes: List[MetaNode] = nodes
-
-        self.title_bar_font = pygame.font.Font(
-            self.font_path.joinpath("ConsolaMono-Bold.ttf").as_posix(), 10
-        )
-
-        self.file: str = ""
-
-    def __str__(self) -> str:
-        return f"Type: Card [{self.__class__.__name__}], Title: {self.title}, UUID: {self.uuid}, z_order: {self.z_order}"
-
-    def draw(self, win) -> None:
-        """New draw function"""
-
-        # Draw card border
-        pygame.draw.rect(
-            self.surf,
-            self.card_border_color,
-            (0, 0, self.width, self.height),
-            0,
-        )
-
-        # Draw title bar rectangle
-        pygame.draw.rect(
-            self.surf,
-            self.title_bar_background_color
-            if not self.highlight
-            else self.title_bar_highlight_color,
-            (
-                self.card_border_thickness,
-                self.card_border_thickness,
-                self.width - 2 * self.card_border_thickness,
-                self.title_bar_height,
-            ),
-            0,
-        )
-
-        # Draw title bar text
-        title_text = self.title_bar_font.render(
-            self.title, True, self.title_bar_font_color
-        )
-        self.surf.blit(title_text, (5, 5))
-
-        # Draw card body
-        pygame.draw.rect(
-            self.surf,
-            self.body_background_color,
-            (
-                self.card_border_thickness,
-                self.card_border_thickness + self.title_bar_height,
-                self.width - 2 * self.card_border_thickness,
-                self.height - 2 * self.card_border_thickness - self.title_bar_height,
-            ),
-            0,
-        )
-
-        # Draw non-hidden buttons if any exist
-        for button in self.buttons:
-            if not button.hidden:
-                button_render = button.draw()
-                self.surf.blit(button_render, (button.rel_coord_x, button.rel_coord_y))
-
-        # Draw non-hidden labels if any exist
-        for label in self.labels:
-            if not label.hidden:
-                label_render = label.draw()
-                self.surf.blit(label_render, (label.rel_coord_x, label.rel_coord_y))
-
-        for node in self.nodes:
-            node_render = node.draw()
-            self.surf.blit(node_render, (node.rel_coord_x, node.rel_coord_y))
-
-        win.blit(self.surf, (self.coord_x, self.coord_y))
-
-    def update_z_order_to_bring_front(self) -> None:
-        """Update z_order to bring card to front"""
-        # TODO: Only update z_order if card is not already at front
-        self.z_order = next(self.z_order_iter)
-
-    def update_card_pos(self, starting_pos, current_pos) -> None:
-        """Update Card Position"""
-        self.coord_x += current_pos[0] - starting_pos[0]
-        self.coord_y += current_pos[1] - starting_pos[1]
-
-    def get_rect(self) -> pygame.Rect:
-        """Get InputCard Rect"""
-        return pygame.Rect((self.coord_x, self.coord_y, self.width, self.height))
-
-    def get_button_rect(self, button_id) -> pygame.Rect:
-        """Get InputCard Rect"""
-        # TODO: Use a dictionary to store buttons
-        for button in self.buttons:
-            if button.uuid == button_id:
-                return pygame.Rect(
-                    (
-                        self.coord_x + button.rel_coord_x,
-                        self.coord_y + button.rel_coord_y,
-                        button.surf_width,
-                        button.surf_height,
-                    )
-                )
-        raise RuntimeError("Button not found")
-
-    def set_highlight(self, status) -> None:
-        """Set Highlight status of the card for various effects"""
-        self.highlight = status
-
-
-class InputCard(MetaCard):
-    """Input Card"""
-
-    width: int = 180
-    height: int = 600
-
-    card_border_color = (27, 38, 56)
-    card_border_thickness = 2
-    title_bar_background_color = (174, 18, 42)
-    title_bar_highlight_color = (210, 18, 42)
-    title_bar_font_color = (255, 255, 255)
-    body_background_color = (195, 193, 170)
-
-    def __init__(self, title, coord_x, coord_y):
-        self.buttons: List[MetaButton] = [
-            StandartButton(
-                self,
-                "Input File...",
-                10,
-                40,
-                False,
-                False,
-                callback=self.read_file,
-                callback_args=[],
-                callback_kwargs={},
-            ),
-            StandartButton(
-                self,
-                "Refresh",
-                10,
-                70,
-                False,
-                False,
-                callback=print,
-                callback_args=["Refresh button clicked"],
-                callback_kwargs={},
-            ),
-        ]
-
-        self.labels: List[MetaLabel] = [
-            Label(
-                "Test",
-                10,
-                100,
-            )
-        ]
-
-        self.nodes: List[MetaNode] = []
-
-        super().__init__(
-            title,
-            self.width,
-            self.height,
-            coord_x,
-            coord_y,
-            self.card_border_color,
-            self.card_border_thickness,
-            self.title_bar_background_color,
-            self.title_bar_highlight_color,
-            self.title_bar_font_color,
-            self.body_background_color,
-            self.buttons,
-            self.labels,
-            self.nodes,
-        )
-
-    def read_file(self):
-        """Read file"""
-
-        file_path: Path = Path(filedialog.askopenfilename(defaultextension=".txt"))
-
-        if not file_path.exists:
-            raise FileNotFoundError(f"File {file_path} not found")
-
-        row_number: int = 0
-        titles: List[str] = []
-        data: Dict[int, List[float]] = {}
-        with open(file_path, "r", encoding="ISO-8859-9") as file_handle:
-            for row in file_handle:
-                if row_number == 0:
-                    titles = row.split("\t")
-                    titles = [title.strip() for title in titles if title != "\n"]
-                else:
-                    data[row_number] = [
-                        float(value) for value in row.split("\t") if value != "\n"
-                    ]
-                row_number += 1
-
-        # Hide all buttons
-        for button in self.buttons:
-            button.hide()
-
-        # Hide all labels
-        for label in self.labels:
-            label.hide()
-
-        for i, title in enumerate(titles):
-            self.nodes.append(Node(title, 150, 30 + i * 20))
-
-        for i, title in enumerate(titles):
-            self.labels.append(Label(title, 10, 30 + i * 20))
+import itertools
+from concurrent.futures import Future
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import pygame
+
+from buttonlib import MetaButton, StandartButton
+from datalib import DataCache, DataLoader, DataPreview, DataTable
+from debuglib import get_surface_size_bytes
+from dialoglib import FileDialog
+from enginelib import ExportKernel, Graph, Kernel
+from exportlib import FORMATS, Exporter
+from fontlib import FontCache
+from historylib import History, LoadDataCommand
+from idlib import IdAllocator
+from labellib import Label, MetaLabel
+from nodelib import InputNode, MetaNode, Node, NodeKind
+from projectlib import ProjectFile
+from stylelib import CardStyle
+from registrylib import WidgetRegistry
+from textboxlib import MetaTextBox, TextBox
+from zoomlib import ZoomCache, ZoomLevels
+
+if TYPE_CHECKING:
+    from app import App
+
+
+class MetaCard:
+    """Boilerplate class for creating cards"""
+
+    __slots__ = (
+        "widget_id",
+        "z_order",
+        "surf",
+        "title",
+        "width",
+        "height",
+        "coord_x",
+        "coord_y",
+        "style",
+        "highlight",
+        "buttons",
+        "labels",
+        "nodes",
+        "text_boxes",
+        "title_bar_font",
+        "file",
+        "rect",
+        "registry",
+        "dirty",
+        "render_version",
+        "zoom_cache",
+        "ports_version",
+    )
+
+    title_bar_height: int = 20
+
+    z_order_iter = itertools.count()
+
+    def __init__(
+        self,
+        title,
+        width,
+        height,
+        coord_x,
+        coord_y,
+        style: CardStyle,
+        buttons,
+        labels,
+        nodes,
+    ):
+        self.widget_id: int = IdAllocator.next_id()
+        self.z_order: int = next(self.z_order_iter)
+        self.surf: pygame.Surface = pygame.Surface((width, height))
+        self.title: str = title
+        self.width: int = width
+        self.height: int = height
+        self.coord_x: int = coord_x
+        self.coord_y: int = coord_y
+        self.style: CardStyle = style
+        self.highlight: bool = False
+        self.buttons: List[MetaButton] = buttons
+        self.labels: List[MetaLabel] = labels
+        self.nodes: List[MetaNode] = nodes
+        self.text_boxes: List[MetaTextBox] = []
+
+        self.rect: pygame.Rect | None = None
+        self.registry: WidgetRegistry = WidgetRegistry(self)
+        for button in self.buttons:
+            self.registry.register(button, button.get_rel_rect())
+        for node in self.nodes:
+            self.registry.register(node, node.get_rel_rect())
+
+        self.title_bar_font: pygame.font.Font = FontCache.get_font(
+            "ConsolaMono-Bold.ttf", 10
+        )
+
+        self.file: str = ""
+
+        # The card surface is only rendered again after something changed, and
+        # scaled renders are kept per zoom level
+        self.dirty: bool = True
+        self.render_version: int = 0
+        self.zoom_cache: ZoomCache = ZoomCache()
+
+        # Changes whenever the canvas position of a node may have changed
+        self.ports_version: int = 0
+
+    def __str__(self) -> str:
+        return f"Type: Card [{self.__class__.__name__}], Title: {self.title}, ID: {self.widget_id}, z_order: {self.z_order}"
+
+    def mark_dirty(self) -> None:
+        """Request the card surface to be rendered again before the next draw"""
+        self.dirty = True
+
+    def draw(
+        self, win, offset=(0, 0), zoom_level: int = 0, fast: bool = False
+    ) -> None:
+        """Draw the card on the window at the given pan offset and zoom level
+
+        Fast drawing, used while the canvas or a card is dragged, reuses the
+        last render as it is and never renders or scales the card.
+        """
+        zoom: float = ZoomLevels.get_zoom(zoom_level)
+        screen_rect = pygame.Rect(
+            self.coord_x * zoom + offset[0],
+            self.coord_y * zoom + offset[1],
+            self.width * zoom,
+            self.height * zoom,
+        )
+        if not screen_rect.colliderect(win.get_rect()):
+            return
+        if fast:
+            self.draw_fast(win, screen_rect, zoom_level)
+            return
+        self.prepare()
+
+        if zoom_level == 0:
+            self.render()
+            win.blit(self.surf, screen_rect)
+            return
+
+        if ZoomLevels.is_title_only(zoom_level):
+            version = ("title", self.title, self.highlight)
+        else:
+            self.render()
+            version = self.render_version
+        zoomed_surf = self.zoom_cache.get(zoom_level, version)
+        if zoomed_surf is None:
+            if ZoomLevels.is_title_only(zoom_level):
+                zoomed_surf = self.render_title_only(screen_rect.size)
+            else:
+                zoomed_surf = pygame.transform.smoothscale(self.surf, screen_rect.size)
+            self.zoom_cache.put(zoom_level, version, zoomed_surf)
+        win.blit(zoomed_surf, screen_rect)
+
+    def draw_fast(self, win, screen_rect: pygame.Rect, zoom_level: int) -> None:
+        """Draw the last render of the card, or its title only if there is none"""
+        if zoom_level == 0 and self.render_version:
+            win.blit(self.surf, screen_rect)
+            return
+        surf = self.zoom_cache.get_stale(zoom_level)
+        if surf is None:
+            # Kept as a render of no version, so the card is rendered in full
+            # once the motion stops
+            surf = self.render_title_only(screen_rect.size)
+            self.zoom_cache.put(zoom_level, None, surf)
+        win.blit(surf, screen_rect)
+
+    def render_title_only(self, size) -> pygame.Surface:
+        """Render a simplified card showing the title only"""
+        surf = pygame.Surface(size)
+        surf.fill(self.style.card_border_color)
+        surf.fill(
+            self.style.title_bar_background_color
+            if not self.highlight
+            else self.style.title_bar_highlight_color,
+            surf.get_rect().inflate(-2, -2),
+        )
+        title_text = self.title_bar_font.render(
+            self.title, True, self.style.title_bar_font_color
+        )
+        if title_text.get_height() < surf.get_height():
+            surf.blit(title_text, (2, 2), area=surf.get_rect().inflate(-4, -4))
+        return surf
+
+    def render(self) -> None:
+        """Render the card surface if it changed since the last render"""
+        if not self.dirty:
+            return
+        self.dirty = False
+        self.render_version += 1
+
+        # Draw card border
+        pygame.draw.rect(
+            self.surf,
+            self.style.card_border_color,
+            (0, 0, self.width, self.height),
+            0,
+        )
+
+        # Draw title bar rectangle
+        pygame.draw.rect(
+            self.surf,
+            self.style.title_bar_background_color
+            if not self.highlight
+            else self.style.title_bar_highlight_color,
+            (
+                self.style.card_border_thickness,
+                self.style.card_border_thickness,
+                self.width - 2 * self.style.card_border_thickness,
+                self.title_bar_height,
+            ),
+            0,
+        )
+
+        # Draw title bar text
+        title_text = self.title_bar_font.render(
+            self.title, True, self.style.title_bar_font_color
+        )
+        self.surf.blit(title_text, (5, 5))
+
+        # Draw card body
+        pygame.draw.rect(
+            self.surf,
+            self.style.body_background_color,
+            (
+                self.style.card_border_thickness,
+                self.style.card_border_thickness + self.title_bar_height,
+                self.width - 2 * self.style.card_border_thickness,
+                self.height
+                - 2 * self.style.card_border_thickness
+                - self.title_bar_height,
+            ),
+            0,
+        )
+
+        # Draw non-hidden buttons if any exist
+        for button in self.buttons:
+            if not button.hidden:
+                button_render = button.draw()
+                self.surf.blit(button_render, (button.rel_coord_x, button.rel_coord_y))
+
+        # Draw non-hidden labels if any exist
+        for label in self.labels:
+            if not label.hidden:
+                label_render = label.draw()
+                self.surf.blit(label_render, (label.rel_coord_x, label.rel_coord_y))
+
+        # Nodes share sprites from the atlas, so draw them in a single batch
+        self.surf.blits(
+            [
+                (node.draw(), (node.rel_coord_x, node.rel_coord_y))
+                for node in self.nodes
+            ],
+            False,
+        )
+
+        # Draw non-hidden text boxes if any exist
+        for text_box in self.text_boxes:
+            if not text_box.hidden:
+                self.surf.blit(
+                    text_box.draw(), (text_box.rel_coord_x, text_box.rel_coord_y)
+                )
+
+        self.draw_content()
+
+    def draw_content(self) -> None:
+        """Draw card specific content on top of the widgets"""
+
+    def prepare(self) -> None:
+        """Get ready to be drawn, called only while the card is visible"""
+
+    def get_state(self) -> Dict:
+        """Get the card specific state to save in a project"""
+        return {}
+
+    def set_state(self, state: Dict) -> None:
+        """Restore the card specific state saved in a project"""
+
+    def release(self) -> None:
+        """Release shared resources when the card is removed"""
+
+    def can_scroll(self) -> bool:
+        """Whether the card has content to scroll"""
+        return False
+
+    def scroll(self, rows: int) -> None:
+        """Scroll the card content by the given number of rows"""
+
+    def update_z_order_to_bring_front(self) -> None:
+        """Update z_order to bring card to front"""
+        # TODO: Only update z_order if card is not already at front
+        self.z_order = next(self.z_order_iter)
+
+    def update_card_pos(self, starting_pos, current_pos) -> None:
+        """Update Card Position"""
+        self.coord_x += current_pos[0] - starting_pos[0]
+        self.coord_y += current_pos[1] - starting_pos[1]
+        self.invalidate_rects()
+        self.ports_version += 1
+
+    def invalidate_rects(self) -> None:
+        """Drop the cached rects of the card and its widgets after it moved"""
+        self.rect = None
+        self.registry.invalidate()
+
+    def get_rect(self) -> pygame.Rect:
+        """Get InputCard Rect
+
+        The returned rect is cached, callers must not modify it.
+        """
+        if self.rect is None:
+            self.rect = pygame.Rect(
+                (self.coord_x, self.coord_y, self.width, self.height)
+            )
+        return self.rect
+
+    def get_button_rect(self, button_id) -> pygame.Rect:
+        """Get the rect of one of the buttons of the card"""
+        return self.registry.get_rect(button_id)
+
+    def get_node_rect(self, node_id) -> pygame.Rect:
+        """Get the rect of one of the nodes of the card"""
+        return self.registry.get_rect(node_id)
+
+    def get_button_at(self, pos) -> MetaButton | None:
+        """Get the visible button at the given canvas position"""
+        for button in self.buttons:
+            if not button.hidden and button.get_rect().collidepoint(pos):
+                return button
+        return None
+
+    def get_node_at(self, pos) -> MetaNode | None:
+        """Get the node at the given canvas position"""
+        for node in self.nodes:
+            if self.get_node_rect(node.widget_id).collidepoint(pos):
+                return node
+        return None
+
+    def get_port_pos(self, port: str, kind: NodeKind) -> Tuple[float, float]:
+        """Get the canvas position wires of a port are attached to
+
+        Ports without a node are anchored to the side of the title bar.
+        """
+        for node in self.nodes:
+            if node.label == port and node.kind == kind:
+                center_x, center_y = node.get_rel_center()
+                return self.coord_x + center_x, self.coord_y + center_y
+        return self.get_port_anchor(kind)
+
+    def get_port_anchor(self, kind: NodeKind) -> Tuple[float, float]:
+        """Get the fallback position for ports without a visible node"""
+        return (
+            self.coord_x + (self.width if kind == NodeKind.OUTPUT else 0),
+            self.coord_y + self.title_bar_height // 2,
+        )
+
+    def get_text_box_at(self, pos) -> MetaTextBox | None:
+        """Get the visible text box at the given screen position"""
+        for text_box in self.text_boxes:
+            if not text_box.hidden and text_box.get_rect().collidepoint(pos):
+                return text_box
+        return None
+
+    def set_highlight(self, status) -> None:
+        """Set Highlight status of the card for various effects"""
+        if status != self.highlight:
+            self.highlight = status
+            self.mark_dirty()
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Get the bytes held by the card and its widgets, by kind
+
+        Node sprites and fonts are shared by every card and not included.
+        """
+        widget_surfaces: List[pygame.Surface | None] = []
+        for button in self.buttons:
+            widget_surfaces += [button.surf, button.text_surf]
+        widget_surfaces += [label.surf for label in self.labels]
+        widget_surfaces += [text_box.surf for text_box in self.text_boxes]
+        return {
+            "surface": get_surface_size_bytes(self.surf),
+            "zoom_cache": self.zoom_cache.get_size_bytes(),
+            "widgets": sum(get_surface_size_bytes(surf) for surf in widget_surfaces),
+        }
+
+
+class InputCard(MetaCard):
+    """Input Card"""
+
+    __slots__ = (
+        "columns",
+        "column_rows",
+        "visible_columns",
+        "first_visible_row",
+        "filter_box",
+        "row_labels",
+        "row_nodes",
+        "data_key",
+        "pending_file",
+        "load_future",
+        "preview",
+        "record_load",
+        "status_label",
+    )
+
+    default_width: int = 180
+    default_height: int = 600
+
+    list_top: int = 50
+    row_height: int = 20
+    label_coord_x: int = 10
+    node_coord_x: int = 150
+    scroll_bar_width: int = 4
+    scroll_bar_color: Tuple[int, int, int] = (120, 120, 120)
+
+    card_style: CardStyle = CardStyle(
+        card_border_color=(27, 38, 56),
+        card_border_thickness=2,
+        title_bar_background_color=(174, 18, 42),
+        title_bar_highlight_color=(210, 18, 42),
+        title_bar_font_color=(255, 255, 255),
+        body_background_color=(195, 193, 170),
+    )
+
+    def __init__(self, title, coord_x, coord_y):
+        self.buttons: List[MetaButton] = [
+            StandartButton(
+                self,
+                "Input File...",
+                10,
+                40,
+                False,
+                False,
+                callback=self.read_file,
+                callback_args=[],
+                callback_kwargs={},
+            ),
+            StandartButton(
+                self,
+                "Refresh",
+                10,
+                70,
+                False,
+                False,
+                callback=print,
+                callback_args=["Refresh button clicked"],
+                callback_kwargs={},
+            ),
+        ]
+
+        # Shown with the file buttons, e.g. why the last file could not be read
+        self.status_label: MetaLabel = Label(
+            "Test",
+            10,
+            100,
+        )
+        self.labels: List[MetaLabel] = [self.status_label]
+
+        self.nodes: List[MetaNode] = []
+
+        # Every column of the file, and the indices of those passing the filter
+        self.columns: List[str] = []
+        self.column_rows: Dict[str, int] = {}
+        self.visible_columns: List[int] = []
+        self.first_visible_row: int = 0
+
+        # Widgets are only materialized for the rows that fit in the card and
+        # are reused while scrolling
+        self.row_labels: List[MetaLabel] = []
+        self.row_nodes: List[MetaNode] = []
+
+        # Key of the loaded table in the shared data cache
+        self.data_key: str | None = None
+        # File of a project that is only read once the card is drawn or its
+        # data is needed
+        self.pending_file: str = ""
+        self.load_future: Future | None = None
+        # Sample of a chosen file, listed until the whole file is loaded
+        self.preview: DataPreview | None = None
+        # Whether loading the pending file is recorded in the undo history
+        self.record_load: bool = False
+
+        super().__init__(
+            title,
+            self.default_width,
+            self.default_height,
+            coord_x,
+            coord_y,
+            self.card_style,
+            self.buttons,
+            self.labels,
+            self.nodes,
+        )
+
+        self.filter_box: MetaTextBox = TextBox(
+            self, "Filter...", 10, 25, self.width - 20, self.set_filter
+        )
+        self.filter_box.hide()
+        self.text_boxes.append(self.filter_box)
+        self.registry.register(self.filter_box, self.filter_box.get_rel_rect())
+
+    def read_file(self):
+        """Read file"""
+
+        file_name: str = FileDialog.ask_open_filename(".txt")
+        if not file_name:
+            return
+        file_path: Path = Path(file_name)
+
+        # The preview is listed right away while the file loads in the
+        # background, so a wrong file is noticed before it is parsed
+        try:
+            preview: DataPreview = DataPreview.read(file_path)
+        except (OSError, ValueError) as error:
+            self.show_load_error(file_name, error)
+            return
+        self.defer_file(str(file_path), preview.titles)
+        self.preview = preview
+        self.record_load = True
+        self.update_visible_rows()
+        self.load_pending_file()
+
+    def set_data(self, key: str | None) -> None:
+        """List the columns of a table loaded in the data cache
+
+        Without a table the card goes back to asking for a file.
+        """
+        if key is not None:
+            DataCache.acquire(key)
+        if self.data_key is not None:
+            DataCache.release(self.data_key)
+        self.data_key = key
+        self.pending_file = ""
+        self.load_future = None
+        self.preview = None
+        self.record_load = False
+        table = DataCache.get(key) if key is not None else None
+        self.file = table.path if table is not None else ""
+
+        # The file buttons and labels are only shown while no file is loaded
+        for button in self.buttons:
+            if table is not None:
+                button.hide()
+            else:
+                button.show()
+        for label in self.labels:
+            if table is not None:
+                label.hide()
+            else:
+                label.show()
+
+        self.set_columns(table.titles if table is not None else [])
+        if table is not None:
+            self.filter_box.show()
+        else:
+            self.filter_box.hide()
+        self.mark_dirty()
+
+    def get_table(self) -> DataTable | None:
+        """Get the loaded table, reading a deferred file right away"""
+        if self.pending_file:
+            self.load_pending_file(wait=True)
+        return DataCache.get(self.data_key) if self.data_key is not None else None
+
+    def load_pending_file(self, wait: bool = False) -> None:
+        """Read the deferred file in the background, or wait for it"""
+        try:
+            if self.load_future is None:
+                # Files loaded by another card are not read again
+                table = DataCache.get(DataTable.get_key(Path(self.pending_file)))
+                if table is None and not wait:
+                    self.load_future = DataLoader.request(Path(self.pending_file))
+                    return
+                if table is None:
+                    table = DataCache.load(Path(self.pending_file))
+            elif wait or self.load_future.done():
+                table = DataCache.add(self.load_future.result())
+            else:
+                return
+        except (OSError, ValueError) as error:
+            self.show_load_error(self.pending_file, error)
+            return
+
+        if self.record_load:
+            # Recorded before set_data releases the previous table, so the
+            # command can still read its column titles. Loads finish in the
+            # background, so they never join the gesture in progress
+            History.record_separately(LoadDataCommand(self, self.data_key, table.key))
+        # Keep the filter and scroll position restored from the project
+        filter_text: str = self.filter_box.text
+        first_visible_row: int = self.first_visible_row
+        self.set_data(table.key)
+        self.filter_box.set_text(filter_text)
+        self.scroll(first_visible_row)
+
+    def show_load_error(self, file: str, error: Exception) -> None:
+        """Go back to the loaded table, or to the file buttons, and show why"""
+        print(f"Could not read {file}: {error}")
+        # Also drops the pending file and the preview
+        self.set_data(self.data_key)
+        self.status_label.set_label(
+            "File not found"
+            if isinstance(error, FileNotFoundError)
+            else "Could not read file"
+        )
+
+    def prepare(self) -> None:
+        if self.pending_file:
+            self.load_pending_file()
+
+    def get_state(self) -> Dict:
+        return {
+            "file": self.file,
+            "columns": self.columns,
+            "filter": self.filter_box.text,
+            "first_visible_row": self.first_visible_row,
+        }
+
+    def set_state(self, state: Dict) -> None:
+        if not state.get("file"):
+            return
+        # The saved column titles are listed right away, the file itself is
+        # read when the card is first drawn or its data is needed
+        self.defer_file(state["file"], state.get("columns", []))
+        self.filter_box.set_text(state.get("filter", ""))
+        self.scroll(state.get("first_visible_row", 0))
+
+    def defer_file(self, file: str, columns: List[str]) -> None:
+        """List the columns of a file that is loaded later"""
+        self.file = file
+        self.pending_file = file
+        self.load_future = None
+        self.preview = None
+        self.record_load = False
+        for button in self.buttons:
+            button.hide()
+        for label in self.labels:
+            label.hide()
+        self.set_columns(columns)
+        self.filter_box.show()
+        self.mark_dirty()
+
+    def release(self) -> None:
+        if self.data_key is not None:
+            DataCache.release(self.data_key)
+            self.data_key = None
+        self.pending_file = ""
+        self.load_future = None
+        self.preview = None
+
+    def get_row_capacity(self) -> int:
+        """Get the number of rows that fit in the column list"""
+        return (
+            self.height - self.list_top - self.style.card_border_thickness
+        ) // self.row_height
+
+    def get_port_pos(self, port: str, kind: NodeKind) -> Tuple[float, float]:
+        """Get the canvas position wires of a column are attached to
+
+        Columns scrolled out of the list are pinned to its top or bottom edge.
+        """
+        row = self.column_rows.get(port)
+        if kind != NodeKind.OUTPUT or row is None:
+            return self.get_port_anchor(kind)
+        visible_row: int = min(
+            max(row - self.first_visible_row, 0), self.get_row_capacity() - 1
+        )
+        node_size: int = Node.node_style.node_size
+        return (
+            self.coord_x + self.node_coord_x + node_size // 2,
+            self.coord_y
+            + self.list_top
+            + visible_row * self.row_height
+            + node_size // 2,
+        )
+
+    def set_columns(self, columns: List[str]) -> None:
+        """Replace the column list"""
+        self.columns = columns
+        self.filter_box.text = ""
+        self.filter_box.mark_dirty()
+        self.set_filter("")
+
+    def set_filter(self, text: str) -> None:
+        """Only list the columns whose name contains the given text"""
+        needle: str = text.casefold()
+        self.visible_columns = [
+            i for i, column in enumerate(self.columns) if needle in column.casefold()
+        ]
+        self.column_rows = {
+            self.columns[column_index]: row
+            for row, column_index in enumerate(self.visible_columns)
+        }
+        self.first_visible_row = 0
+        self.update_visible_rows()
+
+    def get_memory_usage(self) -> Dict[str, int]:
+        """Get the bytes held by the card, including its loaded table"""
+        usage: Dict[str, int] = super().get_memory_usage()
+        table = DataCache.get(self.data_key) if self.data_key is not None else None
+        usage["data"] = table.get_size_bytes() if table is not None else 0
+        return usage
+
+    def can_scroll(self) -> bool:
+        """Whether the column list is longer than the card"""
+        return len(self.visible_columns) > self.get_row_capacity()
+
+    def scroll(self, rows: int) -> None:
+        """Scroll the column list by the given number of rows"""
+        max_first_row: int = max(
+            0, len(self.visible_columns) - self.get_row_capacity()
+        )
+        first_visible_row: int = min(
+            max(0, self.first_visible_row + rows), max_first_row
+        )
+        if first_visible_row != self.first_visible_row:
+            self.first_visible_row = first_visible_row
+            self.update_visible_rows()
+
+    def update_visible_rows(self) -> None:
+        """Point the row widgets at the columns in the scroll window"""
+        window: List[int] = self.visible_columns[
+            self.first_visible_row : self.first_visible_row + self.get_row_capacity()
+        ]
+
+        # Grow the widget pool up to the number of visible rows
+        for i in range(len(self.row_labels), len(window)):
+            coord_y: int = self.list_top + i * self.row_height
+            label = Label("", self.label_coord_x, coord_y)
+            self.row_labels.append(label)
+            self.labels.append(label)
+            node = Node("", self.node_coord_x, coord_y)
+            self.row_nodes.append(node)
+            self.registry.register(node, node.get_rel_rect())
+
+        # Ranges come from the statistics gathered while the file was read, or
+        # from the sampled rows of a preview, marked as approximate
+        table = DataCache.get(self.data_key) if self.data_key is not None else None
+        for label, node, column_index in zip(self.row_labels, self.row_nodes, window):
+            column: str = self.columns[column_index]
+            column_stats = table.stats.get(column) if table is not None else None
+            if self.preview is not None:
+                label.set_label(self.get_preview_text(self.preview, column))
+            elif column_stats is not None and column_stats.count:
+                label.set_label(
+                    f"{column} {column_stats.min:.3g}..{column_stats.max:.3g}"
+                )
+            else:
+                label.set_label(column)
+            label.show()
+            node.label = self.columns[column_index]
+        for label in self.row_labels[len(window) :]:
+            label.hide()
+        self.nodes[:] = self.row_nodes[: len(window)]
+        self.ports_version += 1
+        self.mark_dirty()
+
+    @staticmethod
+    def get_preview_text(preview: DataPreview, column: str) -> str:
+        """Get the row text of a column in a preview"""
+        value_range = preview.get_range(column)
+        if value_range is None:
+            return f"{column} {preview.types.get(column, '')}".rstrip()
+        return f"{column} ~{value_range[0]:.3g}..{value_range[1]:.3g}"
+
+    def draw_content(self) -> None:
+        """Draw the scroll bar of the column list"""
+        row_capacity: int = self.get_row_capacity()
+        if len(self.visible_columns) <= row_capacity:
+            return
+        list_height: int = row_capacity * self.row_height
+        bar_height: int = max(
+            10, list_height * row_capacity // len(self.visible_columns)
+        )
+        bar_coord_y: int = self.list_top + (list_height - bar_height) * (
+            self.first_visible_row
+        ) // (len(self.visible_columns) - row_capacity)
+        pygame.draw.rect(
+            self.surf,
+            self.scroll_bar_color,
+            (
+                self.width
+                - self.style.card_border_thickness
+                - self.scroll_bar_width
+                - 1,
+                bar_coord_y,
+                self.scroll_bar_width,
+                bar_height,
+            ),
+        )
+
+
+class MathCard(MetaCard):
+    """Card combining two columns element-wise"""
+
+    __slots__ = ("operator", "operator_button")
+
+    default_width: int = 180
+    default_height: int = 110
+
+    operators: List[str] = ["+", "-", "*", "/"]
+
+    card_style: CardStyle = CardStyle(
+        card_border_color=(27, 38, 56),
+        card_border_thickness=2,
+        title_bar_background_color=(38, 110, 70),
+        title_bar_highlight_color=(48, 140, 90),
+        title_bar_font_color=(255, 255, 255),
+        body_background_color=(195, 193, 170),
+    )
+
+    def __init__(self, title, coord_x, coord_y):
+        self.operator: str = self.operators[0]
+
+        self.operator_button: MetaButton = StandartButton(
+            self,
+            f"A {self.operator} B",
+            55,
+            45,
+            False,
+            False,
+            callback=self.next_operator,
+            callback_args=[],
+            callback_kwargs={},
+        )
+
+        self.buttons: List[MetaButton] = [self.operator_button]
+
+        self.labels: List[MetaLabel] = [
+            Label("A", 24, 34),
+            Label("B", 24, 74),
+            Label("Result", 106, 54),
+        ]
+
+        self.nodes: List[MetaNode] = [
+            InputNode("A", 4, 36),
+            InputNode("B", 4, 76),
+            Node("Result", 160, 56),
+        ]
+
+        super().__init__(
+            title,
+            self.default_width,
+            self.default_height,
+            coord_x,
+            coord_y,
+            self.card_style,
+            self.buttons,
+            self.labels,
+            self.nodes,
+        )
+
+    def next_operator(self) -> None:
+        """Switch to the next operator"""
+        self.operator = self.operators[
+            (self.operators.index(self.operator) + 1) % len(self.operators)
+        ]
+        self.operator_button.set_text(f"A {self.operator} B")
+
+    def get_state(self) -> Dict:
+        return {"operator": self.operator}
+
+    def set_state(self, state: Dict) -> None:
+        if state.get("operator") in self.operators:
+            self.operator = state["operator"]
+            self.operator_button.set_text(f"A {self.operator} B")
+
+
+class ExportCard(MetaCard):
+    """Card writing the connected columns to a file"""
+
+    __slots__ = (
+        "app",
+        "export_format",
+        "compress",
+        "format_button",
+        "compress_button",
+        "status_label",
+        "export_future",
+    )
+
+    default_width: int = 180
+    default_height: int = 205
+
+    card_style: CardStyle = CardStyle(
+        card_border_color=(27, 38, 56),
+        card_border_thickness=2,
+        title_bar_background_color=(40, 70, 140),
+        title_bar_highlight_color=(50, 90, 180),
+        title_bar_font_color=(255, 255, 255),
+        body_background_color=(195, 193, 170),
+    )
+
+    def __init__(self, title, coord_x, coord_y):
+        self.file: str = ""
+        self.export_format: str = "TSV"
+        self.compress: bool = False
+        # Application whose graph is exported, set when the card is registered
+        self.app: "App | None" = None
+        # Export running on the worker thread of the exporter
+        self.export_future: Future | None = None
+
+        self.format_button: MetaButton = StandartButton(
+            self,
+            self.export_format,
+            10,
+            120,
+            False,
+            False,
+            callback=self.next_format,
+            callback_args=[],
+            callback_kwargs={},
+        )
+        self.compress_button: MetaButton = StandartButton(
+            self,
+            "Plain",
+            90,
+            120,
+            False,
+            False,
+            callback=self.toggle_compress,
+            callback_args=[],
+            callback_kwargs={},
+        )
+
+        self.buttons: List[MetaButton] = [
+            self.format_button,
+            self.compress_button,
+            StandartButton(
+                self,
+                "Export...",
+                10,
+                150,
+                False,
+                False,
+                callback=self.export,
+                callback_args=[],
+                callback_kwargs={},
+            ),
+        ]
+
+        self.status_label: MetaLabel = Label("", 10, 180)
+        self.labels: List[MetaLabel] = [
+            Label(f"Column {port}", 24, 14 + 20 * int(port))
+            for port in ExportKernel.inputs
+        ] + [self.status_label]
+
+        self.nodes: List[MetaNode] = [
+            InputNode(port, 4, 16 + 20 * int(port)) for port in ExportKernel.inputs
+        ]
+
+        super().__init__(
+            title,
+            self.default_width,
+            self.default_height,
+            coord_x,
+            coord_y,
+            self.card_style,
+            self.buttons,
+            self.labels,
+            self.nodes,
+        )
+
+    def next_format(self) -> None:
+        """Switch to the next export format"""
+        formats: List[str] = list(FORMATS)
+        self.export_format = formats[
+            (formats.index(self.export_format) + 1) % len(formats)
+        ]
+        self.format_button.set_text(self.export_format)
+
+    def toggle_compress(self) -> None:
+        """Switch gzip compression of the exported file on or off"""
+        self.compress = not self.compress
+        self.compress_button.set_text("Gzip" if self.compress else "Plain")
+
+    def set_status(self, text: str) -> None:
+        """Show the progress of the export"""
+        self.status_label.set_label(text)
+        self.mark_dirty()
+
+    def export(self) -> None:
+        """Ask for a file and write the connected columns to it in the background"""
+        if self.export_future is not None or self.app is None:
+            return
+        extension: str = FORMATS[self.export_format] + (".gz" if self.compress else "")
+        file_name: str = FileDialog.ask_save_filename(extension)
+        if not file_name:
+            return
+        self.file = file_name
+
+        # The graph is a copy of the current state, so the cards can be edited
+        # while the export runs
+        graph: Graph = Graph.from_project(ProjectFile.to_dict(self.app))
+        kernel: Kernel = graph.nodes[IdAllocator.get_uuid(self.widget_id)]
+        self.export_future = Exporter.request(
+            graph, kernel, Path(file_name), self.export_format, self.compress
+        )
+        self.set_status("Exporting...")
+
+    def release(self) -> None:
+        self.app = None
+
+    def prepare(self) -> None:
+        if self.export_future is None or not self.export_future.done():
+            return
+        try:
+            row_count: int = self.export_future.result()
+        # The export ran on a worker thread, whatever it raised must not stop
+        # the main loop
+        except Exception as error:  # pylint: disable=broad-except
+            print(f"Could not export to {self.file}: {error}")
+            self.set_status("Export failed")
+        else:
+            self.set_status(f"Wrote {row_count} rows")
+        self.export_future = None
+
+    def get_state(self) -> Dict:
+        return {
+            "file": self.file,
+            "format": self.export_format,
+            "compress": self.compress,
+        }
+
+    def set_state(self, state: Dict) -> None:
+        self.file = state.get("file", "")
+        if state.get("format") in FORMATS:
+            self.export_format = state["format"]
+            self.format_button.set_text(self.export_format)
+        self.compress = bool(state.get("compress", False))
+        self.compress_button.set_text("Gzip" if self.compress else "Plain")
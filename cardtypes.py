@@ -0,0 +1,44 @@
+import importlib
+from enum import Enum
+from typing import Dict, Tuple
+
+from startuplib import StartupProfiler
+
+
+class CardType(Enum):
+    """Enum for card types"""
+
+    INPUTCARD = 1
+    MATHCARD = 2
+    EXPORTCARD = 3
+
+
+class CardClasses:
+    """Card classes by type, imported from their modules on first use"""
+
+    modules: Dict[CardType, Tuple[str, str]] = {
+        CardType.INPUTCARD: ("cardlib", "InputCard"),
+        CardType.MATHCARD: ("cardlib", "MathCard"),
+        CardType.EXPORTCARD: ("cardlib", "ExportCard"),
+    }
+
+    loaded: Dict[CardType, type] = {}
+
+    @classmethod
+    def get(cls, card_type: CardType) -> type:
+        """Get the class implementing a card type"""
+        card_class = cls.loaded.get(card_type)
+        if card_class is None:
+            module_name, class_name = cls.modules[card_type]
+            with StartupProfiler.measure(f"import {module_name}"):
+                card_class = getattr(importlib.import_module(module_name), class_name)
+            cls.loaded[card_type] = card_class
+        return card_class
+
+    @classmethod
+    def get_type(cls, card) -> CardType:
+        """Get the type of a card instance"""
+        for card_type, (_, class_name) in cls.modules.items():
+            if card.__class__.__name__ == class_name:
+                return card_type
+        raise TypeError(f"Unknown card class {card.__class__.__name__}")
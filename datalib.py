@@ -0,0 +1,322 @@
+import random
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from resultcachelib import ResultCache
+from statslib import ColumnStats
+
+
+class DataTable:
+    """Columns of a tab separated file, each kept in a compact float array"""
+
+    __slots__ = ("key", "path", "titles", "columns", "row_count", "stats")
+
+    # Rows parsed between two updates of the column statistics
+    chunk_rows: int = 4096
+    # Changing what is stored of a table has to change its version, so tables
+    # cached on disk by the previous version are not used
+    version: int = 2
+
+    def __init__(self, key: str, path: str, titles: List[str]):
+        self.key: str = key
+        self.path: str = path
+        self.titles: List[str] = titles
+        self.columns: Dict[str, array] = {title: array("d") for title in titles}
+        self.row_count: int = 0
+        self.stats: Dict[str, ColumnStats] = {title: ColumnStats() for title in titles}
+
+    def __str__(self) -> str:
+        return f"Type: DataTable, Key: {self.key}, Columns: {len(self.titles)}, Rows: {self.row_count}"
+
+    def get_column(self, title: str) -> array:
+        """Get the values of a column"""
+        return self.columns[title]
+
+    def get_size_bytes(self) -> int:
+        """Get the memory held by the column buffers"""
+        return sum(
+            column.buffer_info()[1] * column.itemsize
+            for column in self.columns.values()
+        )
+
+    @staticmethod
+    def get_key(path: Path) -> str:
+        """Get the cache key of a file, which changes when the file changes"""
+        stat = path.stat()
+        return f"{path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+
+    @staticmethod
+    def read_titles(file_handle) -> List[str]:
+        """Read the title row of an opened file"""
+        return [
+            title.strip()
+            for title in file_handle.readline().split("\t")
+            if title != "\n"
+        ]
+
+    @classmethod
+    def read(cls, path: Path) -> "DataTable":
+        """Parse a tab separated file with a title row
+
+        The column statistics are updated after every chunk of rows, so they
+        are ready when parsing ends without another pass over the data.
+        """
+        with open(path, "r", encoding="ISO-8859-9") as file_handle:
+            titles: List[str] = cls.read_titles(file_handle)
+            table = cls(cls.get_key(path), str(path), titles)
+            columns: List[array] = [table.columns[title] for title in titles]
+            stats: List[ColumnStats] = [table.stats[title] for title in titles]
+            # Seeded, so the same file always gives the same statistics
+            rng = random.Random(0)
+            chunk_start: int = 0
+            for row in file_handle:
+                values = [value for value in row.split("\t") if value != "\n"]
+                for column, value in zip(columns, values):
+                    column.append(float(value))
+                table.row_count += 1
+                if table.row_count - chunk_start == cls.chunk_rows:
+                    for column, column_stats in zip(columns, stats):
+                        column_stats.update(column[chunk_start:], rng)
+                    chunk_start = table.row_count
+            for column, column_stats in zip(columns, stats):
+                column_stats.update(column[chunk_start:], rng)
+        return table
+
+    @classmethod
+    def read_chunks(cls, path: Path, chunk_rows: int) -> Iterator[Dict[str, array]]:
+        """Parse a file lazily, yielding the columns of chunk_rows rows at a time
+
+        Only one chunk is held in memory, so files larger than the memory can
+        be streamed through the cards.
+        """
+        with open(path, "r", encoding="ISO-8859-9") as file_handle:
+            titles: List[str] = cls.read_titles(file_handle)
+            while True:
+                chunk: Dict[str, array] = {title: array("d") for title in titles}
+                columns: List[array] = [chunk[title] for title in titles]
+                row_count: int = 0
+                for row in file_handle:
+                    values = [value for value in row.split("\t") if value != "\n"]
+                    for column, value in zip(columns, values):
+                        column.append(float(value))
+                    row_count += 1
+                    if row_count == chunk_rows:
+                        break
+                if not row_count:
+                    return
+                yield chunk
+
+    @classmethod
+    def load(cls, path: Path, disk_cache: ResultCache | None = None) -> "DataTable":
+        """Read a file through the on-disk cache, if there is one
+
+        The cache holds the columns in binary form along with the titles and
+        column statistics, so a file is only parsed once.
+        """
+        if disk_cache is None:
+            return cls.read(path)
+        cache_key: str = disk_cache.get_key(
+            cls.__name__, cls.version, disk_cache.get_file_hash(path)
+        )
+        entry = disk_cache.get_entry(cache_key)
+        if entry is not None:
+            columns, meta = entry
+            table = cls(cls.get_key(path), str(path), meta["titles"])
+            table.columns = columns
+            table.row_count = meta["row_count"]
+            table.stats = {
+                title: ColumnStats.from_dict(summary)
+                for title, summary in meta["stats"].items()
+            }
+            return table
+        table = cls.read(path)
+        disk_cache.put(
+            cache_key,
+            table.columns,
+            {
+                "titles": table.titles,
+                "row_count": table.row_count,
+                "stats": {
+                    title: column_stats.to_dict()
+                    for title, column_stats in table.stats.items()
+                },
+            },
+        )
+        return table
+
+
+class DataPreview:
+    """Titles, inferred types and sampled rows of a file
+
+    The rows are the head of the file and lines at random offsets across it,
+    so a preview takes milliseconds however large the file is.
+    """
+
+    __slots__ = ("path", "titles", "types", "rows", "size_bytes", "row_estimate")
+
+    head_rows: int = 20
+    sample_rows: int = 100
+
+    def __init__(self, path: str, titles: List[str], rows: List[List[str]]):
+        self.path: str = path
+        self.titles: List[str] = titles
+        self.rows: List[List[str]] = rows
+        self.types: Dict[str, str] = {
+            title: self.infer_type([row[i] for row in rows if i < len(row)])
+            for i, title in enumerate(titles)
+        }
+        self.size_bytes: int = 0
+        self.row_estimate: int = 0
+
+    def __str__(self) -> str:
+        return f"Type: DataPreview, Path: {self.path}, Columns: {len(self.titles)}, Rows: ~{self.row_estimate}"
+
+    @staticmethod
+    def infer_type(values: List[str]) -> str:
+        """Get whether sampled values are whole numbers, numbers or text"""
+        if not values:
+            # Nothing shows the column is numeric, so it is not parsed as such
+            return "text"
+        try:
+            numbers: List[float] = [float(value) for value in values]
+        except ValueError:
+            return "text"
+        return "int" if all(map(float.is_integer, numbers)) else "float"
+
+    @staticmethod
+    def parse_line(line: bytes) -> List[str]:
+        """Split a line of a tab separated file into values"""
+        return [
+            value.strip()
+            for value in line.decode("ISO-8859-9").split("\t")
+            if value != "\n"
+        ]
+
+    def get_range(self, title: str) -> Tuple[float, float] | None:
+        """Get the range of the sampled values of a numeric column"""
+        if self.types.get(title, "text") == "text":
+            return None
+        index: int = self.titles.index(title)
+        values: List[float] = [
+            float(row[index]) for row in self.rows if index < len(row)
+        ]
+        return (min(values), max(values)) if values else None
+
+    @classmethod
+    def read(cls, path: Path) -> "DataPreview":
+        """Read the head of a file and seek to sample lines across the rest"""
+        size_bytes: int = path.stat().st_size
+        with open(path, "rb") as file_handle:
+            titles: List[str] = cls.parse_line(file_handle.readline())
+            data_start: int = file_handle.tell()
+            rows: List[List[str]] = []
+            for _ in range(cls.head_rows):
+                line: bytes = file_handle.readline()
+                if not line:
+                    break
+                rows.append(cls.parse_line(line))
+            head_end: int = file_handle.tell()
+            head_count: int = len(rows)
+
+            # Seeded, so the same file always gives the same preview
+            rng = random.Random(0)
+            line_starts: set = set()
+            if head_end < size_bytes:
+                offsets: List[int] = sorted(
+                    rng.randrange(head_end, size_bytes) for _ in range(cls.sample_rows)
+                )
+                for offset in offsets:
+                    # Skip to the start of the next line
+                    file_handle.seek(offset - 1)
+                    file_handle.readline()
+                    line_start: int = file_handle.tell()
+                    line = file_handle.readline()
+                    if line and line_start not in line_starts:
+                        line_starts.add(line_start)
+                        rows.append(cls.parse_line(line))
+
+        preview = cls(str(path), titles, rows)
+        preview.size_bytes = size_bytes
+        if head_count:
+            # The row count is estimated from the mean length of the head rows
+            mean_length: float = (head_end - data_start) / head_count
+            preview.row_estimate = round((size_bytes - data_start) / mean_length)
+        return preview
+
+
+class DataCache:
+    """Loaded tables shared by cache key
+
+    Cards and other users reference a table by its key and hold a use count
+    on it, so the same file is kept in memory once however often it is used.
+    A table is dropped when its last user releases it.
+    """
+
+    tables: Dict[str, DataTable] = {}
+    users: Dict[str, int] = {}
+    # Parsed files and their statistics kept across sessions
+    disk_cache: ResultCache | None = None
+
+    @classmethod
+    def load(cls, path: Path) -> DataTable:
+        """Get the table of a file, reading it if it is not loaded yet"""
+        table = cls.tables.get(DataTable.get_key(path))
+        if table is None:
+            table = cls.add(DataTable.load(path, cls.disk_cache))
+        return table
+
+    @classmethod
+    def add(cls, table: DataTable) -> DataTable:
+        """Cache a table read elsewhere, returns the cached table of its key"""
+        cached = cls.tables.get(table.key)
+        if cached is not None:
+            return cached
+        cls.tables[table.key] = table
+        cls.users.setdefault(table.key, 0)
+        return table
+
+    @classmethod
+    def get(cls, key: str) -> DataTable | None:
+        """Get a loaded table by key"""
+        return cls.tables.get(key)
+
+    @classmethod
+    def acquire(cls, key: str) -> None:
+        """Register a user of a table"""
+        cls.users[key] = cls.users.get(key, 0) + 1
+
+    @classmethod
+    def release(cls, key: str) -> None:
+        """Unregister a user of a table, dropping the table if it was the last"""
+        users: int = cls.users.get(key, 0) - 1
+        if users > 0:
+            cls.users[key] = users
+        else:
+            cls.users.pop(key, None)
+            cls.tables.pop(key, None)
+
+    @classmethod
+    def get_size_bytes(cls) -> int:
+        """Get the memory held by every loaded table"""
+        return sum(table.get_size_bytes() for table in cls.tables.values())
+
+
+class DataLoader:
+    """Reads files on a background thread
+
+    The tables are handed back through futures and only added to the data
+    cache by the main thread.
+    """
+
+    executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def request(cls, path: Path) -> Future:
+        """Start reading a file"""
+        if cls.executor is None:
+            cls.executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="DataLoader"
+            )
+        return cls.executor.submit(DataTable.load, path, DataCache.disk_cache)
@@ -0,0 +1,168 @@
+import json
+import threading
+import time
+import tracemalloc
+from typing import Dict, List
+
+import pygame
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore
+
+
+def get_surface_size_bytes(surf: pygame.Surface | None) -> int:
+    """Get the pixel memory of a surface"""
+    if surf is None:
+        return 0
+    return surf.get_width() * surf.get_height() * surf.get_bytesize()
+
+
+class DebugSnapshot:
+    """Structured dump of the scene and of what is holding memory
+
+    The scene is read on the main thread, which only walks the cards. Python
+    allocation statistics and the JSON file are produced on a worker thread,
+    so taking a snapshot of a big graph does not stall the UI.
+    """
+
+    trace_frames: int = 1
+    top_allocations: int = 25
+    writer: threading.Thread | None = None
+
+    @classmethod
+    def start_tracing(cls) -> None:
+        """Start tracing Python allocations for the snapshots"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(cls.trace_frames)
+
+    @classmethod
+    def collect(cls, app) -> Dict:
+        """Read the scene and the memory held by every card"""
+        # Imported here to keep the fonts and sprites out of the import chain
+        from datalib import DataCache  # pylint: disable=import-outside-toplevel
+        from fontlib import FontCache  # pylint: disable=import-outside-toplevel
+        from spritelib import SpriteAtlas  # pylint: disable=import-outside-toplevel
+
+        cards: List[Dict] = []
+        for card in app.cards:
+            memory: Dict[str, int] = card.get_memory_usage()
+            cards.append(
+                {
+                    "id": card.widget_id,
+                    "type": card.__class__.__name__,
+                    "title": card.title,
+                    "rect": list(card.get_rect()),
+                    "z_order": card.z_order,
+                    "file": card.file,
+                    "data_key": getattr(card, "data_key", None),
+                    "buttons": len(card.buttons),
+                    "labels": len(card.labels),
+                    "nodes": len(card.nodes),
+                    "wires": len(app.wires.get_card_wires(card)),
+                    "memory": memory,
+                    "memory_total": sum(memory.values()),
+                }
+            )
+        cards.sort(key=lambda x: x["memory_total"], reverse=True)
+
+        sprites: List[pygame.Surface] = list(SpriteAtlas.node_sprites.values())
+        sprites += list(SpriteAtlas.button_chromes.values())
+        wire_layer: int = get_surface_size_bytes(app.wires.layer)
+        return {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "view": {
+                "screen_drag": list(app.get_screen_drag()),
+                "zoom_level": app.zoom_level,
+            },
+            "cards": cards,
+            "wires": len(app.wires),
+            "data_tables": [
+                {
+                    "key": key,
+                    "rows": table.row_count,
+                    "columns": len(table.titles),
+                    "bytes": table.get_size_bytes(),
+                    "users": DataCache.users.get(key, 0),
+                }
+                for key, table in DataCache.tables.items()
+            ],
+            "shared": {
+                "sprites": len(sprites),
+                "sprite_bytes": sum(get_surface_size_bytes(surf) for surf in sprites),
+                "fonts": FontCache.get_font.cache_info().currsize
+                + FontCache.get_sys_font.cache_info().currsize,
+                "wire_layer_bytes": wire_layer,
+            },
+            "totals": {
+                "cards": sum(card["memory_total"] for card in cards),
+                "data": DataCache.get_size_bytes(),
+            },
+        }
+
+    @classmethod
+    def get_allocation_stats(cls) -> Dict | None:
+        """Get the Python allocations by source line, if tracing is enabled"""
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "traced_bytes": current,
+            "traced_peak_bytes": peak,
+            "by_file": [
+                {"file": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("filename")[: cls.top_allocations]
+            ],
+            "by_line": [
+                {"line": str(stat.traceback), "bytes": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[: cls.top_allocations]
+            ],
+        }
+
+    @staticmethod
+    def get_process_stats() -> Dict:
+        """Get the peak resident memory of the process where it is available"""
+        if resource is None:
+            return {}
+        # Kilobytes on Linux
+        max_rss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"max_rss_bytes": max_rss * 1024}
+
+    @classmethod
+    def write(cls, scene: Dict, path: str) -> None:
+        """Complete a collected scene with allocation statistics and write it"""
+        scene["process"] = cls.get_process_stats()
+        scene["allocations"] = cls.get_allocation_stats()
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(scene, file, indent=2)
+        print(f"Debug snapshot written to {path}")
+
+    @classmethod
+    def export(cls, app, path: str | None = None) -> str | None:
+        """Write a snapshot in the background, returns its path
+
+        Nothing is written while the previous snapshot is still being written.
+        """
+        if cls.writer is not None and cls.writer.is_alive():
+            print("Debug snapshot is still being written")
+            return None
+        if path is None:
+            path = time.strftime("debug-snapshot-%Y%m%d-%H%M%S.json")
+        cls.writer = threading.Thread(
+            target=cls.write, args=(cls.collect(app), path), daemon=True
+        )
+        cls.writer.start()
+        return path
+
+    @classmethod
+    def wait(cls) -> None:
+        """Wait for a snapshot that is being written"""
+        if cls.writer is not None:
+            cls.writer.join()
@@ -0,0 +1,52 @@
+from typing import TYPE_CHECKING
+
+from startuplib import StartupProfiler
+
+if TYPE_CHECKING:
+    from replaylib import InputRecorder, InputReplayer
+
+
+class FileDialog:
+    """Native file dialogs, with tkinter only imported when first needed"""
+
+    filedialog = None
+    # Dialog answers are recorded, or taken from a recording instead of asking
+    recorder: "InputRecorder | None" = None
+    replayer: "InputReplayer | None" = None
+
+    @classmethod
+    def get_filedialog(cls):
+        """Import tkinter's file dialog module on first use"""
+        if cls.filedialog is None:
+            with StartupProfiler.measure("import tkinter.filedialog"):
+                from tkinter import filedialog  # pylint: disable=import-outside-toplevel
+
+            cls.filedialog = filedialog
+        return cls.filedialog
+
+    @classmethod
+    def ask_open_filename(cls, default_extension: str = "") -> str:
+        """Ask the user for a file to open, returns an empty string on cancel"""
+        if cls.replayer is not None:
+            return cls.replayer.next_dialog_result()
+        # Some Tk versions return an empty tuple on cancel
+        filename: str = (
+            cls.get_filedialog().askopenfilename(defaultextension=default_extension)
+            or ""
+        )
+        if cls.recorder is not None:
+            cls.recorder.record_dialog_result(filename)
+        return filename
+
+    @classmethod
+    def ask_save_filename(cls, default_extension: str = "") -> str:
+        """Ask the user for a file to save to, returns an empty string on cancel"""
+        if cls.replayer is not None:
+            return cls.replayer.next_dialog_result()
+        filename: str = (
+            cls.get_filedialog().asksaveasfilename(defaultextension=default_extension)
+            or ""
+        )
+        if cls.recorder is not None:
+            cls.recorder.record_dialog_result(filename)
+        return filename
@@ -0,0 +1,413 @@
+import math
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from datalib import DataCache, DataTable
+from resultcachelib import Columns, ResultCache
+
+
+class Kernel:
+    """Computation of a card, independent of its widgets
+
+    Kernels only know the state a card saves in a project, so graphs can be
+    evaluated without pygame or a display.
+    """
+
+    inputs: List[str] = []
+    # Changing how a kernel computes its outputs has to change its version,
+    # so results cached by the previous version are not used
+    version: int = 1
+    # Whether each row of the outputs only depends on the same row of the
+    # inputs, so the card can be evaluated one chunk of rows at a time
+    streamable: bool = False
+    # Whether inputs may be left unconnected, which the card then ignores
+    optional_inputs: bool = False
+    # Whether the graph stores the outputs in its result cache
+    cached: bool = True
+
+    def __init__(self, card_id: str, title: str, state: Dict):
+        self.card_id: str = card_id
+        self.title: str = title
+        self.state: Dict = state
+
+    def __str__(self) -> str:
+        return f"Type: Kernel [{self.__class__.__name__}], Title: {self.title}, ID: {self.card_id}"
+
+    def get_name(self) -> str:
+        """Get a short readable name of the card"""
+        return f"{self.title} [{self.card_id[:8]}]"
+
+    def get_params(self) -> Dict:
+        """Get the parameters the outputs depend on"""
+        return {}
+
+    def get_source_hash(self, cache: ResultCache) -> str | None:
+        """Get the content hash of the data the card reads, if it reads any"""
+        return None
+
+    def get_cache_key(self, cache: ResultCache, input_keys: Dict[str, str]) -> str:
+        """Get the key of the outputs for the given keys of the inputs"""
+        return cache.get_key(
+            self.__class__.__name__,
+            self.version,
+            self.get_params(),
+            self.get_source_hash(cache),
+            input_keys,
+        )
+
+    def evaluate(self, inputs: Columns) -> Columns:
+        """Compute the outputs from the values connected to the inputs"""
+        raise NotImplementedError
+
+    def read_chunks(self, chunk_rows: int) -> Iterator[Columns]:
+        """Yield the outputs of a card without inputs in chunks of rows"""
+        raise NotImplementedError
+
+
+class InputKernel(Kernel):
+    """Columns of a data file"""
+
+    streamable: bool = True
+    # The file is shared through the data cache, storing the columns as a
+    # result as well would only keep a second copy
+    cached: bool = False
+
+    def get_path(self) -> Path:
+        """Get the data file of the card"""
+        return Path(self.state.get("file", ""))
+
+    def get_source_hash(self, cache: ResultCache) -> str | None:
+        if not self.state.get("file"):
+            raise ValueError(f"{self.get_name()} has no file")
+        return cache.get_file_hash(self.get_path())
+
+    def evaluate(self, inputs: Columns) -> Columns:
+        if not self.state.get("file"):
+            raise ValueError(f"{self.get_name()} has no file")
+        # A file loaded by a card is used as it is. Otherwise it is read
+        # through the disk cache but not kept in memory, so the columns are
+        # freed once used
+        table = DataCache.get(DataTable.get_key(self.get_path()))
+        if table is None:
+            table = DataTable.load(self.get_path(), DataCache.disk_cache)
+        return table.columns
+
+    def read_chunks(self, chunk_rows: int) -> Iterator[Columns]:
+        if not self.state.get("file"):
+            raise ValueError(f"{self.get_name()} has no file")
+        return DataTable.read_chunks(self.get_path(), chunk_rows)
+
+
+class MathKernel(Kernel):
+    """Element wise arithmetic of two columns"""
+
+    inputs: List[str] = ["A", "B"]
+    streamable: bool = True
+
+    def get_params(self) -> Dict:
+        return {"operator": self.state.get("operator", "+")}
+
+    def evaluate(self, inputs: Columns) -> Columns:
+        operator: str = self.state.get("operator", "+")
+        a, b = inputs["A"], inputs["B"]
+        match operator:
+            case "+":
+                result = array("d", map(float.__add__, a, b))
+            case "-":
+                result = array("d", map(float.__sub__, a, b))
+            case "*":
+                result = array("d", map(float.__mul__, a, b))
+            case "/":
+                result = array(
+                    "d", (x / y if y != 0 else math.nan for x, y in zip(a, b))
+                )
+            case _:
+                raise ValueError(f"{self.get_name()} has unknown operator {operator}")
+        return {"Result": result}
+
+
+class ExportKernel(Kernel):
+    """Columns written to a file, passed through unchanged"""
+
+    inputs: List[str] = ["1", "2", "3", "4"]
+    streamable: bool = True
+    optional_inputs: bool = True
+    # The outputs are the inputs as they are, which are cached upstream
+    cached: bool = False
+
+    def get_path(self) -> Path | None:
+        """Get the file the card exports to, if one was chosen"""
+        return Path(self.state["file"]) if self.state.get("file") else None
+
+    def evaluate(self, inputs: Columns) -> Columns:
+        return dict(inputs)
+
+    def read_chunks(self, chunk_rows: int) -> Iterator[Columns]:
+        # Only called when none of the inputs is connected
+        raise ValueError(f"{self.get_name()} has no connected columns")
+
+
+class Graph:
+    """Cards of a project and the wires between them, ready to be evaluated"""
+
+    kernels: Dict[str, type] = {
+        "INPUTCARD": InputKernel,
+        "MATHCARD": MathKernel,
+        "EXPORTCARD": ExportKernel,
+    }
+
+    def __init__(self):
+        self.nodes: Dict[str, Kernel] = {}
+        # Input port of a card to the output port it is connected to
+        self.links: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.timings: Dict[str, Dict] = {}
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    @classmethod
+    def from_project(cls, project: Dict) -> "Graph":
+        """Build a graph from a project read with ProjectFile.read"""
+        graph = cls()
+        for card in project["cards"]:
+            kernel_class = cls.kernels.get(card["type"])
+            if kernel_class is None:
+                raise ValueError(f"Card type {card['type']} can not be evaluated")
+            graph.nodes[card["id"]] = kernel_class(
+                card["id"], card["title"], card.get("state", {})
+            )
+        for source_id, source_port, target_id, target_port in project["wires"]:
+            graph.links[(target_id, target_port)] = (source_id, source_port)
+        for card_id, kernel in graph.nodes.items():
+            if kernel.optional_inputs:
+                kernel.inputs = [
+                    port for port in kernel.inputs if (card_id, port) in graph.links
+                ]
+        return graph
+
+    def get_input_titles(self, kernel: Kernel) -> List[str]:
+        """Get the output names connected to the inputs of a card
+
+        Names used more than once are numbered, e.g. to write them as the
+        titles of a file.
+        """
+        titles: List[str] = []
+        for port in kernel.inputs:
+            title: str = self.links[(kernel.card_id, port)][1]
+            number: int = 2
+            while title in titles:
+                title = f"{self.links[(kernel.card_id, port)][1]} ({number})"
+                number += 1
+            titles.append(title)
+        return titles
+
+    def get_sinks(self) -> List[Kernel]:
+        """Get the computed cards whose outputs are not used by any card"""
+        used: set = {source_id for source_id, _ in self.links.values()}
+        return [
+            kernel
+            for card_id, kernel in self.nodes.items()
+            if kernel.inputs and card_id not in used
+        ]
+
+    def get_order(self, targets: List[Kernel]) -> List[Kernel]:
+        """Get the cards needed for the targets, each after its inputs"""
+        order: List[Kernel] = []
+        state: Dict[str, bool] = {}
+
+        def visit(kernel: Kernel) -> None:
+            if state.get(kernel.card_id) is True:
+                return
+            if state.get(kernel.card_id) is False:
+                raise ValueError(f"Cycle through {kernel.get_name()}")
+            state[kernel.card_id] = False
+            for port in kernel.inputs:
+                link = self.links.get((kernel.card_id, port))
+                if link is None:
+                    raise ValueError(
+                        f"Input {port} of {kernel.get_name()} is not connected"
+                    )
+                visit(self.nodes[link[0]])
+            state[kernel.card_id] = True
+            order.append(kernel)
+
+        for target in targets:
+            visit(target)
+        return order
+
+    def get_cache_keys(
+        self, order: List[Kernel], cache: ResultCache
+    ) -> Dict[str, str]:
+        """Get the cache keys of cards ordered after their inputs"""
+        keys: Dict[str, str] = {}
+        for kernel in order:
+            input_keys: Dict[str, str] = {}
+            for port in kernel.inputs:
+                source_id, source_port = self.links[(kernel.card_id, port)]
+                input_keys[port] = f"{keys[source_id]}:{source_port}"
+            keys[kernel.card_id] = kernel.get_cache_key(cache, input_keys)
+        return keys
+
+    def evaluate(
+        self, targets: List[Kernel], cache: ResultCache | None = None
+    ) -> Dict[str, Columns]:
+        """Evaluate the targets, timing every card on the way
+
+        With a cache, cards whose outputs are cached are loaded instead, and
+        the cards upstream of them are not evaluated at all. The peak memory
+        of a card is only measured while tracemalloc is tracing.
+        """
+        order: List[Kernel] = self.get_order(targets)
+        outputs: Dict[str, Columns] = {}
+        keys: Dict[str, str] = {}
+        if cache is not None:
+            keys = self.get_cache_keys(order, cache)
+            order = self.load_cached(targets, cache, keys, outputs)
+
+        # Outputs are dropped as soon as every card using them is evaluated
+        consumers: Dict[str, int] = {}
+        for kernel in order:
+            for port in kernel.inputs:
+                source_id: str = self.links[(kernel.card_id, port)][0]
+                consumers[source_id] = consumers.get(source_id, 0) + 1
+        target_ids: set = {target.card_id for target in targets}
+
+        for kernel in order:
+            inputs: Columns = self.get_inputs(kernel, outputs)
+            for port in kernel.inputs:
+                source_id = self.links[(kernel.card_id, port)][0]
+                consumers[source_id] -= 1
+                if consumers[source_id] == 0 and source_id not in target_ids:
+                    del outputs[source_id]
+
+            outputs[kernel.card_id] = self.run(kernel, lambda: kernel.evaluate(inputs))
+            if cache is not None and kernel.cached:
+                cache.put(keys[kernel.card_id], outputs[kernel.card_id])
+        return {target.card_id: outputs[target.card_id] for target in targets}
+
+    def stream(
+        self, targets: List[Kernel], chunk_rows: int
+    ) -> Iterator[Dict[str, Columns]]:
+        """Evaluate the targets one chunk of rows at a time
+
+        Every card runs on a chunk before the next chunk is read, so the
+        memory used only depends on chunk_rows and not on the size of the
+        data files. All the targets are computed in a single pass over the
+        files. The stream ends with the shortest input file.
+        """
+        order: List[Kernel] = self.get_order(targets)
+        blocking: List[str] = [
+            kernel.get_name() for kernel in order if not kernel.streamable
+        ]
+        if blocking:
+            raise ValueError(f"Cards that can not be streamed: {', '.join(blocking)}")
+
+        sources: Dict[str, Iterator[Columns]] = {
+            kernel.card_id: kernel.read_chunks(chunk_rows)
+            for kernel in order
+            if not kernel.inputs
+        }
+        try:
+            while True:
+                outputs: Dict[str, Columns] = {}
+                for kernel in order:
+                    if kernel.card_id in sources:
+                        chunk = self.run(
+                            kernel, lambda: next(sources[kernel.card_id], None)
+                        )
+                        if chunk is None:
+                            return
+                        outputs[kernel.card_id] = chunk
+                    else:
+                        inputs: Columns = self.get_inputs(kernel, outputs)
+                        outputs[kernel.card_id] = self.run(
+                            kernel, lambda: kernel.evaluate(inputs)
+                        )
+                yield {target.card_id: outputs[target.card_id] for target in targets}
+        finally:
+            # Close the files of the sources that did not reach their end
+            for source in sources.values():
+                source.close()  # type: ignore
+
+    def get_inputs(self, kernel: Kernel, outputs: Dict[str, Columns]) -> Columns:
+        """Get the values connected to the inputs of a card"""
+        inputs: Columns = {}
+        for port in kernel.inputs:
+            source_id, source_port = self.links[(kernel.card_id, port)]
+            source_outputs: Columns = outputs[source_id]
+            if source_port not in source_outputs:
+                source_name: str = self.nodes[source_id].get_name()
+                raise ValueError(f"{source_name} has no output {source_port}")
+            inputs[port] = source_outputs[source_port]
+        return inputs
+
+    def run(self, kernel: Kernel, compute: Callable[[], Columns | None]):
+        """Compute the outputs of a card, adding up its time and memory"""
+        traced_before: int = 0
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        start: float = time.perf_counter()
+        result = compute()
+        elapsed: float = time.perf_counter() - start
+        # Memory the card allocated on top of what was already held
+        peak: int | None = (
+            tracemalloc.get_traced_memory()[1] - traced_before
+            if tracemalloc.is_tracing()
+            else None
+        )
+        self.add_timing(kernel, elapsed, peak, cached=False)
+        return result
+
+    def load_cached(
+        self,
+        targets: List[Kernel],
+        cache: ResultCache,
+        keys: Dict[str, str],
+        outputs: Dict[str, Columns],
+    ) -> List[Kernel]:
+        """Load the cached outputs the targets need, returns the cards to run"""
+        needed: set = set()
+
+        def visit(kernel: Kernel) -> None:
+            if kernel.card_id in needed or kernel.card_id in outputs:
+                return
+            if kernel.cached:
+                start: float = time.perf_counter()
+                columns = cache.get(keys[kernel.card_id])
+                if columns is not None:
+                    outputs[kernel.card_id] = columns
+                    self.add_timing(
+                        kernel, time.perf_counter() - start, None, cached=True
+                    )
+                    return
+            needed.add(kernel.card_id)
+            for port in kernel.inputs:
+                visit(self.nodes[self.links[(kernel.card_id, port)][0]])
+
+        for target in targets:
+            visit(target)
+        return [
+            kernel for kernel in self.get_order(targets) if kernel.card_id in needed
+        ]
+
+    def add_timing(
+        self, kernel: Kernel, elapsed: float, peak: int | None, cached: bool
+    ) -> None:
+        """Add up the time and memory of a card over the evaluations"""
+        timing: Dict = self.timings.setdefault(
+            kernel.card_id,
+            {
+                "card": kernel.get_name(),
+                "seconds": 0.0,
+                "peak_bytes": None,
+                "cached": cached,
+            },
+        )
+        timing["seconds"] = round(timing["seconds"] + elapsed, 6)
+        timing["cached"] = timing["cached"] and cached
+        if peak is not None:
+            timing["peak_bytes"] = max(timing["peak_bytes"] or 0, peak)
@@ -0,0 +1,127 @@
+from enum import IntEnum
+from typing import Any, Callable, Dict, List, Tuple
+
+import pygame
+
+# Handlers return True when they used the event, which stops its dispatch
+Handler = Callable[[pygame.event.Event], bool]
+# Whether a window position is inside the region of a subscription
+Region = Callable[[Tuple[int, int]], bool]
+
+
+class MouseButton(IntEnum):
+    """Mouse buttons of pygame events"""
+
+    LEFT = 1
+    MIDDLE = 2
+    RIGHT = 3
+
+
+class Subscription:
+    """Handler of an event type, optionally limited to a region"""
+
+    __slots__ = ("handler", "region", "priority", "on_leave", "inside")
+
+    def __init__(
+        self,
+        handler: Handler,
+        region: Region | None,
+        priority: int,
+        on_leave: Callable[[], None] | None,
+    ):
+        self.handler: Handler = handler
+        self.region: Region | None = region
+        self.priority: int = priority
+        self.on_leave: Callable[[], None] | None = on_leave
+        # Whether the cursor was in the region at the last motion event
+        self.inside: bool = False
+
+    def __str__(self) -> str:
+        return f"Type: Subscription, Handler: {self.handler.__qualname__}, Priority: {self.priority}"
+
+
+class EventDispatcher:
+    """Routes events to the handlers subscribed to their type
+
+    An event only reaches the handlers of its type, in ascending priority,
+    and of those only the ones whose region holds the cursor. The first
+    handler returning True stops the dispatch, so e.g. a click on the menu
+    bar never reaches the canvas. Handlers subscribed with on_leave are told
+    when the cursor moves out of their region.
+    """
+
+    def __init__(self):
+        self.subscriptions: Dict[int, List[Subscription]] = {}
+
+    def subscribe(
+        self,
+        event_type: int,
+        handler: Handler,
+        region: Region | None = None,
+        priority: int = 0,
+        on_leave: Callable[[], None] | None = None,
+    ) -> None:
+        """Call a handler for the events of a type"""
+        subscriptions: List[Subscription] = self.subscriptions.setdefault(
+            event_type, []
+        )
+        subscriptions.append(Subscription(handler, region, priority, on_leave))
+        # Stable, so handlers of equal priority run in subscription order
+        subscriptions.sort(key=lambda x: x.priority)
+
+    def unsubscribe(self, event_type: int, handler: Handler) -> None:
+        """Stop calling a handler for the events of a type"""
+        self.subscriptions[event_type] = [
+            subscription
+            for subscription in self.subscriptions.get(event_type, [])
+            if subscription.handler != handler
+        ]
+
+    def dispatch(self, event: pygame.event.Event, mouse_pos: Tuple[int, int]) -> None:
+        """Hand an event to the interested handlers until one uses it"""
+        subscriptions: List[Subscription] | None = self.subscriptions.get(event.type)
+        if not subscriptions:
+            return
+        # Events without a position, e.g. keys and the wheel, happen where
+        # the cursor is
+        pos: Tuple[int, int] = getattr(event, "pos", mouse_pos)
+        is_motion: bool = event.type == pygame.MOUSEMOTION
+        handled: bool = False
+        for subscription in subscriptions:
+            inside: bool = subscription.region is None or subscription.region(pos)
+            if is_motion and subscription.on_leave is not None:
+                if subscription.inside and not inside:
+                    subscription.on_leave()
+                subscription.inside = inside
+            if inside and not handled:
+                handled = subscription.handler(event)
+                # Leaves are still tracked for the remaining handlers
+                if handled and not is_motion:
+                    return
+
+
+class HoverTracker:
+    """Highlights the widgets under the cursor
+
+    Only the widgets that were hovered before and the ones hovered now are
+    updated, instead of resetting every widget on each mouse motion.
+    """
+
+    __slots__ = ("hovered",)
+
+    def __init__(self):
+        self.hovered: List[Any] = []
+
+    def update(self, widgets: List[Any]) -> None:
+        """Set the hovered widgets, e.g. a card and its button"""
+        for widget in self.hovered:
+            if not any(widget is hovered for hovered in widgets):
+                widget.set_highlight(False)
+        for widget in widgets:
+            if not any(widget is hovered for hovered in self.hovered):
+                widget.set_highlight(True)
+        self.hovered = widgets
+
+    def clear(self) -> None:
+        """Remove the highlight of every hovered widget"""
+        self.update([])
@@ -0,0 +1,240 @@
+import csv
+import io
+import json
+import os
+import queue
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List
+
+from resultcachelib import Columns
+
+if TYPE_CHECKING:
+    from enginelib import Graph, Kernel
+
+# Export formats and the extension of their files
+FORMATS: Dict[str, str] = {
+    "TSV": ".txt",
+    "CSV": ".csv",
+    "Binary": ".cols",
+}
+
+BINARY_MAGIC: bytes = b"NOWS"
+
+
+class ExportWriter:
+    """Writes columns to a file chunk by chunk
+
+    Chunks are encoded by the caller and gathered into large buffers, which
+    a worker thread compresses, if asked to, and writes. The queue between
+    them is short, so memory stays bounded however long the export is. The
+    file is written under a temporary name and only renamed once complete.
+    """
+
+    buffer_bytes: int = 1 << 20
+    slice_rows: int = 16384
+    queue_size: int = 4
+    # The fastest level, so compressing keeps up with encoding the rows
+    compression_level: int = 1
+
+    def __init__(
+        self,
+        path: Path,
+        export_format: str = "TSV",
+        compress: bool = False,
+        titles: List[str] | None = None,
+    ):
+        if export_format not in FORMATS:
+            raise ValueError(f"Unknown export format {export_format}")
+        self.path: Path = path
+        self.export_format: str = export_format
+        self.compress: bool = compress
+        # Taken from the first chunk when not given
+        self.titles: List[str] | None = titles
+        self.row_count: int = 0
+        self.header_written: bool = False
+
+        self.buffer: List[bytes] = []
+        self.buffered_bytes: int = 0
+        self.queue: queue.Queue = queue.Queue(self.queue_size)
+        self.error: BaseException | None = None
+        self.temp_path: Path = path.with_name(path.name + ".part")
+        self.worker = threading.Thread(target=self.write_loop, daemon=True)
+        self.worker.start()
+
+    def write(self, columns: Columns) -> None:
+        """Append a chunk of rows"""
+        if self.error is not None:
+            raise self.error
+        if self.titles is None:
+            self.titles = list(columns)
+        if not self.header_written:
+            self.add(self.encode_header())
+            self.header_written = True
+        values: List[array] = list(columns.values())
+        rows: int = min((len(column) for column in values), default=0)
+        # Large chunks are encoded in slices, so their text is never held whole
+        for start in range(0, rows, self.slice_rows):
+            end: int = min(start + self.slice_rows, rows)
+            self.add(self.encode_rows([column[start:end] for column in values]))
+        self.row_count += rows
+
+    def close(self) -> int:
+        """Write what is left and wait for the file, returns the row count"""
+        if not self.header_written and self.titles is not None:
+            self.add(self.encode_header())
+            self.header_written = True
+        self.flush()
+        self.queue.put(None)
+        self.worker.join()
+        if self.error is not None:
+            self.temp_path.unlink(missing_ok=True)
+            raise self.error
+        os.replace(self.temp_path, self.path)
+        return self.row_count
+
+    def abort(self) -> None:
+        """Stop writing and delete the unfinished file"""
+        self.buffer = []
+        self.queue.put(None)
+        self.worker.join()
+        self.temp_path.unlink(missing_ok=True)
+
+    def add(self, data: bytes) -> None:
+        """Buffer encoded bytes, handing them to the worker when enough"""
+        self.buffer.append(data)
+        self.buffered_bytes += len(data)
+        if self.buffered_bytes >= self.buffer_bytes:
+            self.flush()
+
+    def flush(self) -> None:
+        """Hand the buffered bytes to the worker"""
+        if self.buffer:
+            self.queue.put(b"".join(self.buffer))
+            self.buffer = []
+            self.buffered_bytes = 0
+
+    def encode_header(self) -> bytes:
+        """Encode the column titles"""
+        titles: List[str] = self.titles or []
+        match self.export_format:
+            case "TSV":
+                return ("\t".join(titles) + "\n").encode("ISO-8859-9")
+            case "CSV":
+                text = io.StringIO()
+                csv.writer(text, lineterminator="\n").writerow(titles)
+                return text.getvalue().encode("utf-8")
+            case _:
+                header: bytes = json.dumps({"columns": titles}).encode("utf-8")
+                return BINARY_MAGIC + struct.pack("<I", len(header)) + header
+
+    def encode_rows(self, columns: List[array]) -> bytes:
+        """Encode rows of columns of the same length"""
+        match self.export_format:
+            case "TSV" | "CSV":
+                separator: str = "\t" if self.export_format == "TSV" else ","
+                # Float representations never contain the separator
+                text: str = "".join(
+                    separator.join(map(repr, row)) + "\n" for row in zip(*columns)
+                )
+                return text.encode("ascii")
+            case _:
+                parts: List[bytes] = [struct.pack("<I", len(columns[0]))]
+                for column in columns:
+                    if sys.byteorder == "big":
+                        column = array("d", column)
+                        column.byteswap()
+                    parts.append(column.tobytes())
+                return b"".join(parts)
+
+    def write_loop(self) -> None:
+        """Compress and write the buffers until close"""
+        try:
+            # A window of 31 bits makes zlib write the gzip format
+            compressor = (
+                zlib.compressobj(self.compression_level, zlib.DEFLATED, 31)
+                if self.compress
+                else None
+            )
+            with open(self.temp_path, "wb") as file:
+                while (data := self.queue.get()) is not None:
+                    file.write(compressor.compress(data) if compressor else data)
+                if compressor is not None:
+                    file.write(compressor.flush())
+        except Exception as error:  # pylint: disable=broad-except
+            # Raised again on the writing side, whatever went wrong here
+            self.error = error
+            # Keep taking buffers, so the writing side is never blocked
+            while self.queue.get() is not None:
+                pass
+
+
+def read_binary(path: Path) -> Iterator[Columns]:
+    """Read the chunks of an uncompressed binary export"""
+    with open(path, "rb") as file:
+        if file.read(4) != BINARY_MAGIC:
+            raise ValueError(f"{path} is not a binary export")
+        (header_size,) = struct.unpack("<I", file.read(4))
+        titles: List[str] = json.loads(file.read(header_size))["columns"]
+        while size_bytes := file.read(4):
+            (rows,) = struct.unpack("<I", size_bytes)
+            chunk: Columns = {}
+            for title in titles:
+                column = array("d")
+                column.fromfile(file, rows)
+                if sys.byteorder == "big":
+                    column.byteswap()
+                chunk[title] = column
+            yield chunk
+
+
+class Exporter:
+    """Runs exports on a worker thread, so the UI loop is never blocked"""
+
+    # Created on the first export, so importing the module starts nothing
+    executor: ThreadPoolExecutor | None = None
+    chunk_rows: int = 65536
+
+    @classmethod
+    def export(
+        cls,
+        graph: "Graph",
+        kernel: "Kernel",
+        path: Path,
+        export_format: str = "TSV",
+        compress: bool = False,
+    ) -> int:
+        """Stream the columns connected to an export card to a file"""
+        writer = ExportWriter(
+            path, export_format, compress, graph.get_input_titles(kernel)
+        )
+        try:
+            for outputs in graph.stream([kernel], cls.chunk_rows):
+                writer.write(outputs[kernel.card_id])
+        except BaseException:
+            writer.abort()
+            raise
+        return writer.close()
+
+    @classmethod
+    def request(
+        cls,
+        graph: "Graph",
+        kernel: "Kernel",
+        path: Path,
+        export_format: str = "TSV",
+        compress: bool = False,
+    ) -> Future:
+        """Start an export in the background"""
+        if cls.executor is None:
+            cls.executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="Exporter"
+            )
+        return cls.executor.submit(
+            cls.export, graph, kernel, path, export_format, compress
+        )
@@ -0,0 +1,46 @@
+from functools import lru_cache
+from pathlib import Path
+
+import pygame
+
+from startuplib import StartupProfiler
+
+
+class FontCache:
+    """Shared font objects, one per font file and size
+
+    The pygame font subsystem is only initialized when the first font is
+    requested.
+    """
+
+    data_path: Path = Path("data")
+    font_path: Path = data_path.joinpath("fonts")
+
+    @staticmethod
+    def init() -> None:
+        """Initialize the pygame font subsystem if it is not yet"""
+        if not pygame.font.get_init():
+            with StartupProfiler.measure("pygame.font.init"):
+                pygame.font.init()
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_sys_font(cls, font_name: str, font_size: int) -> pygame.font.Font:
+        """Get a shared system font for the given font file and size"""
+        if not cls.font_path.joinpath(font_name).exists():
+            raise FileNotFoundError(f"Font {font_name} not found")
+        cls.init()
+        with StartupProfiler.measure(f"load font {font_name} {font_size}"):
+            return pygame.font.SysFont(
+                cls.font_path.joinpath(font_name).as_posix(), font_size, False
+            )
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_font(cls, font_name: str, font_size: int) -> pygame.font.Font:
+        """Get a shared font loaded from the given font file and size"""
+        cls.init()
+        with StartupProfiler.measure(f"load font {font_name} {font_size}"):
+            return pygame.font.Font(
+                cls.font_path.joinpath(font_name).as_posix(), font_size
+            )
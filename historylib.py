@@ -0,0 +1,306 @@
+import sys
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Tuple
+
+from datalib import DataCache
+
+if TYPE_CHECKING:
+    from app import App
+    from cardlib import InputCard, MetaCard
+
+
+class Command:
+    """Reversible change of the application
+
+    Commands only store what changed, e.g. the start and end position of a
+    move, never copies of the cards or their data.
+    """
+
+    __slots__ = ()
+
+    def undo(self, app: "App") -> None:
+        """Revert the change"""
+        raise NotImplementedError
+
+    def redo(self, app: "App") -> None:
+        """Apply the change again"""
+        raise NotImplementedError
+
+    def merge(self, command: "Command") -> bool:
+        """Absorb a following command of the same gesture, if possible"""
+        return False
+
+    def discard(self) -> None:
+        """Release what the command holds when it leaves the history"""
+
+    def get_size_bytes(self) -> int:
+        """Get the approximate memory held by the command"""
+        return sys.getsizeof(self)
+
+
+class MoveCardCommand(Command):
+    """Card moved on the canvas"""
+
+    __slots__ = ("card", "old_pos", "new_pos")
+
+    def __init__(self, card: "MetaCard", old_pos, new_pos):
+        self.card: "MetaCard" = card
+        self.old_pos: Tuple[float, float] = old_pos
+        self.new_pos: Tuple[float, float] = new_pos
+
+    def undo(self, app: "App") -> None:
+        app.move_card(self.card, self.new_pos, self.old_pos)
+
+    def redo(self, app: "App") -> None:
+        app.move_card(self.card, self.old_pos, self.new_pos)
+
+    def merge(self, command: Command) -> bool:
+        # Every step of a drag becomes part of a single move
+        if isinstance(command, MoveCardCommand) and command.card is self.card:
+            self.new_pos = command.new_pos
+            return True
+        return False
+
+
+class ZOrderCommand(Command):
+    """Card brought to the front"""
+
+    __slots__ = ("card", "old_z_order", "new_z_order")
+
+    def __init__(self, card: "MetaCard", old_z_order: int, new_z_order: int):
+        self.card: "MetaCard" = card
+        self.old_z_order: int = old_z_order
+        self.new_z_order: int = new_z_order
+
+    def undo(self, app: "App") -> None:
+        self.card.z_order = self.old_z_order
+        app.sort_cards_by_z_order()
+
+    def redo(self, app: "App") -> None:
+        self.card.z_order = self.new_z_order
+        app.sort_cards_by_z_order()
+
+    def merge(self, command: Command) -> bool:
+        if isinstance(command, ZOrderCommand) and command.card is self.card:
+            self.new_z_order = command.new_z_order
+            return True
+        return False
+
+
+class LoadDataCommand(Command):
+    """File loaded into an input card
+
+    The tables are referenced by their data cache key and are not kept alive
+    by the command, so the history never holds data outside its memory cap.
+    A table that was dropped since is read again from its file, through the
+    disk cache when it is enabled.
+    """
+
+    __slots__ = ("card", "old_key", "new_key", "old_titles", "new_titles")
+
+    def __init__(self, card: "InputCard", old_key: str | None, new_key: str | None):
+        self.card: "InputCard" = card
+        self.old_key: str | None = old_key
+        self.new_key: str | None = new_key
+        # Listed by the card while a dropped table is read again
+        self.old_titles: List[str] = self.get_titles(old_key)
+        self.new_titles: List[str] = self.get_titles(new_key)
+
+    @staticmethod
+    def get_titles(key: str | None) -> List[str]:
+        """Get the column titles of a loaded table"""
+        table = DataCache.get(key) if key is not None else None
+        return table.titles if table is not None else []
+
+    def restore(self, key: str | None, titles: List[str]) -> None:
+        """Show a table in the card, reading it again if it was dropped"""
+        if key is None or DataCache.get(key) is not None:
+            self.card.set_data(key)
+        else:
+            # Keys start with the path of the file
+            self.card.defer_file(key.rsplit("|", 2)[0], titles)
+
+    def undo(self, app: "App") -> None:
+        self.restore(self.old_key, self.old_titles)
+
+    def redo(self, app: "App") -> None:
+        self.restore(self.new_key, self.new_titles)
+
+    def get_size_bytes(self) -> int:
+        return (
+            super().get_size_bytes()
+            + sys.getsizeof(self.old_key)
+            + sys.getsizeof(self.new_key)
+            + sum(map(sys.getsizeof, self.old_titles))
+            + sum(map(sys.getsizeof, self.new_titles))
+        )
+
+
+class CommandGroup(Command):
+    """Commands of one gesture, undone and redone together"""
+
+    __slots__ = ("commands",)
+
+    def __init__(self):
+        self.commands: List[Command] = []
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    def add(self, command: Command) -> None:
+        """Add a command, merging it into an earlier one where possible"""
+        for previous in self.commands:
+            if previous.merge(command):
+                command.discard()
+                return
+        self.commands.append(command)
+
+    def undo(self, app: "App") -> None:
+        for command in reversed(self.commands):
+            command.undo(app)
+
+    def redo(self, app: "App") -> None:
+        for command in self.commands:
+            command.redo(app)
+
+    def discard(self) -> None:
+        for command in self.commands:
+            command.discard()
+
+    def get_size_bytes(self) -> int:
+        return (
+            super().get_size_bytes()
+            + sys.getsizeof(self.commands)
+            + sum(command.get_size_bytes() for command in self.commands)
+        )
+
+
+class History:
+    """Undo and redo stacks of commands
+
+    Changes are recorded as they happen. Changes made while a gesture is in
+    progress, e.g. the per-pixel steps of a drag, are collected in a group and
+    merged. The oldest entries are dropped once the history holds more than
+    max_bytes.
+    """
+
+    max_bytes: int = 1 << 20
+    undo_stack: Deque[Command] = deque()
+    redo_stack: List[Command] = []
+    size_bytes: int = 0
+    group: CommandGroup | None = None
+    # Set while commands are applied, so their changes are not recorded again
+    applying: bool = False
+
+    @classmethod
+    def set_max_bytes(cls, max_bytes: int) -> None:
+        """Change the memory cap of the history"""
+        cls.max_bytes = max_bytes
+        cls.trim()
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forget every change, e.g. when another project is opened"""
+        cls.group = None
+        for command in [*cls.undo_stack, *cls.redo_stack]:
+            command.discard()
+        cls.undo_stack.clear()
+        cls.redo_stack.clear()
+        cls.size_bytes = 0
+
+    @classmethod
+    def record(cls, command: Command) -> None:
+        """Record a change that was just made"""
+        if cls.applying:
+            command.discard()
+            return
+        if cls.group is not None:
+            cls.group.add(command)
+            return
+        cls.push(command)
+
+    @classmethod
+    def record_separately(cls, command: Command) -> None:
+        """Record a change that is not part of the gesture in progress
+
+        E.g. a file that finished loading in the background while a card was
+        dragged, so undoing the drag does not undo the load.
+        """
+        if cls.applying:
+            command.discard()
+            return
+        cls.push(command)
+
+    @classmethod
+    def push(cls, command: Command) -> None:
+        """Put a finished command on the undo stack"""
+        for undone in cls.redo_stack:
+            undone.discard()
+        cls.redo_stack.clear()
+        cls.undo_stack.append(command)
+        cls.size_bytes += command.get_size_bytes()
+        cls.trim()
+
+    @classmethod
+    def trim(cls) -> None:
+        """Drop the oldest commands until the history fits in max_bytes"""
+        while cls.size_bytes > cls.max_bytes and cls.undo_stack:
+            command = cls.undo_stack.popleft()
+            cls.size_bytes -= command.get_size_bytes()
+            command.discard()
+
+    @classmethod
+    def begin_group(cls) -> None:
+        """Start collecting the commands of a gesture"""
+        cls.end_group()
+        cls.group = CommandGroup()
+
+    @classmethod
+    def end_group(cls) -> None:
+        """Finish the current gesture"""
+        group, cls.group = cls.group, None
+        if group is None or not group:
+            return
+        cls.push(group.commands[0] if len(group) == 1 else group)
+
+    @classmethod
+    def can_undo(cls) -> bool:
+        """Whether there is something to undo"""
+        return bool(cls.undo_stack)
+
+    @classmethod
+    def can_redo(cls) -> bool:
+        """Whether there is something to redo"""
+        return bool(cls.redo_stack)
+
+    @classmethod
+    def undo(cls, app: "App") -> None:
+        """Revert the last change"""
+        cls.end_group()
+        if not cls.undo_stack:
+            return
+        command = cls.undo_stack.pop()
+        cls.size_bytes -= command.get_size_bytes()
+        cls.apply(command.undo, app)
+        cls.redo_stack.append(command)
+
+    @classmethod
+    def redo(cls, app: "App") -> None:
+        """Apply the last undone change again"""
+        cls.end_group()
+        if not cls.redo_stack:
+            return
+        command = cls.redo_stack.pop()
+        cls.apply(command.redo, app)
+        cls.undo_stack.append(command)
+        cls.size_bytes += command.get_size_bytes()
+        cls.trim()
+
+    @classmethod
+    def apply(cls, method, app: "App") -> None:
+        """Run an undo or redo without recording it"""
+        cls.applying = True
+        try:
+            method(app)
+        finally:
+            cls.applying = False
@@ -0,0 +1,39 @@
+import itertools
+from typing import Dict
+from uuid import uuid4
+
+
+class IdAllocator:
+    """Monotonic integer IDs for widgets
+
+    IDs are plain integers that are only unique within a running session.
+    A UUID is generated for an ID only when it has to outlive the session,
+    e.g. when the widget is persisted.
+    """
+
+    id_iter = itertools.count(1)
+    persistent_uuids: Dict[int, str] = {}
+
+    @classmethod
+    def next_id(cls) -> int:
+        """Allocate a new widget ID"""
+        return next(cls.id_iter)
+
+    @classmethod
+    def get_uuid(cls, widget_id: int) -> str:
+        """Get the persistent UUID of a widget, generating it on first use"""
+        uuid = cls.persistent_uuids.get(widget_id)
+        if uuid is None:
+            uuid = str(uuid4())
+            cls.persistent_uuids[widget_id] = uuid
+        return uuid
+
+    @classmethod
+    def set_uuid(cls, widget_id: int, uuid: str) -> None:
+        """Bind a widget ID to a UUID restored from a persisted file"""
+        cls.persistent_uuids[widget_id] = uuid
+
+    @classmethod
+    def release(cls, widget_id: int) -> None:
+        """Forget the persistent UUID of a widget that no longer exists"""
+        cls.persistent_uuids.pop(widget_id, None)
@@ -1,72 +1,83 @@
-from pathlib import Path
-from typing import Tuple
-from uuid import uuid4
-
-import pygame
-
-
-class MetaLabel:
-    """Meta class for labels"""
-
-    data_path: Path = Path("data")
-    font_path: Path = data_path.joinpath("fonts")
-
-    def __init__(
-        self,
-        uuid,
-        label,
-        rel_coord_x,
-        rel_coord_y,
-        font_name,
-        font_color,
-        font_size,
-    ):
-        self.uuid: str = uuid
-        self.label = label
-        self.rel_coord_x = rel_coord_x
-        self.rel_coord_y = rel_coord_y
-        self.font_name = font_name
-        self.font_color = font_color
-        self.font_size = font_size
-        self.hidden: bool = False
-
-        if not self.font_path.joinpath(font_name).exists:
-            raise FileNotFoundError(f"Font {font_name} not found")
-        self.font = pygame.font.SysFont(
-            self.font_path.joinpath(font_name).as_posix(), font_size, False
-        )
-
-    def __str__(self):
-        return f"{self.uuid}: {self.label}"
-
-    def hide(self) -> None:
-        """Hide label"""
-        self.hidden = True
-
-    def draw(self) -> pygame.Surface:
-        """Draw label"""
-        label_surf = self.font.render(self.label, True, self.font_color)
-        return label_surf
-
-
-class Label(MetaLabel):
-    """Standart label class"""
-
-    font_name: str = "ConsolaMono-Book.ttf"
-    font_color: Tuple[int, int, int] = (0, 0, 0)
-    font_size: int = 16
-
-    def __init__(self, label, rel_coord_x, rel_coord_y):
-        self.uuid: str = str(uuid4())
-        self.label = label
-        self.coord_x = rel_coord_x
-        self.coord_y = rel_coord_y
-        super().__init__(
-            self.uuid,
-            label,
-            rel_coord_x,
-            rel_coord_y,
-            self.font_name,
-            self.font_color,
-            self.font_size,
-        )
+import pygame
+
+from fontlib import FontCache
+from idlib import IdAllocator
+from stylelib import LabelStyle
+
+
+class MetaLabel:
+    """Meta class for labels"""
+
+    __slots__ = (
+        "widget_id",
+        "label",
+        "rel_coord_x",
+        "rel_coord_y",
+        "style",
+        "font",
+        "surf",
+        "hidden",
+    )
+
+    def __init__(
+        self,
+        label,
+        rel_coord_x,
+        rel_coord_y,
+        style: LabelStyle,
+    ):
+        self.widget_id: int = IdAllocator.next_id()
+        self.label = label
+        self.rel_coord_x = rel_coord_x
+        self.rel_coord_y = rel_coord_y
+        self.style: LabelStyle = style
+        self.hidden: bool = False
+        self.surf: pygame.Surface | None = None
+
+        self.font: pygame.font.Font = FontCache.get_sys_font(
+            style.font_name, style.font_size
+        )
+
+    def __str__(self):
+        return f"{self.widget_id}: {self.label}"
+
+    def hide(self) -> None:
+        """Hide label"""
+        self.hidden = True
+
+    def show(self) -> None:
+        """Show label"""
+        self.hidden = False
+
+    def set_label(self, label: str) -> None:
+        """Change the text of the label"""
+        if label != self.label:
+            self.label = label
+            self.surf = None
+
+    def draw(self) -> pygame.Surface:
+        """Draw label"""
+        # The text is only rendered again after it changed
+        if self.surf is None:
+            self.surf = self.font.render(self.label, True, self.style.font_color)
+        return self.surf
+
+
+class Label(MetaLabel):
+    """Standart label class"""
+
+    __slots__ = ()
+
+    label_style: LabelStyle = LabelStyle(
+        font_name="ConsolaMono-Book.ttf",
+        font_color=(0, 0, 0),
+        font_size=16,
+    )
+
+    def __init__(self, label, rel_coord_x, rel_coord_y):
+        super().__init__(
+            label,
+            rel_coord_x,
+            rel_coord_y,
+            self.label_style,
+        )
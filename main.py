@@ -1,297 +1,305 @@
-# TODO: Move hidden buttons, labels etc. to another list
-
-# pylint: disable=no-member
-
-from enum import IntEnum
-from pathlib import Path
-from typing import List
-
-# os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "HIDE"
-import pygame  # pylint: disable=wrong-import-position
-
-from cardlib import InputCard, MetaCard
-from menubar import MenuBar
-from app import App
-
-
-class MouseButton(IntEnum):
-    """Mouse Buttons"""
-
-    LEFT = 1
-    MIDDLE = 2
-    RIGHT = 3
-
-
-def main() -> None:
-    """Main function of the Node Baed Graph Wizard"""
-
-    # Initialize App
-    app = App()
-
-    data_path: Path = Path("data")
-    font_path: Path = data_path.joinpath("fonts")
-
-    window_width: int = 800
-    window_height: int = 600
-
-    pygame.init()
-    font_consolamono_16 = pygame.font.Font(
-        font_path.joinpath("ConsolaMono-Bold.ttf").as_posix(), 12
-    )
-    screen = pygame.display.set_mode((window_width, window_height), pygame.RESIZABLE)
-
-    menubar_height: int = 25
-    menubar = MenuBar(menubar_height)
-
-    clock = pygame.time.Clock()
-
-    pygame.display.set_caption(f"Node Based Graph Wizard v{app.get_version}")
-
-    running: bool = True
-
-    while running:
-
-        ########################################################################
-        #                              E v e n t s                             #
-        ########################################################################
-        for event in pygame.event.get():
-            match event.type:
-                # ----------------------------------------------
-                # KEYBOARD BUTTON DOWN EVENT
-                # ----------------------------------------------
-                case pygame.KEYDOWN:
-                    match event.key:
-                        # --------------------------------------
-                        # [D] DEBUG KEY:
-                        # Print a debug info on terminal
-                        # --------------------------------------
-                        case pygame.K_d:
-                            print("----------------------")
-                            print("Event: Debug Key Pressed")
-                            print("Cards:")
-                            for card in app.cards:
-                                print(card)
-                                print("Buttons:")
-                                for button in card.buttons:
-                                    print(button)
-                                print("- - - - - - - - - - - -")
-                                print("Labels:")
-                                for label in card.labels:
-                                    print(label)
-                                print("- - - - - - - - - - - -")
-                            print("----------------------")
-                # ----------------------------------------------
-                # MOUSE BUTTON DOWN EVENT
-                # ----------------------------------------------
-                case pygame.MOUSEBUTTONDOWN:
-                    match event.button:
-                        # --------------------------------------
-                        # LEFT MOUSE BUTTON
-                        # --------------------------------------
-                        case MouseButton.LEFT:
-                            if event.pos[1] <= menubar_height:
-                                for menu_item in menubar.menu_items:
-                                    if menu_item.get_rect().collidepoint(event.pos):
-                                        menu_item.click()
-                            if event.pos[1] > menubar_height:
-                                for card in app.cards:
-                                    if card.get_rect().collidepoint(event.pos):
-                                        # If only clicked on a card
-                                        app.set_left_mouse_button_down_status(
-                                            True, event.pos
-                                        )
-                                        for button in card.buttons:
-                                            if not button.hidden:
-                                                if button.get_rect().collidepoint(
-                                                    event.pos
-                                                ):
-                                                    button.click()
-                        # --------------------------------------
-                        # MIDDLE MOUSE BUTTON
-                        # --------------------------------------
-                        case MouseButton.MIDDLE:
-                            # print("Middle Mouse Button Down")
-                            app.set_middle_mouse_down_status(True, event.pos)
-                        # --------------------------------------
-                        # RIGHT MOUSE BUTTON
-                        # --------------------------------------
-                        case MouseButton.RIGHT:
-                            continue
-                # ----------------------------------------------
-                # BUTTON UP EVENT
-                # ----------------------------------------------
-                case pygame.MOUSEBUTTONUP:
-                    match event.button:
-                        # --------------------------------------
-                        # LEFT MOUSE BUTTON
-                        # --------------------------------------
-                        case MouseButton.LEFT:
-                            app.set_left_mouse_button_down_status(False, event.pos)
-                        # --------------------------------------
-                        # MIDDLE MOUSE BUTTON
-                        # --------------------------------------
-                        case MouseButton.MIDDLE:
-                            if app.get_middle_mouse_button_down_status():
-                                app.set_middle_mouse_down_status(False, event.pos)
-                # ----------------------------------------------
-                # MOUSE MOTION EVENT
-                # ----------------------------------------------
-                case pygame.MOUSEMOTION:
-                    # ------------------------------------------
-                    # SCREEN DRAGGING WITH MIDDLE MOUSE BUTTON
-                    # ------------------------------------------
-                    if app.get_middle_mouse_button_down_status():
-                        for card in app.cards:
-                            card.update_card_pos(
-                                app.get_middle_mouse_down_pos(),
-                                event.pos,
-                            )
-                        app.set_screen_drag(
-                            app.get_middle_mouse_down_pos(),
-                            event.pos,
-                        )
-                        app.set_middle_mouse_down_pos(event.pos)
-                    # ------------------------------------------
-                    # CARD DRAGGING WITH LEFT MOUSE BUTTON
-                    # ------------------------------------------
-                    if app.get_left_mouse_button_down_status():
-                        # Find the cards that collide with the mouse position and
-                        # drag the card that has biggest z_order
-                        card_to_be_dragged: MetaCard | None = None
-                        for card in app.cards:
-                            if card.get_rect().collidepoint(event.pos):
-                                if card_to_be_dragged is None:
-                                    card_to_be_dragged = card
-                                elif card_to_be_dragged is not None:
-                                    if card.z_order > card_to_be_dragged.z_order:
-                                        card_to_be_dragged = card
-                        if card_to_be_dragged is not None:
-                            # Set cards z_order to the highest
-                            card_to_be_dragged.update_z_order_to_bring_front()
-                            app.sort_cards_by_z_order()
-                            card_to_be_dragged.update_card_pos(
-                                app.get_left_mouse_button_down_pos(),
-                                event.pos,
-                            )
-                        app.set_left_mouse_button_down_pos(event.pos)
-                    # - - - - - - - - - - - - - - - - - - - - -
-                    if event.pos[1] > menubar_height:
-                        # ------------------------------------------
-                        # HIGHLIGHTING CARD AND BUTTONS
-                        # ------------------------------------------
-                        # Find the cards that collide with the mouse position and
-                        # highlight the card that has biggest z_order
-                        card_to_be_highlighted: MetaCard | None = None
-                        for card in app.cards:
-                            # Set all card and button highlight to false
-                            card.set_highlight(False)
-                            for button in card.buttons:
-                                button.set_highlight(False)
-                            # Find the card that collides with the mouse position
-                            if card.get_rect().collidepoint(event.pos):
-                                if card_to_be_highlighted is None:
-                                    card_to_be_highlighted = card
-                                elif (
-                                    card_to_be_highlighted is not None
-                                    and card.z_order > card_to_be_highlighted.z_order
-                                ):
-                                    card_to_be_highlighted = card
-                        # Highlight the card that has biggest z_order
-                        if card_to_be_highlighted is not None:
-                            card_to_be_highlighted.set_highlight(True)
-                            for button in card_to_be_highlighted.buttons:  # type: ignore
-                                if button.get_rect().collidepoint(event.pos):
-                                    button.set_highlight(True)
-                                else:
-                                    button.set_highlight(False)
-                    else:
-                        # ------------------------------------------
-                        # MENUBAR ON HOVER EFFECTS
-                        # ------------------------------------------
-                        for menu_item in menubar.menu_items:
-                            if menu_item.get_rect().collidepoint(event.pos):
-                                menu_item.set_highlight(True)
-                            else:
-                                menu_item.set_highlight(False)
-                                if menu_item.open:
-                                    for child_menu_item in menu_item.children:
-                                        child_menu_item.set_highlight(False)
-                                        if child_menu_item.get_rect().collidepoint(
-                                            event.pos
-                                        ):
-                                            child_menu_item.set_highlight(True)
-                                            print(
-                                                f"Child highlighted: {child_menu_item.label}"
-                                            )
-
-                # ----------------------------------------------
-                # QUIT EVENT
-                # ----------------------------------------------
-                case pygame.QUIT:
-                    running = False
-                # ----------------------------------------------
-                # WINDOW RESIZED OR WINDOW SIZE CHANGED EVENT
-                # ----------------------------------------------
-                case pygame.WINDOWRESIZED | pygame.WINDOWSIZECHANGED:
-                    window_width = screen.get_width()
-                    window_height = screen.get_height()
-                    pygame.display.update()
-
-        clock.tick(60)
-
-        fps_label = font_consolamono_16.render(
-            f"FPS: {clock.get_fps():.0f}", True, (220, 220, 220)
-        )
-        coordinate_label = font_consolamono_16.render(
-            f"X: {app.get_screen_drag()[0]}, Y: {app.get_screen_drag()[1]}",
-            True,
-            (220, 220, 220),
-        )
-
-        screen.fill((33, 40, 48))
-
-        # ---------------------------------------------------
-        # DRAW LINES
-        # ---------------------------------------------------
-        pygame.draw.line(
-            screen,
-            (120, 120, 120),
-            (
-                0 + app.screen_drag_x + window_width / 2,
-                -1e5 + app.screen_drag_y + window_height / 2,
-            ),
-            (
-                0 + app.screen_drag_x + window_width / 2,
-                1e5 + app.screen_drag_y + window_height / 2,
-            ),
-            1,
-        )
-        pygame.draw.line(
-            screen,
-            (120, 120, 120),
-            (
-                -1e5 + app.screen_drag_x + window_width / 2,
-                0 + app.screen_drag_y + window_height / 2,
-            ),
-            (
-                1e5 + app.screen_drag_x + window_width / 2,
-                0 + app.screen_drag_y + window_height / 2,
-            ),
-            1,
-        )
-
-        for card in app.cards:
-            card.draw(screen)
-
-        screen.blit(fps_label, (window_width - 75, 30))
-        screen.blit(coordinate_label, (window_width - 125, window_height - 20))
-
-        menubar.draw(screen)
-
-        pygame.display.update()
-
-    pygame.quit()
-
-
-if __name__ == "__main__":
-    main()
+# TODO: Move hidden buttons, labels etc. to another list
+
+# pylint: disable=no-member
+
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from startuplib import StartupProfiler
+
+# Import timing has to be hooked before the heavy modules are imported
+StartupProfiler.install_if_requested(sys.argv)
+
+# os.environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "HIDE"
+import pygame  # pylint: disable=wrong-import-position
+
+from backgroundlib import Background  # pylint: disable=wrong-import-position
+from fontlib import FontCache  # pylint: disable=wrong-import-position
+from menubar import MenuBar  # pylint: disable=wrong-import-position
+from minimaplib import MiniMap  # pylint: disable=wrong-import-position
+from nodelib import NodeKind  # pylint: disable=wrong-import-position
+from app import App  # pylint: disable=wrong-import-position
+from datalib import DataCache  # pylint: disable=wrong-import-position
+from debuglib import DebugSnapshot  # pylint: disable=wrong-import-position
+from dialoglib import FileDialog  # pylint: disable=wrong-import-position
+from eventlib import (  # pylint: disable=wrong-import-position
+    EventDispatcher,
+    MouseButton,
+)
+from historylib import History  # pylint: disable=wrong-import-position
+from replaylib import (  # pylint: disable=wrong-import-position
+    FrameStats,
+    InputRecorder,
+    InputReplayer,
+)
+from resultcachelib import ResultCache  # pylint: disable=wrong-import-position
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(description="Node Based Graph Wizard")
+    parser.add_argument("project", nargs="?", help="project file to open")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="report import and initialization time per module after the first frame",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="trace Python allocations for the debug snapshots of the D key",
+    )
+    parser.add_argument(
+        "--history-limit",
+        metavar="MB",
+        type=float,
+        default=History.max_bytes / (1 << 20),
+        help="memory cap of the undo history in megabytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".nowi-cache",
+        help="directory of the parsed data files and their statistics "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="parse every data file again"
+    )
+    input_group = parser.add_mutually_exclusive_group()
+    input_group.add_argument(
+        "--record",
+        metavar="PATH",
+        help="record every input event and opened file to a gzip file",
+    )
+    input_group.add_argument(
+        "--replay",
+        metavar="PATH",
+        help="replay a recording headlessly as fast as possible and report frame times",
+    )
+    parser.add_argument(
+        "--replay-stats",
+        metavar="PATH",
+        help="also write the frame time statistics of a replay to a JSON file",
+    )
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    """Main function of the Node Baed Graph Wizard"""
+
+    args = parse_args(sys.argv[1:])
+
+    if args.trace_memory:
+        DebugSnapshot.start_tracing()
+
+    History.set_max_bytes(int(args.history_limit * (1 << 20)))
+    if not args.no_cache:
+        DataCache.disk_cache = ResultCache(Path(args.cache_dir))
+
+    # Initialize App
+    app = App()
+
+    window_width: int = 800
+    window_height: int = 600
+
+    replayer: InputReplayer | None = None
+    frame_stats: FrameStats | None = None
+    if args.replay:
+        # Replays run without a window and use the recorded window size
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        replayer = InputReplayer(args.replay)
+        frame_stats = FrameStats()
+        FileDialog.replayer = replayer
+        window_width, window_height = replayer.window_size
+
+    # Only the display is initialized up front, other pygame subsystems and
+    # tkinter are initialized on first use
+    with StartupProfiler.measure("pygame.display.init"):
+        pygame.display.init()
+    font_consolamono_16 = FontCache.get_font("ConsolaMono-Bold.ttf", 12)
+    with StartupProfiler.measure("pygame.display.set_mode"):
+        screen = pygame.display.set_mode(
+            (window_width, window_height), pygame.RESIZABLE
+        )
+
+    menubar_height: int = 25
+    with StartupProfiler.measure("MenuBar"):
+        menubar = MenuBar(menubar_height, app)
+
+    background = Background()
+
+    # Shared with the menu bar, which adds cards too
+    minimap = MiniMap()
+    minimap.layout((window_width, window_height))
+    App.minimap = minimap
+
+    recorder: InputRecorder | None = None
+    if args.record:
+        recorder = InputRecorder(args.record, (window_width, window_height))
+        FileDialog.recorder = recorder
+
+    if args.project:
+        with StartupProfiler.measure("open project"):
+            app.open_project(args.project)
+
+    # Every input event goes to the handlers subscribed to its type, the
+    # ones limited to a region only get the events with the cursor in it
+    running: bool = True
+
+    def quit_app(event: pygame.event.Event) -> bool:
+        nonlocal running
+        running = False
+        return True
+
+    def resize_window(event: pygame.event.Event) -> bool:
+        nonlocal window_width, window_height
+        window_width = screen.get_width()
+        window_height = screen.get_height()
+        minimap.layout((window_width, window_height))
+        pygame.display.update()
+        return True
+
+    def jump_minimap(event: pygame.event.Event) -> bool:
+        if event.button != MouseButton.LEFT:
+            return False
+        # Center the view on the clicked place of the minimap
+        minimap.jump(app, event.pos, screen.get_size())
+        return True
+
+    app.canvas_top = menubar_height
+    dispatcher = EventDispatcher()
+    dispatcher.subscribe(pygame.QUIT, quit_app)
+    dispatcher.subscribe(pygame.WINDOWRESIZED, resize_window)
+    dispatcher.subscribe(pygame.WINDOWSIZECHANGED, resize_window)
+    dispatcher.subscribe(pygame.KEYDOWN, app.handle_key_down)
+    dispatcher.subscribe(pygame.TEXTINPUT, app.handle_text_input)
+    dispatcher.subscribe(pygame.MOUSEWHEEL, app.handle_mouse_wheel, app.is_on_canvas)
+    dispatcher.subscribe(pygame.MOUSEBUTTONDOWN, app.update_focus, priority=0)
+    dispatcher.subscribe(
+        pygame.MOUSEBUTTONDOWN, menubar.handle_mouse_down, menubar.contains, priority=1
+    )
+    dispatcher.subscribe(
+        pygame.MOUSEBUTTONDOWN, jump_minimap, minimap.contains, priority=2
+    )
+    dispatcher.subscribe(
+        pygame.MOUSEBUTTONDOWN, app.handle_mouse_down, app.is_on_canvas, priority=3
+    )
+    dispatcher.subscribe(pygame.MOUSEBUTTONUP, app.handle_mouse_up)
+    dispatcher.subscribe(pygame.MOUSEMOTION, app.handle_mouse_drag, priority=0)
+    dispatcher.subscribe(
+        pygame.MOUSEMOTION,
+        menubar.update_hover,
+        menubar.contains,
+        priority=1,
+        on_leave=menubar.menu_hover.clear,
+    )
+    dispatcher.subscribe(
+        pygame.MOUSEMOTION,
+        app.update_hover,
+        app.is_on_canvas,
+        priority=2,
+        on_leave=app.hover.clear,
+    )
+
+    clock = pygame.time.Clock()
+
+    pygame.display.set_caption(f"Node Based Graph Wizard v{app.get_version}")
+
+    while running:
+
+        ########################################################################
+        #                               I n p u t                              #
+        ########################################################################
+        if replayer is not None:
+            frame_stats.start_frame()  # type: ignore
+            events = replayer.next_frame()
+            if events is None:
+                break
+            mouse_pos = replayer.mouse_pos
+            key_mods = replayer.mods
+        else:
+            events = pygame.event.get()
+            mouse_pos = pygame.mouse.get_pos()
+            key_mods = pygame.key.get_mods()
+            if recorder is not None:
+                recorder.record_frame(events, mouse_pos, key_mods)
+
+        ########################################################################
+        #                              E v e n t s                             #
+        ########################################################################
+        app.frame += 1
+        app.mouse_pos = mouse_pos
+        app.key_mods = key_mods
+        for event in events:
+            dispatcher.dispatch(event, mouse_pos)
+
+        # Replays are not limited to 60 FPS
+        clock.tick(0 if replayer is not None else 60)
+
+        fps_label = font_consolamono_16.render(
+            f"FPS: {clock.get_fps():.0f}", True, (220, 220, 220)
+        )
+        coordinate_label = font_consolamono_16.render(
+            f"X: {app.get_screen_drag()[0]:.0f}, Y: {app.get_screen_drag()[1]:.0f}, "
+            f"Zoom: {app.get_zoom() * 100:.0f}%",
+            True,
+            (220, 220, 220),
+        )
+
+        background.draw(screen, app.get_screen_drag(), app.zoom_level)
+
+        # While dragging, cards are drawn from their last render and are only
+        # rendered again once the motion stops
+        fast_cards: bool = app.is_interacting()
+        for card in app.cards:
+            card.draw(screen, app.get_screen_drag(), app.zoom_level, fast_cards)
+
+        app.wires.draw(screen, app.get_screen_drag(), app.zoom_level)
+        if app.wire_drag_source is not None:
+            wire_source_card, wire_source_port = app.wire_drag_source
+            app.wires.draw_preview(
+                screen,
+                wire_source_card.get_port_pos(wire_source_port, NodeKind.OUTPUT),
+                app.screen_to_world(mouse_pos),
+                app.get_screen_drag(),
+                app.get_zoom(),
+            )
+
+        minimap.draw(screen, app)
+
+        screen.blit(fps_label, (window_width - 75, 30))
+        screen.blit(
+            coordinate_label,
+            (window_width - coordinate_label.get_width() - 10, window_height - 20),
+        )
+
+        if app.status_text:
+            screen.blit(
+                font_consolamono_16.render(app.status_text, True, (230, 120, 110)),
+                (10, menubar_height + 8),
+            )
+
+        menubar.draw(screen)
+
+        pygame.display.update()
+
+        StartupProfiler.report()
+
+        if frame_stats is not None:
+            frame_stats.end_frame()
+
+    DebugSnapshot.wait()
+    if recorder is not None:
+        recorder.close()
+    if replayer is not None:
+        replayer.close()
+        frame_stats.report(args.replay_stats)  # type: ignore
+
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
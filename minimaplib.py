@@ -0,0 +1,201 @@
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+
+import pygame
+
+if TYPE_CHECKING:
+    from cardlib import MetaCard
+
+
+class MiniMap:
+    """Downsampled overview of every card on the canvas
+
+    The overview is kept in a persistent surface. Moving a card only erases
+    its previous rectangle and redraws the few cards overlapping it, found
+    through a coarse grid index, so the cost of a move does not depend on the
+    number of cards. The whole overview is rebuilt only when a card leaves the
+    mapped area.
+    """
+
+    width: int = 200
+    height: int = 150
+    margin: int = 10
+    cell_size: int = 8
+    # Extra room around the cards, so most moves stay inside the mapped area
+    bounds_padding: float = 0.25
+
+    background_color: Tuple[int, int, int] = (24, 29, 35)
+    border_color: Tuple[int, int, int] = (120, 120, 120)
+    viewport_color: Tuple[int, int, int] = (220, 220, 220)
+
+    def __init__(self):
+        self.hidden: bool = False
+        self.scene: pygame.Surface = pygame.Surface((self.width, self.height))
+        self.bounds: pygame.Rect = pygame.Rect(0, 0, 1, 1)
+        self.scale: float = 1.0
+        self.cards: Dict[int, "MetaCard"] = {}
+        self.card_rects: Dict[int, pygame.Rect] = {}
+        self.cells: Dict[Tuple[int, int], Set[int]] = {}
+        self.needs_rebuild: bool = True
+        self.rect: pygame.Rect = pygame.Rect(0, 0, self.width, self.height)
+
+    def add_card(self, card: "MetaCard") -> None:
+        """Add a card to the overview"""
+        self.cards[card.widget_id] = card
+        self.update_card(card)
+
+    def remove_card(self, card: "MetaCard") -> None:
+        """Remove a card from the overview"""
+        self.cards.pop(card.widget_id, None)
+        if not self.needs_rebuild:
+            old_rect = self.unindex_card(card.widget_id)
+            if old_rect is not None:
+                self.repaint(old_rect)
+
+    def update_card(self, card: "MetaCard") -> None:
+        """Redraw a card that was added or moved"""
+        if self.needs_rebuild:
+            return
+        if not self.bounds.contains(card.get_rect()):
+            self.needs_rebuild = True
+            return
+        old_rect = self.unindex_card(card.widget_id)
+        new_rect = self.index_card(card)
+        # Both areas are painted in z-order, so the card stays below the
+        # cards in front of it
+        if old_rect is not None:
+            self.repaint(old_rect)
+        self.repaint(new_rect)
+
+    def rebuild(self) -> None:
+        """Recompute the mapped area and redraw every card"""
+        self.needs_rebuild = False
+        self.card_rects.clear()
+        self.cells.clear()
+        self.scene.fill(self.background_color)
+        if not self.cards:
+            return
+
+        bounds = pygame.Rect(next(iter(self.cards.values())).get_rect()).unionall(
+            [card.get_rect() for card in self.cards.values()]
+        )
+        bounds.inflate_ip(
+            max(bounds.width * self.bounds_padding * 2, 1),
+            max(bounds.height * self.bounds_padding * 2, 1),
+        )
+        self.scale = min(self.width / bounds.width, self.height / bounds.height)
+        # Center the mapped area in the panel
+        bounds.inflate_ip(
+            self.width / self.scale - bounds.width,
+            self.height / self.scale - bounds.height,
+        )
+        self.bounds = bounds
+
+        for card in sorted(self.cards.values(), key=lambda x: x.z_order):
+            self.draw_card(card)
+
+    def to_minimap(self, rect: pygame.Rect) -> pygame.Rect:
+        """Convert a canvas rect to a rect on the overview"""
+        minimap_rect = pygame.Rect(
+            (rect.x - self.bounds.x) * self.scale,
+            (rect.y - self.bounds.y) * self.scale,
+            rect.width * self.scale,
+            rect.height * self.scale,
+        )
+        # Keep tiny cards visible
+        minimap_rect.width = max(minimap_rect.width, 2)
+        minimap_rect.height = max(minimap_rect.height, 2)
+        return minimap_rect
+
+    def to_world(self, pos) -> Tuple[float, float]:
+        """Convert a window position on the overview to canvas coordinates"""
+        return (
+            (pos[0] - self.rect.x) / self.scale + self.bounds.x,
+            (pos[1] - self.rect.y) / self.scale + self.bounds.y,
+        )
+
+    def get_cells(self, rect: pygame.Rect) -> List[Tuple[int, int]]:
+        """Get the grid cells covered by a rect on the overview"""
+        return [
+            (cell_x, cell_y)
+            for cell_x in range(
+                rect.left // self.cell_size, (rect.right - 1) // self.cell_size + 1
+            )
+            for cell_y in range(
+                rect.top // self.cell_size, (rect.bottom - 1) // self.cell_size + 1
+            )
+        ]
+
+    def index_card(self, card: "MetaCard") -> pygame.Rect:
+        """Index the overview rect of a card and return it"""
+        minimap_rect = self.to_minimap(card.get_rect())
+        self.card_rects[card.widget_id] = minimap_rect
+        for cell in self.get_cells(minimap_rect):
+            self.cells.setdefault(cell, set()).add(card.widget_id)
+        return minimap_rect
+
+    def draw_card(self, card: "MetaCard") -> None:
+        """Draw a card on the overview and index its rect"""
+        self.scene.fill(card.style.title_bar_background_color, self.index_card(card))
+
+    def unindex_card(self, card_id: int) -> pygame.Rect | None:
+        """Forget the overview rect of a card and return it"""
+        old_rect = self.card_rects.pop(card_id, None)
+        if old_rect is not None:
+            for cell in self.get_cells(old_rect):
+                cell_cards = self.cells.get(cell)
+                if cell_cards is not None:
+                    cell_cards.discard(card_id)
+        return old_rect
+
+    def repaint(self, area: pygame.Rect) -> None:
+        """Clear an area of the overview and redraw the cards overlapping it"""
+        self.scene.fill(self.background_color, area)
+        overlapping: Set[int] = set()
+        for cell in self.get_cells(area):
+            overlapping.update(self.cells.get(cell, ()))
+        self.scene.set_clip(area)
+        for card_id in sorted(overlapping, key=lambda x: self.cards[x].z_order):
+            if self.card_rects[card_id].colliderect(area):
+                self.scene.fill(
+                    self.cards[card_id].style.title_bar_background_color,
+                    self.card_rects[card_id],
+                )
+        self.scene.set_clip(None)
+
+    def layout(self, window_size: Tuple[int, int]) -> None:
+        """Place the panel in the bottom left corner of the window"""
+        self.rect.topleft = (self.margin, window_size[1] - self.height - self.margin)
+
+    def get_rect(self) -> pygame.Rect:
+        """Get the rect of the panel on the window"""
+        return self.rect
+
+    def contains(self, pos) -> bool:
+        """Whether a window position is on the visible panel"""
+        return not self.hidden and self.rect.collidepoint(pos)
+
+    def jump(self, app, pos, window_size) -> None:
+        """Center the view on the canvas point under a click on the overview"""
+        app.center_on(self.to_world(pos), window_size)
+
+    def draw(self, win: pygame.Surface, app) -> None:
+        """Draw the overview and the visible area in the bottom left corner"""
+        if self.hidden:
+            return
+        if self.needs_rebuild:
+            self.rebuild()
+
+        win.blit(self.scene, self.rect)
+
+        # Visible part of the canvas
+        view_x, view_y = app.screen_to_world((0, 0))
+        zoom: float = app.get_zoom()
+        view_rect = self.to_minimap(
+            pygame.Rect(
+                view_x, view_y, win.get_width() / zoom, win.get_height() / zoom
+            )
+        ).move(self.rect.topleft)
+        win.set_clip(self.rect)
+        pygame.draw.rect(win, self.viewport_color, view_rect, 1)
+        win.set_clip(None)
+        pygame.draw.rect(win, self.border_color, self.rect, 1)
@@ -1,98 +1,100 @@
-# pylint: disable=no-member
-
-from typing import Tuple
-
-import pygame
-import pygame.gfxdraw
-
-
-class MetaNode:
-    """Boilerplate class for creating nodes"""
-
-    def __init__(
-        self,
-        label: str,
-        coord_x: int,
-        coord_y: int,
-        node_size: int,
-        node_inner_color: Tuple[int, int, int],
-        node_border_color: Tuple[int, int, int],
-    ) -> None:
-        self.label = label
-        self.rel_coord_x = coord_x
-        self.rel_coord_y = coord_y
-        self.node_size = node_size
-        self.node_inner_color = node_inner_color
-        self.node_border_color = node_border_color
-        self.surf = pygame.Surface(
-            (self.node_size + 2, self.node_size + 2), pygame.SRCALPHA
-        )
-        # pygame.draw.circle(
-        #     self.surf,
-        #     self.node_inner_color,
-        #     (self.node_size / 2, self.node_size / 2),
-        #     self.node_size / 2,
-        #     0,
-        # )
-        pygame.gfxdraw.filled_circle(
-            self.surf,
-            self.node_size // 2,
-            self.node_size // 2,
-            self.node_size // 2,
-            self.node_inner_color,
-        )
-        # pygame.draw.circle(
-        #     self.surf,
-        #     (255, 255, 255),
-        #     (self.node_size / 2, self.node_size / 2),
-        #     self.node_size / 5,
-        #     0,
-        # )
-        pygame.gfxdraw.filled_circle(
-            self.surf,
-            self.node_size // 2,
-            self.node_size // 2,
-            self.node_size // 5,
-            (255, 255, 255),
-        )
-        # pygame.draw.circle(
-        #     self.surf,
-        #     self.node_border_color,
-        #     (self.node_size // 2, self.node_size // 2),
-        #     self.node_size // 2,
-        #     2,
-        # )
-        pygame.gfxdraw.circle(
-            self.surf,
-            self.node_size // 2,
-            self.node_size // 2,
-            self.node_size // 2,
-            self.node_border_color,
-        )
-
-    def draw(self) -> pygame.Surface:
-        """Draws the node on the screen"""
-
-        return self.surf
-
-
-class Node(MetaNode):
-    """Class for creating nodes"""
-
-    node_size: int = 14
-    node_inner_color: Tuple[int, int, int] = (255, 0, 0)
-    node_border_color: Tuple[int, int, int] = (0, 0, 0)
-
-    def __init__(self, label: str, coord_x: int, coord_y: int) -> None:
-        self.label = label
-        self.rel_coord_x = coord_x
-        self.rel_coord_y = coord_y
-
-        super().__init__(
-            label,
-            coord_x,
-            coord_y,
-            self.node_size,
-            self.node_inner_color,
-            self.node_border_color,
-        )
+# pylint: disable=no-member
+
+from enum import Enum
+from typing import Tuple
+
+import pygame
+
+from idlib import IdAllocator
+from spritelib import SpriteAtlas
+from stylelib import NodeStyle
+
+
+class NodeKind(Enum):
+    """Direction of the data flowing through a node"""
+
+    INPUT = 1
+    OUTPUT = 2
+
+
+class MetaNode:
+    """Boilerplate class for creating nodes"""
+
+    __slots__ = (
+        "widget_id",
+        "label",
+        "kind",
+        "rel_coord_x",
+        "rel_coord_y",
+        "style",
+        "surf",
+    )
+
+    def __init__(
+        self,
+        label: str,
+        kind: NodeKind,
+        coord_x: int,
+        coord_y: int,
+        style: NodeStyle,
+    ) -> None:
+        self.widget_id: int = IdAllocator.next_id()
+        self.label = label
+        self.kind: NodeKind = kind
+        self.rel_coord_x = coord_x
+        self.rel_coord_y = coord_y
+        self.style: NodeStyle = style
+        self.surf: pygame.Surface = SpriteAtlas.get_node_sprite(
+            style.node_size, style.node_inner_color, style.node_border_color
+        )
+
+    def get_rel_rect(self) -> pygame.Rect:
+        """Get rect of the node relative to its parent card"""
+        return pygame.Rect(
+            self.rel_coord_x,
+            self.rel_coord_y,
+            self.style.node_size + 2,
+            self.style.node_size + 2,
+        )
+
+    def get_rel_center(self) -> Tuple[int, int]:
+        """Get the center of the node relative to its parent card"""
+        return (
+            self.rel_coord_x + self.style.node_size // 2,
+            self.rel_coord_y + self.style.node_size // 2,
+        )
+
+    def draw(self) -> pygame.Surface:
+        """Draws the node on the screen"""
+
+        return self.surf
+
+
+class Node(MetaNode):
+    """Class for creating output nodes"""
+
+    __slots__ = ()
+
+    node_style: NodeStyle = NodeStyle(
+        node_size=14,
+        node_inner_color=(255, 0, 0),
+        node_border_color=(0, 0, 0),
+    )
+
+    def __init__(self, label: str, coord_x: int, coord_y: int) -> None:
+        super().__init__(label, NodeKind.OUTPUT, coord_x, coord_y, self.node_style)
+
+
+class InputNode(MetaNode):
+    """Class for creating input nodes"""
+
+    __slots__ = ()
+
+    node_style: NodeStyle = NodeStyle(
+        node_size=14,
+        node_inner_color=(0, 120, 255),
+        node_border_color=(0, 0, 0),
+    )
+
+    def __init__(self, label: str, coord_x: int, coord_y: int) -> None:
+        super().__init__(label, NodeKind.INPUT, coord_x, coord_y, self.node_style)
@@ -0,0 +1,118 @@
+import gzip
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+from cardtypes import CardClasses, CardType
+from idlib import IdAllocator
+
+if TYPE_CHECKING:
+    from app import App
+    from cardlib import MetaCard
+
+
+class ProjectFile:
+    """Saves and opens the graph of the canvas
+
+    Projects are gzip compressed JSON holding the cards in z-order, their
+    positions and state, and the wires between them. Input cards store the
+    path and the column titles of their file, so opening a project restores
+    the whole graph without reading any data file.
+    """
+
+    format_name: str = "nowi-project"
+    format_version: int = 1
+    extension: str = ".nowi"
+
+    @classmethod
+    def to_dict(cls, app: "App") -> Dict:
+        """Describe the graph of the application"""
+        cards: List[Dict] = []
+        for card in sorted(app.cards, key=lambda x: x.z_order):
+            cards.append(
+                {
+                    "id": IdAllocator.get_uuid(card.widget_id),
+                    "type": CardClasses.get_type(card).name,
+                    "title": card.title,
+                    "x": card.coord_x,
+                    "y": card.coord_y,
+                    "state": card.get_state(),
+                }
+            )
+        return {
+            "format": cls.format_name,
+            "version": cls.format_version,
+            "view": {
+                "screen_drag": list(app.get_screen_drag()),
+                "zoom_level": app.zoom_level,
+            },
+            "cards": cards,
+            "wires": [
+                [
+                    IdAllocator.get_uuid(wire.source_card.widget_id),
+                    wire.source_port,
+                    IdAllocator.get_uuid(wire.target_card.widget_id),
+                    wire.target_port,
+                ]
+                for wire in app.wires.wires.values()
+            ],
+        }
+
+    @classmethod
+    def save(cls, app: "App", path: Path) -> None:
+        """Write the graph of the application to a project file"""
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            json.dump(cls.to_dict(app), file, separators=(",", ":"))
+
+    @classmethod
+    def read(cls, path: Path) -> Dict:
+        """Read a project file without creating any card"""
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            project: Dict = json.load(file)
+        if project.get("format") != cls.format_name:
+            raise ValueError(f"{path} is not a project file")
+        if project.get("version", 0) > cls.format_version:
+            raise ValueError(f"{path} was saved by a newer version")
+        return project
+
+    @classmethod
+    def open(cls, app: "App", path: Path) -> None:
+        """Replace the graph of the application with a project
+
+        The whole project is read and its cards are built first, so a bad
+        file leaves the open project and its undo history as they were.
+        """
+        project: Dict = cls.read(path)
+
+        cards: Dict[str, "MetaCard"] = {}
+        try:
+            for card_dict in project["cards"]:
+                card = CardClasses.get(CardType[card_dict["type"]])(
+                    card_dict["title"], card_dict["x"], card_dict["y"]
+                )
+                cards[card_dict["id"]] = card
+                IdAllocator.set_uuid(card.widget_id, card_dict["id"])
+                card.set_state(card_dict.get("state", {}))
+            wires: List[Tuple[str, str, str, str]] = [
+                (source_id, source_port, target_id, target_port)
+                for source_id, source_port, target_id, target_port in project["wires"]
+            ]
+            view: Dict = project.get("view", {})
+            screen_drag_x, screen_drag_y = view.get("screen_drag", (0, 0))
+            zoom_level: int = int(view.get("zoom_level", 0))
+        except BaseException:
+            for card in cards.values():
+                card.release()
+                IdAllocator.release(card.widget_id)
+            raise
+
+        app.clear()
+        for card in cards.values():
+            app.register_card(card)
+        for source_id, source_port, target_id, target_port in wires:
+            if source_id in cards and target_id in cards:
+                app.wires.add_wire(
+                    cards[source_id], source_port, cards[target_id], target_port
+                )
+        app.screen_drag_x, app.screen_drag_y = screen_drag_x, screen_drag_y
+        app.zoom_level = zoom_level
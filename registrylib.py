@@ -0,0 +1,98 @@
+from typing import Any, Dict
+
+import pygame
+
+
+class WidgetRegistry:
+    """Maps widget IDs to widgets and their cached absolute rects
+
+    A card owns a registry of its widgets whose rects are relative to the
+    card; the absolute rects are computed on first use and kept until the card
+    moves or the widget changes. The application owns the top level registry
+    which knows every card and which card registry holds a given widget ID.
+    """
+
+    __slots__ = ("owner", "parent", "widgets", "rel_rects", "rects", "children")
+
+    def __init__(self, owner: Any = None):
+        self.owner: Any = owner
+        self.parent: WidgetRegistry | None = None
+        self.widgets: Dict[int, Any] = {}
+        self.rel_rects: Dict[int, pygame.Rect] = {}
+        self.rects: Dict[int, pygame.Rect] = {}
+        self.children: Dict[int, WidgetRegistry] = {}
+
+    def __len__(self) -> int:
+        return len(self.widgets)
+
+    def __contains__(self, widget_id: int) -> bool:
+        return widget_id in self.widgets
+
+    def register(self, widget: Any, rel_rect: pygame.Rect | None = None) -> None:
+        """Register a widget with its rect relative to the owner"""
+        self.widgets[widget.widget_id] = widget
+        if rel_rect is not None:
+            self.rel_rects[widget.widget_id] = pygame.Rect(rel_rect)
+        self.rects.pop(widget.widget_id, None)
+        if self.parent is not None:
+            self.parent.children[widget.widget_id] = self
+
+    def unregister(self, widget_id: int) -> None:
+        """Remove a widget from the registry"""
+        self.widgets.pop(widget_id, None)
+        self.rel_rects.pop(widget_id, None)
+        self.rects.pop(widget_id, None)
+        if self.parent is not None:
+            self.parent.children.pop(widget_id, None)
+
+    def attach(self, parent: "WidgetRegistry") -> None:
+        """Make the widgets of this registry reachable from a parent registry"""
+        self.detach()
+        self.parent = parent
+        for widget_id in self.widgets:
+            parent.children[widget_id] = self
+
+    def detach(self) -> None:
+        """Remove the widgets of this registry from its parent registry"""
+        if self.parent is not None:
+            for widget_id in self.widgets:
+                self.parent.children.pop(widget_id, None)
+            self.parent = None
+
+    def get(self, widget_id: int) -> Any:
+        """Get a widget by ID from this registry or any attached registry"""
+        widget = self.widgets.get(widget_id)
+        if widget is None:
+            child = self.children.get(widget_id)
+            if child is not None:
+                widget = child.get(widget_id)
+        return widget
+
+    def get_rect(self, widget_id: int) -> pygame.Rect:
+        """Get the cached absolute rect of a widget
+
+        The returned rect is shared, callers must not modify it.
+        """
+        rect = self.rects.get(widget_id)
+        if rect is None:
+            rel_rect = self.rel_rects.get(widget_id)
+            if rel_rect is None:
+                raise RuntimeError(f"Widget {widget_id} not found")
+            if self.owner is not None:
+                rect = rel_rect.move(self.owner.coord_x, self.owner.coord_y)
+            else:
+                rect = pygame.Rect(rel_rect)
+            self.rects[widget_id] = rect
+        return rect
+
+    def update_rect(self, widget_id: int, rel_rect: pygame.Rect) -> None:
+        """Change the relative rect of a widget"""
+        self.rel_rects[widget_id] = pygame.Rect(rel_rect)
+        self.rects.pop(widget_id, None)
+
+    def invalidate(self, widget_id: int | None = None) -> None:
+        """Drop cached absolute rects, of one widget or of all of them"""
+        if widget_id is None:
+            self.rects.clear()
+        else:
+            self.rects.pop(widget_id, None)
@@ -0,0 +1,194 @@
+import gzip
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+import pygame
+
+FORMAT_VERSION: int = 1
+
+
+def encode_event(event: pygame.event.Event) -> List:
+    """Convert an event to a JSON friendly [type, attributes] pair"""
+    attributes: Dict = {}
+    for key, value in event.dict.items():
+        if isinstance(value, tuple):
+            value = list(value)
+        # Window objects and other handles can not be replayed
+        if isinstance(value, (bool, int, float, str, list)):
+            attributes[key] = value
+    return [event.type, attributes]
+
+
+def decode_event(encoded: List) -> pygame.event.Event:
+    """Rebuild an event encoded by encode_event"""
+    event_type, attributes = encoded
+    return pygame.event.Event(
+        event_type,
+        {
+            key: tuple(value) if isinstance(value, list) else value
+            for key, value in attributes.items()
+        },
+    )
+
+
+class InputRecorder:
+    """Writes the events of every frame and the opened files to a gzip file
+
+    Each line is a JSON object. Frame lines only hold what changed since the
+    previous frame, so idle frames are a few bytes.
+    """
+
+    def __init__(self, path: str, window_size: Tuple[int, int]):
+        self.file = gzip.open(path, "wt", encoding="utf-8")
+        self.start: float = time.perf_counter()
+        self.mouse_pos: Tuple[int, int] | None = None
+        self.mods: int | None = None
+        self.write(
+            {
+                "version": FORMAT_VERSION,
+                "pygame": pygame.version.ver,
+                "window": list(window_size),
+            }
+        )
+
+    def write(self, record: Dict) -> None:
+        """Write a line to the recording"""
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def record_frame(
+        self,
+        events: List[pygame.event.Event],
+        mouse_pos: Tuple[int, int],
+        mods: int,
+    ) -> None:
+        """Record the events and input state of a frame"""
+        record: Dict = {"t": round((time.perf_counter() - self.start) * 1e3, 1)}
+        if mouse_pos != self.mouse_pos:
+            self.mouse_pos = mouse_pos
+            record["mouse"] = list(mouse_pos)
+        if mods != self.mods:
+            self.mods = mods
+            record["mods"] = mods
+        if events:
+            record["events"] = [encode_event(event) for event in events]
+        self.write(record)
+
+    def record_dialog_result(self, filename: str) -> None:
+        """Record the answer of a file dialog of the current frame"""
+        self.write({"dialog": filename})
+
+    def close(self) -> None:
+        """Flush and close the recording"""
+        self.file.close()
+
+
+class InputReplayer:
+    """Reads a recording back frame by frame"""
+
+    def __init__(self, path: str):
+        self.file = gzip.open(path, "rt", encoding="utf-8")
+        header: Dict = json.loads(self.file.readline())
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version: {header.get('version')}")
+        if header.get("pygame") != pygame.version.ver:
+            print(
+                f"Warning: recorded with pygame {header.get('pygame')}, "
+                f"replaying with {pygame.version.ver}"
+            )
+        self.window_size: Tuple[int, int] = tuple(header["window"])  # type: ignore
+        self.mouse_pos: Tuple[int, int] = (0, 0)
+        self.mods: int = 0
+        self.dialog_results: Deque[str] = deque()
+        self.pending: Dict | None = self.read()
+
+    def read(self) -> Dict | None:
+        """Read the next line of the recording"""
+        line: str = self.file.readline()
+        return json.loads(line) if line else None
+
+    def next_frame(self) -> List[pygame.event.Event] | None:
+        """Get the events of the next frame, None at the end of the recording"""
+        record = self.pending
+        if record is None:
+            return None
+        # Dialog answers follow the frame that opened the dialog
+        self.pending = self.read()
+        while self.pending is not None and "dialog" in self.pending:
+            self.dialog_results.append(self.pending["dialog"])
+            self.pending = self.read()
+
+        if "mouse" in record:
+            self.mouse_pos = tuple(record["mouse"])  # type: ignore
+        if "mods" in record:
+            self.mods = record["mods"]
+        return [decode_event(encoded) for encoded in record.get("events", ())]
+
+    def next_dialog_result(self) -> str:
+        """Get the recorded answer of the next file dialog"""
+        return self.dialog_results.popleft() if self.dialog_results else ""
+
+    def close(self) -> None:
+        """Close the recording"""
+        self.file.close()
+
+
+class FrameStats:
+    """Collects frame times of a replay"""
+
+    def __init__(self):
+        self.frame_times: List[float] = []
+        self.frame_start: float = 0.0
+
+    def start_frame(self) -> None:
+        """Mark the start of a frame"""
+        self.frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        """Mark the end of a frame"""
+        self.frame_times.append((time.perf_counter() - self.frame_start) * 1e3)
+
+    def get_percentile(self, percent: float) -> float:
+        """Get a percentile of the frame times in milliseconds"""
+        if not self.frame_times:
+            return 0.0
+        ordered: List[float] = sorted(self.frame_times)
+        return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+    def get_summary(self, slowest: int = 5) -> Dict:
+        """Get the statistics as a JSON friendly dict"""
+        total: float = sum(self.frame_times)
+        frames: int = len(self.frame_times)
+        return {
+            "frames": frames,
+            "total_ms": round(total, 3),
+            "mean_ms": round(total / frames, 3) if frames else 0.0,
+            "p50_ms": round(self.get_percentile(50), 3),
+            "p95_ms": round(self.get_percentile(95), 3),
+            "p99_ms": round(self.get_percentile(99), 3),
+            "max_ms": round(max(self.frame_times, default=0.0), 3),
+            # Frame numbers point back to the moment in the recording
+            "slowest_frames": [
+                [frame, round(frame_time, 3)]
+                for frame, frame_time in sorted(
+                    enumerate(self.frame_times), key=lambda x: x[1], reverse=True
+                )[:slowest]
+            ],
+        }
+
+    def report(self, path: str | None = None) -> None:
+        """Print the statistics and optionally write them to a JSON file"""
+        summary: Dict = self.get_summary()
+        print("----------------------")
+        print("Replay frame times")
+        for key in ("frames", "total_ms", "mean_ms", "p50_ms", "p95_ms", "p99_ms"):
+            print(f"  {key}: {summary[key]}")
+        print(f"  max_ms: {summary['max_ms']}")
+        print("  Slowest frames:")
+        for frame, frame_time in summary["slowest_frames"]:
+            print(f"    #{frame}: {frame_time} ms")
+        print("----------------------")
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(summary, file, indent=2)
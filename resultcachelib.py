@@ -0,0 +1,228 @@
+import hashlib
+import json
+import os
+import struct
+import sys
+import tempfile
+import threading
+from array import array
+from pathlib import Path
+from typing import Dict, Tuple
+
+Columns = Dict[str, array]
+
+MAGIC: bytes = b"NOWC"
+
+
+def write_columns(path: Path, columns: Columns, meta: Dict | None = None) -> int:
+    """Write columns as little endian float buffers after a JSON header
+
+    The header can carry small metadata of the columns. Returns the size of
+    the file.
+    """
+    header: bytes = json.dumps(
+        {
+            "columns": [[title, len(column)] for title, column in columns.items()],
+            "meta": meta or {},
+        }
+    ).encode("utf-8")
+    # Written to a temporary file first, so readers never see half a file.
+    # Its name is unique, so writers of the same result never collide
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=path.name, suffix=".tmp", delete=False
+    ) as file:
+        temp_path: Path = Path(file.name)
+        try:
+            file.write(MAGIC + struct.pack("<I", len(header)) + header)
+            for column in columns.values():
+                if sys.byteorder == "big":
+                    column = array("d", column)
+                    column.byteswap()
+                column.tofile(file)
+        except BaseException:
+            file.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+    os.replace(temp_path, path)
+    return path.stat().st_size
+
+
+def read_columns(path: Path) -> Tuple[Columns, Dict]:
+    """Read the columns and metadata written by write_columns"""
+    with open(path, "rb") as file:
+        if file.read(4) != MAGIC:
+            raise ValueError(f"{path} is not a column file")
+        (header_size,) = struct.unpack("<I", file.read(4))
+        header: Dict = json.loads(file.read(header_size))
+        columns: Columns = {}
+        for title, length in header["columns"]:
+            column = array("d")
+            column.fromfile(file, length)
+            if sys.byteorder == "big":
+                column.byteswap()
+            columns[title] = column
+    return columns, header["meta"]
+
+
+class ResultCache:
+    """Card outputs on disk, addressed by a hash of how they were computed
+
+    The key of a result covers the card type, its parameters and the keys of
+    its inputs, which in turn go back to the content hashes of the data
+    files. A result is therefore reused whenever nothing upstream of it
+    changed. The least recently used results are evicted once the cache is
+    larger than max_bytes.
+
+    The data loader thread and the main thread share a cache, so the index
+    and the files are only changed while holding the lock.
+    """
+
+    extension: str = ".col"
+
+    def __init__(self, path: Path, max_bytes: int = 1 << 30):
+        self.path: Path = path
+        self.max_bytes: int = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        # Reentrant, as put evicts while holding it
+        self.lock = threading.RLock()
+        self.size_bytes: int = sum(
+            entry.stat().st_size for entry in self.path.glob(f"*{self.extension}")
+        )
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.bytes_read: int = 0
+        self.bytes_written: int = 0
+
+        # Content hashes of data files, by path, modification time and size
+        self.file_hashes_path: Path = self.path.joinpath("file_hashes.json")
+        self.file_hashes: Dict[str, str] = {}
+        try:
+            with open(self.file_hashes_path, "r", encoding="utf-8") as file:
+                self.file_hashes = json.load(file)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError):
+            # A damaged index only costs hashing the data files again
+            self.file_hashes = {}
+
+        # The cap may have been lowered since the cache was filled
+        self.evict()
+
+    @staticmethod
+    def get_key(*parts) -> str:
+        """Hash the JSON friendly description of a result"""
+        return hashlib.sha256(
+            json.dumps(parts, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+    def get_file_hash(self, path: Path) -> str:
+        """Get the content hash of a file, only reading it when it changed"""
+        stat = path.stat()
+        stat_key: str = f"{path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}"
+        with self.lock:
+            file_hash = self.file_hashes.get(stat_key)
+        if file_hash is not None:
+            return file_hash
+
+        # Hashed without the lock, so other threads are not held up
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+        file_hash = digest.hexdigest()
+        with self.lock:
+            # Forget the hashes of earlier versions of the file
+            path_prefix: str = stat_key.rsplit("|", 2)[0] + "|"
+            for old_key in [k for k in self.file_hashes if k.startswith(path_prefix)]:
+                del self.file_hashes[old_key]
+            self.file_hashes[stat_key] = file_hash
+            self.save_file_hashes()
+        return file_hash
+
+    def save_file_hashes(self) -> None:
+        """Replace the index of file hashes, never leaving half a file"""
+        with tempfile.NamedTemporaryFile(
+            "w",
+            encoding="utf-8",
+            dir=self.path,
+            prefix=self.file_hashes_path.name,
+            suffix=".tmp",
+            delete=False,
+        ) as file:
+            json.dump(self.file_hashes, file)
+        os.replace(file.name, self.file_hashes_path)
+
+    def get_path(self, key: str) -> Path:
+        """Get the file of a result"""
+        return self.path.joinpath(key + self.extension)
+
+    def contains(self, key: str) -> bool:
+        """Whether a result is cached"""
+        return self.get_path(key).exists()
+
+    def get(self, key: str) -> Columns | None:
+        """Get a cached result, marking it as recently used"""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> Tuple[Columns, Dict] | None:
+        """Get a cached result and its metadata"""
+        path: Path = self.get_path(key)
+        try:
+            # Results are replaced atomically, so they are read without the lock
+            entry: Tuple[Columns, Dict] = read_columns(path)
+        except (OSError, ValueError, KeyError, EOFError):
+            with self.lock:
+                self.misses += 1
+            return None
+        with self.lock:
+            self.hits += 1
+            try:
+                self.bytes_read += path.stat().st_size
+                # The modification time orders the results for eviction
+                os.utime(path)
+            except FileNotFoundError:
+                # Evicted by another thread since it was read
+                pass
+        return entry
+
+    def put(self, key: str, columns: Columns, meta: Dict | None = None) -> None:
+        """Store a result and evict the oldest ones if the cache is too big"""
+        path: Path = self.get_path(key)
+        with self.lock:
+            old_size: int = path.stat().st_size if path.exists() else 0
+            size: int = write_columns(path, columns, meta)
+            self.size_bytes += size - old_size
+            self.bytes_written += size
+            self.evict()
+
+    def evict(self) -> None:
+        """Delete the least recently used results until the cache fits"""
+        with self.lock:
+            if self.size_bytes <= self.max_bytes:
+                return
+            entries = sorted(
+                (entry.stat().st_mtime_ns, entry.stat().st_size, entry)
+                for entry in self.path.glob(f"*{self.extension}")
+            )
+            for _, size, entry in entries:
+                if self.size_bytes <= self.max_bytes:
+                    break
+                entry.unlink(missing_ok=True)
+                self.size_bytes -= size
+                self.evictions += 1
+
+    def get_stats(self) -> Dict:
+        """Get the hit and miss statistics of this session"""
+        lookups: int = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,71 @@
+from typing import Dict, Hashable, List, Set, Tuple
+
+import pygame
+
+
+class SpatialHash:
+    """Uniform grid index of items by the canvas areas they cover
+
+    An item can cover several rects, e.g. one per segment of a polyline, so
+    long thin items only occupy the cells along their path.
+    """
+
+    __slots__ = ("cell_size", "cells", "item_cells")
+
+    def __init__(self, cell_size: int = 128):
+        self.cell_size: int = cell_size
+        self.cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self.item_cells: Dict[Hashable, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.item_cells)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.item_cells
+
+    def get_cells(self, rect) -> List[Tuple[int, int]]:
+        """Get the cells covered by a rect"""
+        left, top, width, height = rect
+        return [
+            (cell_x, cell_y)
+            for cell_x in range(
+                int(left // self.cell_size), int((left + width) // self.cell_size) + 1
+            )
+            for cell_y in range(
+                int(top // self.cell_size), int((top + height) // self.cell_size) + 1
+            )
+        ]
+
+    def insert(self, item: Hashable, *rects) -> None:
+        """Index an item by the rects it covers, replacing its previous rects"""
+        self.remove(item)
+        item_cells: Set[Tuple[int, int]] = set()
+        for rect in rects:
+            item_cells.update(self.get_cells(rect))
+        for cell in item_cells:
+            self.cells.setdefault(cell, set()).add(item)
+        self.item_cells[item] = list(item_cells)
+
+    def remove(self, item: Hashable) -> None:
+        """Remove an item from the index"""
+        for cell in self.item_cells.pop(item, ()):
+            cell_items = self.cells.get(cell)
+            if cell_items is not None:
+                cell_items.discard(item)
+                if not cell_items:
+                    del self.cells[cell]
+
+    def query_point(self, pos) -> Set[Hashable]:
+        """Get the items whose cells contain a point"""
+        return set(
+            self.cells.get(
+                (int(pos[0] // self.cell_size), int(pos[1] // self.cell_size)), ()
+            )
+        )
+
+    def query_rect(self, rect: pygame.Rect) -> Set[Hashable]:
+        """Get the items whose cells overlap a rect"""
+        items: Set[Hashable] = set()
+        for cell in self.get_cells(rect):
+            items.update(self.cells.get(cell, ()))
+        return items
@@ -0,0 +1,103 @@
+# pylint: disable=no-member
+
+from typing import Dict, Tuple
+
+import pygame
+import pygame.gfxdraw
+
+
+class SpriteAtlas:
+    """Shared cache of pre-rendered widget graphics
+
+    Every graphic is rasterized once per style and the same surface is handed
+    out to all widgets using that style, so a card with thousands of nodes
+    holds references to a single node sprite instead of thousands of copies.
+    """
+
+    node_sprites: Dict[
+        Tuple[int, Tuple[int, int, int], Tuple[int, int, int]], pygame.Surface
+    ] = {}
+    button_chromes: Dict[
+        Tuple[int, int, int, Tuple[int, int, int], Tuple[int, int, int]],
+        pygame.Surface,
+    ] = {}
+
+    @classmethod
+    def get_node_sprite(
+        cls,
+        node_size: int,
+        node_inner_color: Tuple[int, int, int],
+        node_border_color: Tuple[int, int, int],
+    ) -> pygame.Surface:
+        """Get the shared sprite of a node with the given style"""
+        key = (node_size, node_inner_color, node_border_color)
+        sprite = cls.node_sprites.get(key)
+        if sprite is None:
+            sprite = cls.render_node_sprite(*key)
+            cls.node_sprites[key] = sprite
+        return sprite
+
+    @classmethod
+    def get_button_chrome(
+        cls,
+        surf_width: int,
+        surf_height: int,
+        border_thickness: int,
+        border_color: Tuple[int, int, int],
+        bg_color: Tuple[int, int, int],
+    ) -> pygame.Surface:
+        """Get the shared background and border of a button with the given style"""
+        key = (surf_width, surf_height, border_thickness, border_color, bg_color)
+        chrome = cls.button_chromes.get(key)
+        if chrome is None:
+            chrome = cls.render_button_chrome(*key)
+            cls.button_chromes[key] = chrome
+        return chrome
+
+    @staticmethod
+    def render_node_sprite(
+        node_size: int,
+        node_inner_color: Tuple[int, int, int],
+        node_border_color: Tuple[int, int, int],
+    ) -> pygame.Surface:
+        """Rasterize a node sprite"""
+        surf = pygame.Surface((node_size + 2, node_size + 2), pygame.SRCALPHA)
+        pygame.gfxdraw.filled_circle(
+            surf, node_size // 2, node_size // 2, node_size // 2, node_inner_color
+        )
+        pygame.gfxdraw.filled_circle(
+            surf, node_size // 2, node_size // 2, node_size // 5, (255, 255, 255)
+        )
+        pygame.gfxdraw.circle(
+            surf, node_size // 2, node_size // 2, node_size // 2, node_border_color
+        )
+        return surf
+
+    @staticmethod
+    def render_button_chrome(
+        surf_width: int,
+        surf_height: int,
+        border_thickness: int,
+        border_color: Tuple[int, int, int],
+        bg_color: Tuple[int, int, int],
+    ) -> pygame.Surface:
+        """Rasterize the background and border of a button"""
+        surf = pygame.Surface((surf_width, surf_height))
+        surf.fill(border_color)
+        pygame.draw.rect(
+            surf,
+            bg_color,
+            (
+                border_thickness,
+                border_thickness,
+                surf_width - border_thickness * 4,
+                surf_height - border_thickness * 4,
+            ),
+        )
+        return surf
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop every cached sprite"""
+        cls.node_sprites.clear()
+        cls.button_chromes.clear()
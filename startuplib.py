@@ -0,0 +1,123 @@
+import importlib.abc
+import sys
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple, Type
+
+PROCESS_START: float = time.perf_counter()
+
+
+class TimedLoader(importlib.abc.Loader):
+    """Loader wrapper that measures the time spent executing a module"""
+
+    def __init__(self, loader, profiler: Type["StartupProfiler"]):
+        self.loader = loader
+        self.profiler = profiler
+
+    def __getattr__(self, name: str):
+        # Resource and source access keeps going to the real loader
+        return getattr(self.loader, name)
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self.profiler.import_stack.append(0.0)
+        start: float = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed: float = time.perf_counter() - start
+            children: float = self.profiler.import_stack.pop()
+            if self.profiler.import_stack:
+                self.profiler.import_stack[-1] += elapsed
+            self.profiler.imports.append(
+                (module.__name__, elapsed, elapsed - children)
+            )
+
+
+class TimedFinder(importlib.abc.MetaPathFinder):
+    """Meta path finder that wraps the loaders of newly imported modules"""
+
+    def __init__(self, profiler: Type["StartupProfiler"]):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = TimedLoader(spec.loader, self.profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    """Reports import and initialization times of the application
+
+    Disabled profilers cost nothing beyond a flag check, so the measuring
+    calls can stay in the startup path permanently.
+    """
+
+    enabled: bool = False
+    finder: TimedFinder | None = None
+    imports: List[Tuple[str, float, float]] = []
+    import_stack: List[float] = []
+    phases: List[Tuple[str, float]] = []
+    reported: bool = False
+
+    @classmethod
+    def install_if_requested(cls, argv: List[str]) -> None:
+        """Start profiling imports if --profile-startup is on the command line"""
+        if "--profile-startup" in argv and not cls.enabled:
+            cls.enabled = True
+            cls.finder = TimedFinder(cls)
+            sys.meta_path.insert(0, cls.finder)
+
+    @classmethod
+    @contextmanager
+    def measure(cls, phase: str) -> Iterator[None]:
+        """Measure an initialization phase"""
+        if not cls.enabled:
+            yield
+            return
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed: float = time.perf_counter() - start
+            if cls.reported:
+                # Subsystems initialized lazily after the first frame
+                print(f"Lazy initialization: {elapsed * 1e3:.1f} ms  {phase}")
+            else:
+                cls.phases.append((phase, elapsed))
+
+    @classmethod
+    def report(cls, top: int = 25) -> None:
+        """Print the profile once, typically after the first frame"""
+        if not cls.enabled or cls.reported:
+            return
+        cls.reported = True
+        if cls.finder is not None:
+            sys.meta_path.remove(cls.finder)
+            cls.finder = None
+
+        print("----------------------")
+        print("Startup profile")
+        print(f"Time to first frame: {cls.elapsed_ms():.1f} ms")
+        print("Initialization:")
+        for phase, elapsed in cls.phases:
+            print(f"  {elapsed * 1e3:9.1f} ms  {phase}")
+        print(f"Imports (top {top} by cumulative time, self time in brackets):")
+        for name, cumulative, self_time in sorted(
+            cls.imports, key=lambda x: x[1], reverse=True
+        )[:top]:
+            print(f"  {cumulative * 1e3:9.1f} ms  ({self_time * 1e3:7.1f} ms)  {name}")
+        print("----------------------")
+
+    @staticmethod
+    def elapsed_ms() -> float:
+        """Get the milliseconds since the profiler module was imported"""
+        return (time.perf_counter() - PROCESS_START) * 1e3
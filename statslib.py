@@ -0,0 +1,173 @@
+import heapq
+import math
+import operator
+import random
+from array import array
+from itertools import repeat
+from typing import Dict, List
+
+# Positions of the quantiles that are kept, in percent
+QUANTILES: List[int] = [0, 1, 5, 25, 50, 75, 95, 99, 100]
+
+
+class ColumnStats:
+    """Summary of a column, updated chunk by chunk while the column is parsed
+
+    Exact count, range, mean and variance of the finite values are kept with
+    the parallel form of Welford's algorithm, NaN and infinite values are
+    only counted. Quantiles come from a uniform sample of the values and the
+    number of distinct values from a k minimum values sketch, so both stay
+    small however long the column is. Each chunk is summarized with a few
+    bulk passes of built-in functions, without a Python loop over its values.
+    """
+
+    __slots__ = (
+        "count",
+        "nan_count",
+        "inf_count",
+        "min",
+        "max",
+        "mean",
+        "m2",
+        "integral",
+        "sample",
+        "sketch",
+        "summary",
+    )
+
+    sample_size: int = 256
+    sketch_size: int = 128
+
+    def __init__(self):
+        self.count: int = 0
+        self.nan_count: int = 0
+        self.inf_count: int = 0
+        self.min: float = math.inf
+        self.max: float = -math.inf
+        self.mean: float = 0.0
+        self.m2: float = 0.0
+        # Whether every value is a whole number, e.g. to store it as integer
+        self.integral: bool = True
+        self.sample: array = array("d")
+        # Smallest hashes of the distinct values, in ascending order
+        self.sketch: List[int] = []
+        # Quantiles and distinct count of stats restored by from_dict, which
+        # have no sample or sketch
+        self.summary: Dict | None = None
+
+    def update(self, values: array, rng: random.Random) -> None:
+        """Add a chunk of values"""
+        clean: List[float] = values.tolist()
+        # A finite plain sum shows every value is finite, which is the usual
+        # case and saves testing the values one by one
+        if not math.isfinite(sum(clean)):
+            clean = list(filter(math.isfinite, clean))
+            nan_count: int = sum(map(math.isnan, values))
+            self.nan_count += nan_count
+            self.inf_count += len(values) - len(clean) - nan_count
+        if not clean:
+            return
+
+        chunk_count: int = len(clean)
+        try:
+            chunk_mean: float = math.fsum(clean) / chunk_count
+        except OverflowError:
+            # Values near the largest float are divided before they are summed
+            chunk_mean = math.fsum(map(operator.truediv, clean, repeat(chunk_count)))
+        deviations: List[float] = list(map(operator.sub, clean, repeat(chunk_mean)))
+        try:
+            chunk_m2: float = math.fsum(map(operator.mul, deviations, deviations))
+        except OverflowError:
+            chunk_m2 = math.inf
+        total: int = self.count + chunk_count
+        delta: float = chunk_mean - self.mean
+        # Weights are divided first, so values near the largest float do not
+        # overflow
+        self.mean += delta * (chunk_count / total)
+        self.m2 += chunk_m2
+        if self.count:
+            self.m2 += delta * delta * (self.count * chunk_count / total)
+
+        self.min = min(self.min, min(clean))
+        self.max = max(self.max, max(clean))
+        if self.integral:
+            self.integral = all(map(float.is_integer, clean))
+
+        # Keep each part in the sample in proportion to the values it stands for
+        kept: int = min(self.sample_size, total)
+        from_chunk: int = min(round(kept * chunk_count / total), chunk_count)
+        from_sample: int = min(kept - from_chunk, len(self.sample))
+        self.sample = array(
+            "d",
+            rng.sample(self.sample, from_sample) + rng.sample(clean, from_chunk),
+        )
+        self.count = total
+
+        # Hashing 1-tuples spreads equal floats evenly over the hash range
+        hashes = set(map(hash, zip(clean)))
+        if len(self.sketch) == self.sketch_size:
+            # Only hashes below the largest kept one can enter a full sketch
+            hashes = set(filter(self.sketch[-1].__gt__, hashes))
+        self.sketch = heapq.nsmallest(self.sketch_size, hashes.union(self.sketch))
+
+    def get_variance(self) -> float:
+        """Get the sample variance"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def get_quantile(self, percent: float) -> float:
+        """Get an approximate quantile, exact for the minimum and maximum"""
+        if not self.count:
+            return math.nan
+        if percent <= 0:
+            return self.min
+        if percent >= 100:
+            return self.max
+        if self.summary is not None:
+            nearest: int = min(QUANTILES, key=lambda q: abs(q - percent))
+            return self.summary["quantiles"][str(nearest)]
+        ordered: List[float] = sorted(self.sample)
+        return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+    def get_distinct_count(self) -> int:
+        """Get the estimated number of distinct values"""
+        if self.summary is not None:
+            return self.summary["distinct"]
+        if len(self.sketch) < self.sketch_size:
+            # Every distinct value fits in the sketch
+            return len(self.sketch)
+        # Position of the largest kept hash in the hash range, from 0 to 1
+        largest: float = (self.sketch[-1] + 2**63) / 2**64
+        return min(round((self.sketch_size - 1) / largest), self.count)
+
+    def to_dict(self) -> Dict:
+        """Get the summary without the sample and sketch, e.g. to persist it"""
+        return {
+            "count": self.count,
+            "nan_count": self.nan_count,
+            "inf_count": self.inf_count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "mean": self.mean if self.count else None,
+            "variance": self.get_variance(),
+            "integral": self.integral,
+            "quantiles": (
+                {str(q): self.get_quantile(q) for q in QUANTILES} if self.count else {}
+            ),
+            "distinct": self.get_distinct_count(),
+        }
+
+    @classmethod
+    def from_dict(cls, summary: Dict) -> "ColumnStats":
+        """Restore the stats of a summary made by to_dict"""
+        stats = cls()
+        stats.count = summary["count"]
+        stats.nan_count = summary["nan_count"]
+        stats.inf_count = summary.get("inf_count", 0)
+        if stats.count:
+            stats.min = summary["min"]
+            stats.max = summary["max"]
+            stats.mean = summary["mean"]
+        stats.m2 = summary["variance"] * max(stats.count - 1, 0)
+        stats.integral = summary["integral"]
+        stats.summary = summary
+        return stats
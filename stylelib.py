@@ -0,0 +1,68 @@
+from typing import NamedTuple, Tuple
+
+
+class ButtonStyle(NamedTuple):
+    """Shared look of a button"""
+
+    bg_color: Tuple[int, int, int]
+    bg_disabled_color: Tuple[int, int, int]
+    highlight_color: Tuple[int, int, int]
+    border_color: Tuple[int, int, int]
+    font_name: str
+    font_color: Tuple[int, int, int]
+    font_size: int
+    border_thickness: int
+
+
+class TextBoxStyle(NamedTuple):
+    """Shared look of a text box"""
+
+    bg_color: Tuple[int, int, int]
+    focus_color: Tuple[int, int, int]
+    border_color: Tuple[int, int, int]
+    font_name: str
+    font_color: Tuple[int, int, int]
+    placeholder_color: Tuple[int, int, int]
+    font_size: int
+    border_thickness: int
+
+
+class LabelStyle(NamedTuple):
+    """Shared look of a label"""
+
+    font_name: str
+    font_color: Tuple[int, int, int]
+    font_size: int
+
+
+class NodeStyle(NamedTuple):
+    """Shared look of a node"""
+
+    node_size: int
+    node_inner_color: Tuple[int, int, int]
+    node_border_color: Tuple[int, int, int]
+
+
+class CardStyle(NamedTuple):
+    """Shared look of a card"""
+
+    card_border_color: Tuple[int, int, int]
+    card_border_thickness: int
+    title_bar_background_color: Tuple[int, int, int]
+    title_bar_highlight_color: Tuple[int, int, int]
+    title_bar_font_color: Tuple[int, int, int]
+    body_background_color: Tuple[int, int, int]
+
+
+class GridStyle(NamedTuple):
+    """Shared look of the canvas background"""
+
+    background_color: Tuple[int, int, int]
+    minor_line_color: Tuple[int, int, int]
+    major_line_color: Tuple[int, int, int]
+    axis_color: Tuple[int, int, int]
+    # Canvas distance between minor lines, and minor cells per major cell
+    minor_spacing: int
+    major_every: int
+    # Screen distance under which lines are too dense and thinned out
+    min_line_spacing: int
@@ -0,0 +1,184 @@
+from typing import Any, Callable, Tuple
+
+import pygame
+
+from fontlib import FontCache
+from idlib import IdAllocator
+from stylelib import TextBoxStyle
+
+
+class MetaTextBox:
+    """Boilerplate class for creating single line text boxes"""
+
+    __slots__ = (
+        "widget_id",
+        "parent_card",
+        "text",
+        "placeholder",
+        "rel_coord_x",
+        "rel_coord_y",
+        "width",
+        "height",
+        "style",
+        "font",
+        "surf",
+        "focused",
+        "hidden",
+        "dirty",
+        "on_change",
+    )
+
+    def __init__(
+        self,
+        parent: Any,
+        placeholder: str,
+        rel_coord_x: int,
+        rel_coord_y: int,
+        width: int,
+        style: TextBoxStyle,
+        on_change: Callable[[str], None],
+    ):
+        self.widget_id: int = IdAllocator.next_id()
+        self.parent_card = parent
+        self.text: str = ""
+        self.placeholder: str = placeholder
+        self.rel_coord_x: int = rel_coord_x
+        self.rel_coord_y: int = rel_coord_y
+        self.width: int = width
+        self.height: int = style.font_size + style.border_thickness * 2 + 4
+        self.style: TextBoxStyle = style
+        self.font: pygame.font.Font = FontCache.get_sys_font(
+            style.font_name, style.font_size
+        )
+        self.surf: pygame.Surface = pygame.Surface((self.width, self.height))
+        self.focused: bool = False
+        self.hidden: bool = False
+        self.dirty: bool = True
+        self.on_change: Callable[[str], None] = on_change
+
+    def __str__(self) -> str:
+        return f"Type: TextBox [{self.__class__.__name__}], Text: {self.text}, ID: {self.widget_id}, Parent: {self.parent_card}"
+
+    def get_rel_rect(self) -> pygame.Rect:
+        """Get rect of the text box relative to its parent card"""
+        return pygame.Rect(self.rel_coord_x, self.rel_coord_y, self.width, self.height)
+
+    def get_rect(self) -> pygame.Rect:
+        """Get rect of the text box"""
+        if self.parent_card is None:
+            raise RuntimeError("Parent card is not set")
+        return self.parent_card.registry.get_rect(self.widget_id)
+
+    def set_focus(self, status: bool) -> None:
+        """Set focus state"""
+        if status != self.focused:
+            self.focused = status
+            self.mark_dirty()
+
+    def set_text(self, text: str) -> None:
+        """Replace the text and notify the owner"""
+        if text != self.text:
+            self.text = text
+            self.mark_dirty()
+            self.on_change(text)
+
+    def type_text(self, text: str) -> None:
+        """Append typed text"""
+        self.set_text(self.text + text)
+
+    def backspace(self) -> None:
+        """Remove the last character"""
+        self.set_text(self.text[:-1])
+
+    def mark_dirty(self) -> None:
+        """Request the text box and its parent card to be drawn again"""
+        self.dirty = True
+        if self.parent_card is not None:
+            self.parent_card.mark_dirty()
+
+    def draw(self) -> pygame.Surface:
+        """Draw text box"""
+        if not self.dirty:
+            return self.surf
+        self.dirty = False
+
+        self.surf.fill(self.style.border_color)
+        pygame.draw.rect(
+            self.surf,
+            self.style.focus_color if self.focused else self.style.bg_color,
+            (
+                self.style.border_thickness,
+                self.style.border_thickness,
+                self.width - self.style.border_thickness * 2,
+                self.height - self.style.border_thickness * 2,
+            ),
+        )
+
+        if self.text or self.focused:
+            text: str = self.text + ("_" if self.focused else "")
+            color: Tuple[int, int, int] = self.style.font_color
+        else:
+            text = self.placeholder
+            color = self.style.placeholder_color
+        text_surf = self.font.render(text, True, color)
+
+        # Keep the end of long texts visible
+        text_x: int = min(4, self.width - 4 - text_surf.get_width())
+        self.surf.set_clip(
+            (
+                self.style.border_thickness,
+                0,
+                self.width - self.style.border_thickness * 2,
+                self.height,
+            )
+        )
+        self.surf.blit(text_surf, (text_x, (self.height - text_surf.get_height()) / 2))
+        self.surf.set_clip(None)
+
+        return self.surf
+
+    def hide(self) -> None:
+        """Hide text box"""
+        self.hidden = True
+        self.mark_dirty()
+
+    def show(self) -> None:
+        """Show text box"""
+        self.hidden = False
+        self.mark_dirty()
+
+
+class TextBox(MetaTextBox):
+    """Standart text box"""
+
+    __slots__ = ()
+
+    text_box_style: TextBoxStyle = TextBoxStyle(
+        bg_color=(235, 233, 215),
+        focus_color=(255, 255, 255),
+        border_color=(27, 38, 56),
+        font_name="ConsolaMono-Book.ttf",
+        font_color=(0, 0, 0),
+        placeholder_color=(120, 120, 120),
+        font_size=14,
+        border_thickness=1,
+    )
+
+    def __init__(
+        self,
+        parent: Any,
+        placeholder: str,
+        rel_coord_x: int,
+        rel_coord_y: int,
+        width: int,
+        on_change: Callable[[str], None],
+    ):
+        super().__init__(
+            parent,
+            placeholder,
+            rel_coord_x,
+            rel_coord_y,
+            width,
+            self.text_box_style,
+            on_change,
+        )
@@ -0,0 +1,349 @@
+from typing import TYPE_CHECKING, Dict, List, Set, Tuple
+
+import pygame
+
+from idlib import IdAllocator
+from nodelib import NodeKind
+from spatiallib import SpatialHash
+from zoomlib import ZoomLevels
+
+if TYPE_CHECKING:
+    from cardlib import MetaCard
+
+
+Point = Tuple[float, float]
+
+
+def tessellate_bezier(start: Point, end: Point, segments: int) -> List[Point]:
+    """Tessellate the horizontal S-curve between an output and an input"""
+    handle: float = max(40.0, abs(end[0] - start[0]) / 2)
+    control_1: Point = (start[0] + handle, start[1])
+    control_2: Point = (end[0] - handle, end[1])
+    points: List[Point] = []
+    for i in range(segments + 1):
+        t: float = i / segments
+        u: float = 1 - t
+        a, b, c, d = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+        points.append(
+            (
+                a * start[0] + b * control_1[0] + c * control_2[0] + d * end[0],
+                a * start[1] + b * control_1[1] + c * control_2[1] + d * end[1],
+            )
+        )
+    return points
+
+
+def point_segment_distance_squared(pos: Point, start: Point, end: Point) -> float:
+    """Get the squared distance between a point and a line segment"""
+    dx: float = end[0] - start[0]
+    dy: float = end[1] - start[1]
+    length_squared: float = dx * dx + dy * dy
+    t: float = 0.0
+    if length_squared > 0:
+        t = ((pos[0] - start[0]) * dx + (pos[1] - start[1]) * dy) / length_squared
+        t = min(max(t, 0.0), 1.0)
+    x: float = start[0] + t * dx - pos[0]
+    y: float = start[1] + t * dy - pos[1]
+    return x * x + y * y
+
+
+class Wire:
+    """Connection from an output node of a card to an input node of another"""
+
+    __slots__ = (
+        "widget_id",
+        "source_card",
+        "source_port",
+        "target_card",
+        "target_port",
+        "points",
+        "bounds",
+    )
+
+    def __init__(
+        self,
+        source_card: "MetaCard",
+        source_port: str,
+        target_card: "MetaCard",
+        target_port: str,
+    ):
+        self.widget_id: int = IdAllocator.next_id()
+        self.source_card: "MetaCard" = source_card
+        self.source_port: str = source_port
+        self.target_card: "MetaCard" = target_card
+        self.target_port: str = target_port
+        # Tessellated curve in canvas coordinates
+        self.points: List[Point] = []
+        self.bounds: pygame.Rect = pygame.Rect(0, 0, 0, 0)
+
+    def __str__(self) -> str:
+        return f"Type: Wire, ID: {self.widget_id}, {self.source_card.title}.{self.source_port} -> {self.target_card.title}.{self.target_port}"
+
+    def get_endpoints(self) -> Tuple[Point, Point]:
+        """Get the canvas positions of the output and input the wire connects"""
+        return (
+            self.source_card.get_port_pos(self.source_port, NodeKind.OUTPUT),
+            self.target_card.get_port_pos(self.target_port, NodeKind.INPUT),
+        )
+
+
+class WireManager:
+    """Owns the wires of the canvas, their cached geometry and spatial index
+
+    The curve of a wire is only tessellated again when the port layout of one
+    of its cards changed, which every card reports through its ports_version.
+    Wires are drawn from a cached layer covering the window plus a margin, so
+    panning is a single blit; only the wires of cards that are being dragged
+    are left out of the layer and drawn directly each frame.
+    """
+
+    segments: int = 20
+    pick_tolerance: int = 5
+    layer_margin: int = 256
+
+    wire_color: Tuple[int, int, int] = (220, 220, 220)
+    active_wire_color: Tuple[int, int, int] = (255, 200, 0)
+    wire_width: int = 2
+
+    def __init__(self):
+        self.wires: Dict[int, Wire] = {}
+        self.card_wires: Dict[int, Set[int]] = {}
+        self.card_versions: Dict[int, int] = {}
+        self.index: SpatialHash = SpatialHash()
+        self.active_cards: Set[int] = set()
+
+        self.layer: pygame.Surface | None = None
+        self.layer_rect: pygame.Rect = pygame.Rect(0, 0, 0, 0)
+        self.layer_offset: Point = (0, 0)
+        self.layer_zoom_level: int = 0
+        self.layer_dirty: bool = True
+
+    def __len__(self) -> int:
+        return len(self.wires)
+
+    def add_wire(
+        self,
+        source_card: "MetaCard",
+        source_port: str,
+        target_card: "MetaCard",
+        target_port: str,
+    ) -> Wire:
+        """Connect an output to an input, replacing the input's previous wire"""
+        existing = self.get_input_wire(target_card, target_port)
+        if existing is not None:
+            self.remove_wire(existing)
+        wire = Wire(source_card, source_port, target_card, target_port)
+        self.wires[wire.widget_id] = wire
+        for card in (source_card, target_card):
+            self.card_wires.setdefault(card.widget_id, set()).add(wire.widget_id)
+            if self.card_versions.get(card.widget_id) != card.ports_version:
+                # Bring the other wires of the card up to date right away, so
+                # the next sync does not tessellate the new wire again
+                self.card_versions[card.widget_id] = card.ports_version
+                for wire_id in self.card_wires[card.widget_id]:
+                    if wire_id != wire.widget_id:
+                        self.update_geometry(self.wires[wire_id])
+        self.update_geometry(wire)
+        return wire
+
+    def remove_wire(self, wire: Wire) -> None:
+        """Disconnect a wire"""
+        self.wires.pop(wire.widget_id, None)
+        self.index.remove(wire.widget_id)
+        for card in (wire.source_card, wire.target_card):
+            card_wires = self.card_wires.get(card.widget_id)
+            if card_wires is not None:
+                card_wires.discard(wire.widget_id)
+                if not card_wires:
+                    del self.card_wires[card.widget_id]
+                    self.card_versions.pop(card.widget_id, None)
+        self.layer_dirty = True
+
+    def get_input_wire(self, card: "MetaCard", port: str) -> Wire | None:
+        """Get the wire connected to an input of a card"""
+        for wire_id in self.card_wires.get(card.widget_id, ()):
+            wire = self.wires[wire_id]
+            if wire.target_card is card and wire.target_port == port:
+                return wire
+        return None
+
+    def get_card_wires(self, card: "MetaCard") -> List[Wire]:
+        """Get every wire connected to a card"""
+        return [
+            self.wires[wire_id] for wire_id in self.card_wires.get(card.widget_id, ())
+        ]
+
+    def is_active(self, wire: Wire) -> bool:
+        """Whether the wire belongs to a card that is being dragged"""
+        return (
+            wire.source_card.widget_id in self.active_cards
+            or wire.target_card.widget_id in self.active_cards
+        )
+
+    def set_active_cards(self, cards: List["MetaCard"]) -> None:
+        """Draw the wires of these cards outside the cached layer"""
+        active_cards: Set[int] = {card.widget_id for card in cards}
+        if active_cards != self.active_cards:
+            self.active_cards = active_cards
+            self.layer_dirty = True
+
+    def update_geometry(self, wire: Wire) -> None:
+        """Tessellate the curve of a wire and index it"""
+        start, end = wire.get_endpoints()
+        wire.points = tessellate_bezier(start, end, self.segments)
+        xs = [point[0] for point in wire.points]
+        ys = [point[1] for point in wire.points]
+        wire.bounds = pygame.Rect(
+            min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1
+        )
+        self.index.insert(
+            wire.widget_id,
+            *(
+                (
+                    min(p[0], q[0]),
+                    min(p[1], q[1]),
+                    abs(q[0] - p[0]),
+                    abs(q[1] - p[1]),
+                )
+                for p, q in zip(wire.points, wire.points[1:])
+            ),
+        )
+        if not self.is_active(wire):
+            self.layer_dirty = True
+
+    def sync(self) -> None:
+        """Update the geometry of the wires of cards whose ports changed"""
+        for card_id, wire_ids in self.card_wires.items():
+            wire = self.wires[next(iter(wire_ids))]
+            card = (
+                wire.source_card
+                if wire.source_card.widget_id == card_id
+                else wire.target_card
+            )
+            if self.card_versions.get(card_id) != card.ports_version:
+                self.card_versions[card_id] = card.ports_version
+                for wire_id in wire_ids:
+                    self.update_geometry(self.wires[wire_id])
+
+    def get_wire_at(self, world_pos, zoom: float = 1.0) -> Wire | None:
+        """Get the wire passing closest to a canvas position, if close enough"""
+        tolerance: float = self.pick_tolerance / zoom
+        best: Wire | None = None
+        best_distance: float = tolerance * tolerance
+        for wire_id in self.index.query_rect(
+            pygame.Rect(
+                world_pos[0] - tolerance,
+                world_pos[1] - tolerance,
+                tolerance * 2,
+                tolerance * 2,
+            )
+        ):
+            wire = self.wires[wire_id]
+            for start, end in zip(wire.points, wire.points[1:]):
+                distance = point_segment_distance_squared(world_pos, start, end)
+                if distance <= best_distance:
+                    best, best_distance = wire, distance
+        return best
+
+    def get_visible_wires(self, world_rect: pygame.Rect) -> List[Wire]:
+        """Get the wires that may cross a canvas area"""
+        return [
+            self.wires[wire_id]
+            for wire_id in self.index.query_rect(world_rect)
+            if self.wires[wire_id].bounds.colliderect(world_rect)
+        ]
+
+    def draw_wire(
+        self,
+        surf: pygame.Surface,
+        points: List[Point],
+        offset: Point,
+        zoom: float,
+        color: Tuple[int, int, int],
+    ) -> None:
+        """Draw a tessellated curve on a surface"""
+        pygame.draw.lines(
+            surf,
+            color,
+            False,
+            [(x * zoom + offset[0], y * zoom + offset[1]) for x, y in points],
+            self.wire_width,
+        )
+
+    def draw_preview(
+        self, win: pygame.Surface, start: Point, end: Point, offset: Point, zoom: float
+    ) -> None:
+        """Draw a wire that is being dragged between two canvas positions"""
+        self.draw_wire(
+            win,
+            tessellate_bezier(start, end, self.segments),
+            offset,
+            zoom,
+            self.active_wire_color,
+        )
+
+    def build_layer(self, win: pygame.Surface, offset: Point, zoom_level: int) -> None:
+        """Draw the inactive wires around the window into the cached layer"""
+        size = (
+            win.get_width() + self.layer_margin * 2,
+            win.get_height() + self.layer_margin * 2,
+        )
+        if self.layer is None or self.layer.get_size() != size:
+            self.layer = pygame.Surface(size)
+            self.layer.set_colorkey((0, 0, 0))
+        self.layer.fill((0, 0, 0))
+        self.layer_rect = pygame.Rect(
+            -self.layer_margin, -self.layer_margin, size[0], size[1]
+        )
+        self.layer_offset = offset
+        self.layer_zoom_level = zoom_level
+        self.layer_dirty = False
+
+        zoom: float = ZoomLevels.get_zoom(zoom_level)
+        world_rect = pygame.Rect(
+            (self.layer_rect.x - offset[0]) / zoom,
+            (self.layer_rect.y - offset[1]) / zoom,
+            size[0] / zoom + 1,
+            size[1] / zoom + 1,
+        )
+        layer_offset: Point = (
+            offset[0] + self.layer_margin,
+            offset[1] + self.layer_margin,
+        )
+        for wire in self.get_visible_wires(world_rect):
+            if not self.is_active(wire):
+                self.draw_wire(
+                    self.layer, wire.points, layer_offset, zoom, self.wire_color
+                )
+
+    def draw(self, win: pygame.Surface, offset: Point, zoom_level: int) -> None:
+        """Draw every wire on the window"""
+        self.sync()
+        if not self.wires:
+            return
+
+        # The layer is reused as long as it still covers the whole window
+        shift: Point = (
+            offset[0] - self.layer_offset[0],
+            offset[1] - self.layer_offset[1],
+        )
+        if (
+            self.layer_dirty
+            or zoom_level != self.layer_zoom_level
+            or not self.layer_rect.move(shift).contains(win.get_rect())
+        ):
+            self.build_layer(win, offset, zoom_level)
+            shift = (0, 0)
+        win.blit(self.layer, self.layer_rect.move(shift))
+
+        if self.active_cards:
+            zoom: float = ZoomLevels.get_zoom(zoom_level)
+            for card_id in self.active_cards:
+                for wire_id in self.card_wires.get(card_id, ()):
+                    self.draw_wire(
+                        win,
+                        self.wires[wire_id].points,
+                        offset,
+                        zoom,
+                        self.active_wire_color,
+                    )
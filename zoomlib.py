@@ -0,0 +1,79 @@
+from collections import OrderedDict
+from typing import Hashable, Tuple
+
+import pygame
+
+
+class ZoomLevels:
+    """Quantized zoom levels of the canvas
+
+    The canvas zoom is always step ** level for an integer level, so renders
+    cached per level can be reused as they are.
+    """
+
+    step: float = 2**0.25
+    min_level: int = -12
+    max_level: int = 4
+    # Below this level cards are drawn as their title bar only
+    title_only_level: int = -4
+
+    @classmethod
+    def get_zoom(cls, level: int) -> float:
+        """Get the zoom factor of a level"""
+        return cls.step**level
+
+    @classmethod
+    def clamp(cls, level: int) -> int:
+        """Clamp a level to the supported range"""
+        return min(max(level, cls.min_level), cls.max_level)
+
+    @classmethod
+    def is_title_only(cls, level: int) -> bool:
+        """Whether cards are simplified to their title at the given level"""
+        return level < cls.title_only_level
+
+
+class ZoomCache:
+    """Scaled renders of a surface, one per recently used zoom level"""
+
+    __slots__ = ("renders", "max_renders")
+
+    def __init__(self, max_renders: int = 3):
+        self.renders: OrderedDict[int, Tuple[Hashable, pygame.Surface]] = (
+            OrderedDict()
+        )
+        self.max_renders: int = max_renders
+
+    def __len__(self) -> int:
+        return len(self.renders)
+
+    def get(self, level: int, version: Hashable) -> pygame.Surface | None:
+        """Get the render of a level if it was made from the given version"""
+        render = self.renders.get(level)
+        if render is None or render[0] != version:
+            return None
+        self.renders.move_to_end(level)
+        return render[1]
+
+    def get_stale(self, level: int) -> pygame.Surface | None:
+        """Get the render of a level whatever version it was made from"""
+        render = self.renders.get(level)
+        return render[1] if render is not None else None
+
+    def put(self, level: int, version: Hashable, surf: pygame.Surface) -> None:
+        """Store the render of a level, evicting the least recently used one"""
+        self.renders[level] = (version, surf)
+        self.renders.move_to_end(level)
+        while len(self.renders) > self.max_renders:
+            self.renders.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every cached render"""
+        self.renders.clear()
+
+    def get_size_bytes(self) -> int:
+        """Get the pixel memory held by the cached renders"""
+        return sum(
+            surf.get_width() * surf.get_height() * surf.get_bytesize()
+            for _, surf in self.renders.values()
+        )